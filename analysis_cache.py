@@ -0,0 +1,98 @@
+"""
+Cache of analyzed uploads.
+
+Entries are keyed by the upload's content hash (cohort_store.dataset_id, a
+BLAKE2b digest) together with every parameter the analysis depends on, so
+re-uploading the same file with the same thresholds skips parsing and
+analysis entirely. find_prefix() also recognises an upload that is a cached
+file plus new rows, so only the tail needs analyzing (see
+analytics/incremental.py).
+
+The cache is bounded (least recently used entries are dropped). Each entry
+keeps the order frame the incremental path appends to, which the app stores
+as project_orders_for_prefix() of the upload unless ORDER_RETENTION=full
+keeps the raw frame anyway. Trades are stored and handed out as copies, because the app
+re-tags the published trades in place when thresholds change.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, List, Optional, Tuple
+
+import pandas as pd
+
+from cohort_store import dataset_id
+from models.trade import Trade
+from analytics.trade_sketches import TradeSketches
+
+
+def copy_trades(trades: List[Trade]) -> List[Trade]:
+    """Copies whose mistakes lists (the only mutable field) are independent."""
+    return [replace(t, mistakes=list(t.mistakes)) for t in trades]
+
+
+@dataclass
+class CachedAnalysis:
+    """One analyzed upload."""
+
+    dataset_id: str
+    size: int
+    params: Tuple[Any, ...]
+    orders: pd.DataFrame
+    trades: List[Trade]
+    sketches: Optional[TradeSketches] = None
+    rows: Optional[int] = None  # rows of the loaded upload; len(orders) if None
+
+    def __post_init__(self):
+        if self.rows is None:
+            self.rows = len(self.orders)
+
+
+class AnalysisCache:
+    """LRU map from (content hash, analysis parameters) to CachedAnalysis."""
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Tuple[Any, ...]], CachedAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, ds_id: str, params: Tuple[Any, ...]) -> Optional[CachedAnalysis]:
+        """The cached analysis of this exact upload and parameters, with copied trades."""
+        with self._lock:
+            entry = self._entries.get((ds_id, params))
+            if entry is None:
+                return None
+            self._entries.move_to_end((ds_id, params))
+        return replace(entry, trades=copy_trades(entry.trades))
+
+    def put(self, entry: CachedAnalysis) -> None:
+        if self.max_entries <= 0:
+            return
+        entry = replace(entry, trades=copy_trades(entry.trades))
+        with self._lock:
+            self._entries[(entry.dataset_id, entry.params)] = entry
+            self._entries.move_to_end((entry.dataset_id, entry.params))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def find_prefix(self, data: bytes, params: Tuple[Any, ...]) -> Optional[CachedAnalysis]:
+        """
+        The largest cached upload (same parameters) whose bytes are a strict
+        prefix of ``data`` ending at a line break, or None.
+        """
+        with self._lock:
+            candidates = [
+                e for e in self._entries.values()
+                if e.params == params and e.size < len(data)
+            ]
+        view = memoryview(data)
+        for entry in sorted(candidates, key=lambda e: e.size, reverse=True):
+            if view[entry.size - 1:entry.size] == b"\n" and dataset_id(view[:entry.size]) == entry.dataset_id:
+                with self._lock:
+                    if (entry.dataset_id, entry.params) in self._entries:
+                        self._entries.move_to_end((entry.dataset_id, entry.params))
+                return entry
+        return None
@@ -0,0 +1,56 @@
+from typing import List, Dict, Any, Optional
+from models.trade import Trade
+from analytics.breakeven_analyzer import calculate_breakeven_stats
+from analytics.goal_index import GoalIndex
+
+
+def calculate_trade_aggregates(trades: List[Trade], index: Optional[GoalIndex] = None) -> Dict[str, Any]:
+    """
+    Calculate the trade-level aggregates shared by the dashboard sections.
+    Pure statistics calculation - no narrative generation.
+
+    Mistake tallies come from a single pass over the trades. The clean-trade
+    streak is the "Clean Trades" goal's StreakIndex, so the summary and the
+    goal report read the same cached runs. Breakeven stats are computed once and reused by the summary
+    and win-rate/payoff sections instead of each endpoint re-deriving them.
+
+    Args:
+        trades: List of Trade objects (already analyzed with mistakes populated)
+        index: Optional prebuilt GoalIndex for ``trades``
+
+    Returns:
+        Dictionary containing:
+        - total_trades: int
+        - mistake_counts: Dict[str, int] - Count of each mistake type
+        - total_mistakes: int
+        - flagged_trades: int - Trades with at least one mistake
+        - clean_trades: int - Trades with no mistakes
+        - clean_trade_rate: float
+        - streak_current: int - Current run of clean trades
+        - streak_record: int - Best run of clean trades
+        - breakeven_stats: Dict - Output of calculate_breakeven_stats()
+    """
+    total_trades = len(trades)
+
+    mistake_counts: Dict[str, int] = {}
+    flagged_trades = 0
+    for t in trades:
+        if t.mistakes:
+            flagged_trades += 1
+            for m in t.mistakes:
+                mistake_counts[m] = mistake_counts.get(m, 0) + 1
+
+    streaks = (index or GoalIndex(trades)).streaks([])
+    clean_trades = total_trades - flagged_trades
+
+    return {
+        "total_trades": total_trades,
+        "mistake_counts": mistake_counts,
+        "total_mistakes": sum(mistake_counts.values()),
+        "flagged_trades": flagged_trades,
+        "clean_trades": clean_trades,
+        "clean_trade_rate": round(clean_trades / total_trades, 2) if total_trades else 0.0,
+        "streak_current": streaks.current,
+        "streak_record": streaks.best,
+        "breakeven_stats": calculate_breakeven_stats(trades),
+    }
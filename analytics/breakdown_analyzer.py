@@ -0,0 +1,96 @@
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytics.trade_frame import grouped_sums, derive_window_stats
+
+DIMENSIONS = ("symbol", "side", "hour", "weekday", "session")
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# CME equity-index sessions in exchange (US/Eastern) time, as
+# (name, start minute of day, end minute of day). "asia" wraps midnight.
+SESSIONS = [
+    ("asia", 18 * 60, 3 * 60),
+    ("london", 3 * 60, 9 * 60 + 30),
+    ("new_york", 9 * 60 + 30, 16 * 60),
+    ("after_hours", 16 * 60, 18 * 60),
+]
+
+DEFAULT_TZ = "America/New_York"
+
+
+def _session_codes(minutes: np.ndarray) -> np.ndarray:
+    conditions = []
+    for _, start, end in SESSIONS:
+        if start < end:
+            conditions.append((minutes >= start) & (minutes < end))
+        else:
+            conditions.append((minutes >= start) | (minutes < end))
+    return np.select(conditions, np.arange(len(SESSIONS)), -1)
+
+
+def _group_codes(frame: pd.DataFrame, by: str, tz: str) -> Tuple[pd.DataFrame, np.ndarray, List[str]]:
+    """Return (rows, integer group code per row, label per code)."""
+    if by in ("symbol", "side"):
+        column = frame[by]
+        return frame, column.cat.codes.to_numpy(), [str(c) for c in column.cat.categories]
+
+    # Time-of-day dimensions: exchange-local time, untimed trades dropped.
+    rows = frame[frame["time"].notna()]
+    try:
+        local = rows["time"].dt.tz_convert(tz)
+    except LookupError:
+        raise ValueError(f"Unknown time zone '{tz}'") from None
+
+    if by == "hour":
+        return rows, local.dt.hour.to_numpy(), [f"{h:02d}:00" for h in range(24)]
+    if by == "weekday":
+        return rows, local.dt.weekday.to_numpy(), WEEKDAYS
+    if by == "session":
+        minutes = (local.dt.hour * 60 + local.dt.minute).to_numpy()
+        return rows, _session_codes(minutes), [name for name, _, _ in SESSIONS]
+
+    raise ValueError(f"Unsupported breakdown '{by}'. Expected one of: {', '.join(DIMENSIONS)}.")
+
+
+def calculate_breakdown_stats(
+    frame: pd.DataFrame,
+    by: str,
+    sigma_loss: float = 1.0,
+    vr: float = 0.35,
+    tz: str = DEFAULT_TZ,
+) -> List[Dict[str, Any]]:
+    """
+    Calculate per-group statistics for one breakdown dimension.
+    Pure statistics calculation - no narrative generation.
+
+    Every group is reduced in a single grouped pass over the trade frame's
+    integer codes (categorical codes for symbol/side, clock fields for the
+    time dimensions) rather than by filtering and re-running the analyzers.
+
+    Args:
+        frame: Output of trades_to_frame()
+        by: "symbol", "side", "hour", "weekday" or "session"
+        sigma_loss: Outsized-loss sigma multiplier (per group)
+        vr: Risk-sizing coefficient-of-variation cutoff
+        tz: Time zone for hour/weekday/session (default exchange time)
+
+    Returns:
+        List of dicts, one per group that has trades, in natural group
+        order, each with "group" plus the fields from derive_window_stats()
+    """
+    rows, codes, labels = _group_codes(frame, by, tz)
+
+    if len(rows) == 0:
+        return []
+
+    sums = grouped_sums(rows, codes, len(labels), sigma_loss)
+    records = derive_window_stats(sums, sigma_loss, vr)
+
+    return [
+        {"group": label, **rec}
+        for label, rec in zip(labels, records)
+        if rec["total_trades"]
+    ]
@@ -0,0 +1,42 @@
+from typing import List, Dict
+
+from models.trade import Trade
+from analytics.outsized_loss_analyzer import calculate_outsized_loss_stats
+from analytics.revenge_analyzer import calculate_revenge_stats
+from analytics.risk_sizing_analyzer import calculate_risk_sizing_consistency_stats
+
+# Metric name -> True when a higher value is better for the trader.
+COHORT_METRICS = {
+    "outsized_loss_rate": False,
+    "revenge_rate": False,
+    "risk_variation_ratio": False,
+    "clean_trade_rate": True,
+}
+
+
+def calculate_cohort_metrics(trades: List[Trade], sigma_loss: float = 1.0, vr: float = 0.35) -> Dict[str, float]:
+    """
+    Calculate the per-dataset figures traders are benchmarked on.
+    Pure statistics calculation - no narrative generation.
+
+    Args:
+        trades: List of Trade objects (already analyzed with mistakes populated)
+        sigma_loss: Outsized-loss sigma multiplier
+        vr: Risk-sizing coefficient-of-variation cutoff
+
+    Returns:
+        Dictionary with one float per COHORT_METRICS key:
+        - outsized_loss_rate: % of losing trades that are outsized
+        - revenge_rate: % of trades tagged as revenge trades
+        - risk_variation_ratio: coefficient of variation of risk_points
+        - clean_trade_rate: share of trades without mistakes (0-1)
+    """
+    total = len(trades)
+    clean = sum(1 for t in trades if not t.mistakes)
+
+    return {
+        "outsized_loss_rate": float(calculate_outsized_loss_stats(trades, sigma_loss)["outsized_percent"]),
+        "revenge_rate": float(calculate_revenge_stats(trades)["revenge_percent"]),
+        "risk_variation_ratio": float(calculate_risk_sizing_consistency_stats(trades, vr)["risk_variation_ratio"]),
+        "clean_trade_rate": round(clean / total, 4) if total else 0.0,
+    }
@@ -1,9 +1,23 @@
 import statistics
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from models.trade import Trade
+from analytics.sketches import DistributionSketch, RunningStats, SymbolSketches
 
 
-def calculate_excessive_risk_stats(trades: List[Trade], sigma: float = 1.5) -> Dict[str, Any]:
+def build_risk_sketches(trades: List[Trade]) -> SymbolSketches:
+    """
+    Sketch the risk_points of every trade that has them, per dataset and per
+    symbol, for the ``sketch`` argument of calculate_excessive_risk_stats().
+    """
+    sized = [t for t in trades if t.risk_points is not None]
+    return SymbolSketches().extend([t.risk_points for t in sized], [t.symbol for t in sized])
+
+
+def calculate_excessive_risk_stats(
+    trades: List[Trade],
+    sigma: float = 1.5,
+    sketch: Optional[DistributionSketch] = None,
+) -> Dict[str, Any]:
     """
     Calculate statistics needed for Excessive Risk insight.
     Pure statistics calculation - no narrative generation.
@@ -11,6 +25,9 @@ def calculate_excessive_risk_stats(trades: List[Trade], sigma: float = 1.5) -> D
     Args:
         trades: List of Trade objects (already analyzed with mistakes populated)
         sigma: Standard deviation multiplier for threshold (default 1.5)
+        sketch: Optional DistributionSketch of the trades' risk_points (see
+            build_risk_sketches()); when given, mean/std/median/MAD come from
+            it instead of re-scanning and re-sorting the risk sizes
 
     Returns:
         Dictionary containing:
@@ -51,14 +68,18 @@ def calculate_excessive_risk_stats(trades: List[Trade], sigma: float = 1.5) -> D
             "sigma_used": sigma
         }
 
-    # Calculate basic statistics
-    mean_risk = statistics.mean(risk_sizes)
-    median_risk = statistics.median(risk_sizes)
-    std_dev_risk = statistics.pstdev(risk_sizes) if len(risk_sizes) > 1 else 0.0
+    if sketch is not None:
+        mean_risk, std_dev_risk = sketch.mean, sketch.pstdev
+        median_risk, mad = sketch.median(), sketch.mad()
+    else:
+        # Calculate basic statistics
+        mean_risk = statistics.mean(risk_sizes)
+        median_risk = statistics.median(risk_sizes)
+        std_dev_risk = statistics.pstdev(risk_sizes) if len(risk_sizes) > 1 else 0.0
+        # Median Absolute Deviation (MAD) for robust consistency measurement
+        mad = statistics.median([abs(x - median_risk) for x in risk_sizes])
     threshold = mean_risk + sigma * std_dev_risk
 
-    # Calculate Median Absolute Deviation (MAD) for robust consistency measurement
-    mad = statistics.median([abs(x - median_risk) for x in risk_sizes]) if risk_sizes else 0.0
     mad_cv = mad / median_risk if median_risk > 0 else 0.0
 
     # Identify excessive risk trades
@@ -85,12 +106,16 @@ def calculate_excessive_risk_stats(trades: List[Trade], sigma: float = 1.5) -> D
 
 
 def analyze_trades_for_excessive_risk(
-    trades: List[Trade], sigma: float = 1.5
+    trades: List[Trade], sigma: float = 1.5, sketch: Optional[DistributionSketch] = None
 ) -> List[Trade]:
     """
     Tags trades with an 'excessive risk' mistake if their risk_points exceed
     mean + sigma × std_dev. Only trades with valid risk_points are considered.
 
+    ``sketch`` is the dataset's risk sketch (build_risk_sketches().get())
+    when the caller keeps one; otherwise the mean and deviation are folded
+    from the values in one batch.
+
     This function is called by the /api/excessive-risk endpoint, not /api/analyze.
     """
     # 1. Filter for trades with valid risk_points
@@ -99,10 +124,8 @@ def analyze_trades_for_excessive_risk(
         return trades  # nothing to analyze
 
     # 2. Extract risk values
-    risk_values = [t.risk_points for t in valid_trades]
-    mean_risk = statistics.mean(risk_values)
-    std_dev_risk = statistics.pstdev(risk_values) if len(risk_values) > 1 else 0.0
-    threshold = mean_risk + sigma * std_dev_risk
+    moments = sketch.stats if sketch is not None else RunningStats().extend([t.risk_points for t in valid_trades])
+    threshold = moments.mean + sigma * moments.pstdev
 
     # 3. Tag excessive risk trades
     for t in valid_trades:
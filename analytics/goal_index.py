@@ -0,0 +1,374 @@
+"""
+Per-dataset index for goal evaluation.
+
+Every goal is "how long is the run of trades (or days) without any of these
+mistakes". Instead of re-walking Trade objects and their mistake lists for
+each goal, the index stores once per dataset:
+
+- a uint64 bitmask of mistake types per trade
+- each trade's calendar date as an ordinal
+- one OR-reduced mask per trading day
+
+A goal then reduces to a bitmask test over an array followed by a run-length
+scan, so evaluating many goals costs little more than evaluating one. Each
+goal's runs are kept in a cached StreakIndex: current / best lookups are O(1)
+and a start date is a range query over the runs, not a rescan. The one
+exception is a trade series with untimed or out-of-order trades, where the
+trades on or after a date aren't one contiguous range; those goals are
+scanned.
+"""
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.trade import Trade
+
+# Goal mask meaning "any mistake at all" (the empty mistake_types list).
+ALL_MISTAKES = np.uint64(0xFFFF_FFFF_FFFF_FFFF)
+
+# Ordinal for trades with neither an entry nor an exit time.
+NO_DATE = -1
+
+MAX_MISTAKE_TYPES = 64
+
+
+def _trade_ordinal(trade: Trade) -> int:
+    ts = trade.entry_time or trade.exit_time
+    return ts.date().toordinal() if ts else NO_DATE
+
+
+def run_lengths(clean: np.ndarray) -> Tuple[int, int]:
+    """Return (current, best) run of True values in a boolean array.
+
+    "Current" is the run ending at the last element.
+    """
+    if clean.size == 0:
+        return 0, 0
+    breaks = np.flatnonzero(~clean)
+    bounds = np.concatenate(([-1], breaks, [clean.size]))
+    runs = np.diff(bounds) - 1
+    return int(runs[-1]), int(runs.max())
+
+
+def streak_matrix(clean: np.ndarray) -> np.ndarray:
+    """Current streak at every position, for each row of a (goals × N) matrix.
+
+    Each entry is the number of consecutive True values ending there, found
+    with one running maximum over the positions of the last False.
+    """
+    positions = np.arange(1, clean.shape[1] + 1, dtype=np.int32)
+    last_break = np.maximum.accumulate(np.where(clean, 0, positions), axis=1)
+    return positions - last_break
+
+
+def sample_positions(n: int, points: int) -> np.ndarray:
+    """At most ``points`` evenly spaced positions in [0, n), always incl. n-1."""
+    if n <= points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, points).round().astype(np.int64))
+
+
+class StreakIndex:
+    """Run-length encoding of the clean runs in a goal's clean series.
+
+    Only clean (True) runs are stored; the gaps between them are the dirty
+    runs. The current and best streak are kept up to date on construction and
+    append(), and a sparse table over run lengths answers "best streak between
+    two positions" in O(1) after an O(r log r) build on first use.
+
+    Args:
+        clean: Boolean series, one entry per trade or day
+        ordinals: Date ordinal per entry, used by the date-range queries. Made
+            non-decreasing (each entry takes the latest date seen so far), so
+            untimed or out-of-order entries belong to the preceding date.
+
+    Attributes:
+        starts, ends: Position of each clean run, half-open [start, end)
+        size: Length of the encoded series
+        current: Clean run ending at the last entry
+        best: Longest clean run
+    """
+
+    __slots__ = ("starts", "ends", "size", "current", "best", "ordinals", "_table")
+
+    def __init__(self, clean: np.ndarray, ordinals: Optional[np.ndarray] = None):
+        self.starts = np.empty(0, dtype=np.int64)
+        self.ends = np.empty(0, dtype=np.int64)
+        self.ordinals = np.empty(0, dtype=np.int64)
+        self.size = 0
+        self.current = 0
+        self.best = 0
+        self._table = None
+        self.append(clean, ordinals)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self.ends - self.starts
+
+    def append(self, clean: np.ndarray, ordinals: Optional[np.ndarray] = None) -> None:
+        """Extend the series; a clean run spanning the seam is joined.
+
+        Only valid while the entries already indexed keep their clean/dirty
+        state. Re-tagging can change earlier trades too (outsized-loss and
+        revenge thresholds move with new trades), so a re-tagged dataset
+        needs a new index.
+        """
+        clean = np.asarray(clean, dtype=bool)
+        if ordinals is None:
+            ordinals = np.full(clean.size, NO_DATE, dtype=np.int64)
+
+        edges = np.flatnonzero(np.diff(np.r_[False, clean, False].astype(np.int8)))
+        starts = edges[0::2] + self.size
+        ends = edges[1::2] + self.size
+
+        if starts.size and self.current and starts[0] == self.size:
+            # Old series ended clean and the new one starts clean.
+            self.ends = self.ends.copy()
+            self.ends[-1] = ends[0]
+            starts, ends = starts[1:], ends[1:]
+            self.best = max(self.best, int(self.ends[-1] - self.starts[-1]))
+
+        self.starts = np.concatenate((self.starts, starts))
+        self.ends = np.concatenate((self.ends, ends))
+        if ends.size:
+            self.best = max(self.best, int((ends - starts).max()))
+
+        floor = self.ordinals[-1] if self.ordinals.size else NO_DATE
+        ordinals = np.maximum.accumulate(np.maximum(np.asarray(ordinals, dtype=np.int64), floor))
+        self.ordinals = np.concatenate((self.ordinals, ordinals))
+
+        self.size += clean.size
+        if clean.size:
+            last_run_open = self.ends.size and self.ends[-1] == self.size
+            self.current = int(self.ends[-1] - self.starts[-1]) if last_run_open else 0
+        self._table = None
+
+    def _sparse_table(self) -> List[np.ndarray]:
+        # Level k holds max(lengths[i : i + 2**k]) for every valid i.
+        if self._table is None:
+            levels = [self.lengths]
+            width = 1
+            while 2 * width <= levels[0].size:
+                prev = levels[-1]
+                levels.append(np.maximum(prev[:-width], prev[width:]))
+                width *= 2
+            self._table = levels
+        return self._table
+
+    def _max_run(self, a: int, b: int) -> int:
+        """Longest of runs a..b-1 (b > a)."""
+        table = self._sparse_table()
+        k = (b - a).bit_length() - 1
+        return int(max(table[k][a], table[k][b - (1 << k)]))
+
+    def stats_between(self, lo: int, hi: int) -> Tuple[int, int]:
+        """(current, best) streak of the sub-series at positions [lo, hi)."""
+        lo, hi = max(lo, 0), min(hi, self.size)
+        if hi <= lo or self.starts.size == 0:
+            return 0, 0
+
+        first = int(np.searchsorted(self.ends, lo, side="right"))
+        last = int(np.searchsorted(self.starts, hi, side="left")) - 1
+        if first > last:
+            return 0, 0
+
+        def clipped(i):
+            return int(min(self.ends[i], hi) - max(self.starts[i], lo))
+
+        best = max(clipped(first), clipped(last))
+        if last - first > 1:
+            best = max(best, self._max_run(first + 1, last))
+        current = clipped(last) if self.ends[last] >= hi else 0
+        return current, best
+
+    def prefix_stats(self, stops: np.ndarray, lo: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """(current, best) streak of the sub-series [lo, stop) for each of ``stops``.
+
+        Vectorized over ``stops`` (each at least ``lo``), for sampling a
+        streak history: one running maximum over the run lengths from ``lo``.
+        """
+        stops = np.asarray(stops, dtype=np.int64)
+        first = int(np.searchsorted(self.ends, lo, side="right"))
+        starts = np.maximum(self.starts[first:], lo)
+        ends = self.ends[first:]
+        if starts.size == 0:
+            zeros = np.zeros(stops.size, dtype=np.int64)
+            return zeros, zeros.copy()
+
+        # Last run starting before each stop, relative to ``first``.
+        last = np.searchsorted(starts, stops, side="left") - 1
+        has_run = last >= 0
+        last = np.maximum(last, 0)
+        tail = np.where(has_run, np.minimum(ends[last], stops) - starts[last], 0)
+        earlier = np.r_[0, np.maximum.accumulate(ends - starts)][last]
+        best = np.maximum(np.where(has_run, earlier, 0), tail)
+        current = np.where(has_run & (ends[last] >= stops), tail, 0)
+        return current, best
+
+    def position(self, day: date) -> int:
+        """First position dated on or after ``day``."""
+        return int(np.searchsorted(self.ordinals, day.toordinal(), side="left"))
+
+    def stats_in_range(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Tuple[int, int]:
+        """(current, best) streak among entries dated within [start_date, end_date]."""
+        lo = self.position(start_date) if start_date else 0
+        hi = int(np.searchsorted(self.ordinals, end_date.toordinal(), side="right")) if end_date else self.size
+        return self.stats_between(lo, hi)
+
+    def best_in_range(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """Longest streak among entries dated within [start_date, end_date]."""
+        return self.stats_in_range(start_date, end_date)[1]
+
+
+class GoalIndex:
+    """Mistake bitmasks and trade dates for one analyzed dataset.
+
+    Args:
+        trades: Trades with mistakes already tagged, in chronological order
+
+    Attributes:
+        bits: Mistake label -> single-bit mask
+        masks: uint64 mistake mask per trade
+        ordinals: int64 date ordinal per trade (NO_DATE if untimed)
+        days: Sorted unique date ordinals of the dated trades
+        day_masks: OR of the trade masks on each of ``days``
+    """
+
+    __slots__ = ("bits", "masks", "ordinals", "days", "day_masks", "chronological", "_streaks")
+
+    def __init__(self, trades: List[Trade]):
+        self.bits: Dict[str, int] = {}
+        self.masks, self.ordinals = self._encode(trades)
+        self.days, self.day_masks = self._reduce_days(self.masks, self.ordinals)
+        # Whether every trade is dated, in date order, so the trades from a
+        # date on are a suffix of the series (days always are).
+        self.chronological = bool(
+            np.all(self.ordinals != NO_DATE) and np.all(self.ordinals[1:] >= self.ordinals[:-1])
+        )
+        self._streaks: Dict[Tuple[int, str], StreakIndex] = {}
+
+    def _encode(self, trades: List[Trade]):
+        masks = np.zeros(len(trades), dtype=np.uint64)
+        ordinals = np.empty(len(trades), dtype=np.int64)
+        for i, t in enumerate(trades):
+            mask = 0
+            for label in t.mistakes:
+                mask |= self._bit_for(label)
+            masks[i] = mask
+            ordinals[i] = _trade_ordinal(t)
+        return masks, ordinals
+
+    def _bit_for(self, label: str) -> int:
+        bit = self.bits.get(label)
+        if bit is None:
+            if len(self.bits) == MAX_MISTAKE_TYPES:
+                raise ValueError(f"GoalIndex supports at most {MAX_MISTAKE_TYPES} mistake types")
+            bit = self.bits[label] = 1 << len(self.bits)
+        return bit
+
+    @staticmethod
+    def _reduce_days(masks: np.ndarray, ordinals: np.ndarray):
+        dated = np.flatnonzero(ordinals != NO_DATE)
+        if dated.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+
+        order = dated[np.argsort(ordinals[dated], kind="stable")]
+        sorted_days = ordinals[order]
+        starts = np.flatnonzero(np.r_[True, sorted_days[1:] != sorted_days[:-1]])
+        return sorted_days[starts], np.bitwise_or.reduceat(masks[order], starts)
+
+    def goal_mask(self, mistake_types: List[str]) -> np.uint64:
+        """Bitmask of the mistakes that invalidate a trade for a goal.
+
+        An empty list means any mistake counts. Labels that never occur in
+        the dataset contribute no bits.
+        """
+        if not mistake_types:
+            return ALL_MISTAKES
+        mask = 0
+        for label in mistake_types:
+            mask |= self.bits.get(label, 0)
+        return np.uint64(mask)
+
+    def clean_series(
+        self,
+        mistake_types: List[str],
+        metric: str = "trades",
+        start_date: Optional[date] = None,
+    ) -> np.ndarray:
+        """Boolean array: does each trade (or day) meet the goal?
+
+        Trades are in dataset order; days are chronological. With
+        ``start_date`` only trades/days on or after that date are included,
+        and untimed trades are dropped.
+        """
+        if metric == "trades":
+            masks, ordinals = self.masks, self.ordinals
+        elif metric == "days":
+            masks, ordinals = self.day_masks, self.days
+        else:
+            raise ValueError(f"Unsupported metric '{metric}'. Expected 'trades' or 'days'.")
+
+        if start_date:
+            masks = masks[ordinals >= start_date.toordinal()]
+
+        return (masks & self.goal_mask(mistake_types)) == 0
+
+    def streaks(self, mistake_types: List[str], metric: str = "trades") -> StreakIndex:
+        """Cached StreakIndex over the whole trade (or day) series of a goal."""
+        key = (int(self.goal_mask(mistake_types)), metric)
+        streaks = self._streaks.get(key)
+        if streaks is None:
+            ordinals = self.days if metric == "days" else self.ordinals
+            streaks = self._streaks[key] = StreakIndex(self.clean_series(mistake_types, metric), ordinals)
+        return streaks
+
+    def ranged(self, metric: str = "trades") -> bool:
+        """Whether start dates of ``metric`` goals can be range queries on streaks()."""
+        return metric == "days" or self.chronological
+
+    def evaluate(
+        self,
+        mistake_types: List[str],
+        goal_target: int,
+        metric: str = "trades",
+        start_date: Optional[date] = None,
+    ) -> Tuple[int, int, float]:
+        """Return (current_streak, best_streak, progress) for a goal."""
+        if not start_date:
+            streaks = self.streaks(mistake_types, metric)
+            current, best = streaks.current, streaks.best
+        elif self.ranged(metric):
+            current, best = self.streaks(mistake_types, metric).stats_in_range(start_date)
+        else:
+            current, best = run_lengths(self.clean_series(mistake_types, metric, start_date))
+        progress = round(current / goal_target, 2) if goal_target else 0.0
+        return current, best, progress
+
+    def clean_matrix(
+        self,
+        goals: List[Tuple[List[str], Optional[date]]],
+        metric: str = "trades",
+    ) -> np.ndarray:
+        """(goals × trades-or-days) boolean matrix in one broadcast mask test.
+
+        Args:
+            goals: (mistake_types, start_date) per goal. Entries before a
+                goal's start date are marked not clean, so its streaks only
+                count from that date on.
+            metric: "trades" or "days"
+        """
+        if metric == "trades":
+            masks, ordinals = self.masks, self.ordinals
+        elif metric == "days":
+            masks, ordinals = self.day_masks, self.days
+        else:
+            raise ValueError(f"Unsupported metric '{metric}'. Expected 'trades' or 'days'.")
+
+        goal_masks = np.array([self.goal_mask(m) for m, _ in goals], dtype=np.uint64)
+        starts = np.array([d.toordinal() if d else np.iinfo(np.int64).min for _, d in goals], dtype=np.int64)
+
+        clean = (masks[None, :] & goal_masks[:, None]) == 0
+        clean &= ordinals[None, :] >= starts[:, None]
+        return clean
@@ -1,7 +1,10 @@
 from typing import List, Optional
 from models.trade import Trade
+from analytics.goal_index import GoalIndex, streak_matrix, sample_positions
 from datetime import date
 
+import numpy as np
+
 GOAL_DEFINITIONS = [
     {
         "title": "Clean Trades",
@@ -33,60 +36,13 @@ GOAL_DEFINITIONS = [
 ]
 
 
-def _trade_is_clean(trade: Trade, mistake_types: List[str]) -> bool:
-    """Return True if the trade meets the goal criteria (no unwanted mistakes)."""
-    if not mistake_types:
-        return not trade.mistakes
-    return not any(m in trade.mistakes for m in mistake_types)
-
-
-def _evaluate_trade_streak(trades: List[Trade], mistake_types: List[str]):
-    """Compute current & best streak *by trade*."""
-    current = best = 0
-    for t in trades:
-        if _trade_is_clean(t, mistake_types):
-            current += 1
-            best = max(best, current)
-        else:
-            current = 0
-    return current, best
-
-
-def _evaluate_day_streak(trades: List[Trade], mistake_types: List[str]):
-    """Compute current & best streak measured in *days*.
-
-    A day counts only if **all** trades on that calendar date meet the goal.
-    Non-trading days break the streak.
-    """
-    # Group trades by entry date
-    day_to_clean: dict[date, bool] = {}
-    for t in trades:
-        day = (t.entry_time or t.exit_time).date() if t.entry_time or t.exit_time else None
-        if day is None:
-            continue
-        prev = day_to_clean.get(day, True)
-        day_to_clean[day] = prev and _trade_is_clean(t, mistake_types)
-
-    if not day_to_clean:
-        return 0, 0
-
-    current = best = 0
-    # Evaluate chronologically
-    for day, is_clean in sorted(day_to_clean.items()):
-        if is_clean:
-            current += 1
-            best = max(best, current)
-        else:
-            current = 0
-    return current, best
-
-
 def evaluate_goal(
     trades: List[Trade],
     mistake_types: List[str],
     goal_target: int,
     metric: str = "trades",
     start_date: Optional[date] = None,
+    index: Optional[GoalIndex] = None,
 ):
     """Return (current_streak, best_streak, progress) for a goal.
 
@@ -99,30 +55,28 @@ def evaluate_goal(
     goal_target : int
         Target number for streak (progress denominator).
     metric : str, optional
-        "trades" (default) or "days".
+        "trades" (default) or "days". A day counts only if **all** trades on
+        that calendar date meet the goal; non-trading days don't break the
+        streak.
     start_date : date, optional
         Only trades on/after this calendar date are considered.
+    index : GoalIndex, optional
+        Prebuilt index for ``trades``. Pass one when evaluating several goals
+        against the same dataset; otherwise it is built here.
     """
-    if start_date:
-        trades = [t for t in trades if (t.entry_time or t.exit_time) and (t.entry_time or t.exit_time).date() >= start_date]
+    if index is None:
+        index = GoalIndex(trades)
+    return index.evaluate(mistake_types, goal_target, metric, start_date)
 
-    if metric == "trades":
-        current, best = _evaluate_trade_streak(trades, mistake_types)
-    elif metric == "days":
-        current, best = _evaluate_day_streak(trades, mistake_types)
-    else:
-        raise ValueError(f"Unsupported metric '{metric}'. Expected 'trades' or 'days'.")
-
-    progress = round(current / goal_target, 2) if goal_target else 0.0
-    return current, best, progress
 
+def generate_goal_report(trades: List[Trade], index: Optional[GoalIndex] = None):
+    if index is None:
+        index = GoalIndex(trades)
 
-def generate_goal_report(trades: List[Trade]):
     report = []
 
     for goal in GOAL_DEFINITIONS:
-        current, best, progress = evaluate_goal(
-            trades=trades,
+        current, best, progress = index.evaluate(
             mistake_types=goal["mistake_types"],
             goal_target=goal["goal"],
             metric=goal.get("metric", "trades"),
@@ -140,9 +94,108 @@ def generate_goal_report(trades: List[Trade]):
 
     return report
 
-def get_clean_streak_stats(trades: List[Trade]):
+def get_clean_streak_stats(trades: List[Trade], index: Optional[GoalIndex] = None):
     """
     Returns (current_streak, best_streak) for trades with no mistakes.
     Equivalent to the Clean Trades goal.
     """
-    return evaluate_goal(trades, mistake_types=[], goal_target=1)[0:2]  # ignore progress
+    return evaluate_goal(trades, mistake_types=[], goal_target=1, index=index)[0:2]  # ignore progress
+
+
+# Goals per dense (goals × trades) block in generate_goal_timeline().
+TIMELINE_BLOCK = 64
+
+
+def generate_goal_timeline(
+    trades: List[Trade],
+    goals: Optional[List[dict]] = None,
+    metric: str = "trades",
+    points: int = 200,
+    index: Optional[GoalIndex] = None,
+):
+    """Streak and progress history for many goals, downsampled for charting.
+
+    All goals are evaluated together: one (goals × trades) clean matrix, one
+    running-max pass for the current streak at every trade (or day), and a
+    second for the best streak so far. Only ``points`` evenly spaced samples
+    (always including the last trade/day) are returned.
+
+    Parameters
+    ----------
+    trades : List[Trade]
+        Analyzed trades, in the order the GoalIndex was built from.
+    goals : List[dict], optional
+        Goal dicts shaped like GOAL_DEFINITIONS (title, goal, mistake_types,
+        start_date, optional id). Defaults to GOAL_DEFINITIONS. Each goal's
+        own metric is ignored in favour of ``metric``.
+    metric : str, optional
+        "trades" (default) or "days" – the x-axis of every series.
+    points : int, optional
+        Maximum number of samples per series.
+    index : GoalIndex, optional
+        Prebuilt index for ``trades``.
+
+    Returns
+    -------
+    dict with ``metric``, ``x`` (ISO timestamps for trades, ISO dates for
+    days), ``position`` (index into the full series) and ``goals``, each with
+    ``current``, ``best`` and ``progress`` lists aligned with ``x``.
+    """
+    if index is None:
+        index = GoalIndex(trades)
+    if goals is None:
+        goals = GOAL_DEFINITIONS
+
+    specs = [(g.get("mistake_types") or [], g.get("start_date")) for g in goals]
+    length = index.days.size if metric == "days" else index.masks.size
+    positions = sample_positions(length, max(int(points), 1))
+
+    # Each goal's cached StreakIndex answers the samples as prefix queries
+    # from its start date. Only goals whose start date can't be a range
+    # (untimed or unordered trades) go through dense matrices, in blocks to
+    # bound their size.
+    current = np.zeros((len(specs), positions.size), dtype=np.int64)
+    best = np.zeros((len(specs), positions.size), dtype=np.int64)
+    dense = []
+    for g, (mistake_types, start_date) in enumerate(specs):
+        if start_date and not index.ranged(metric):
+            dense.append(g)
+            continue
+        streaks = index.streaks(mistake_types, metric)
+        lo = streaks.position(start_date) if start_date else 0
+        current[g], best[g] = streaks.prefix_stats(np.maximum(positions + 1, lo), lo)
+    for block in range(0, len(dense), TIMELINE_BLOCK):
+        rows = dense[block:block + TIMELINE_BLOCK]
+        streaks = streak_matrix(index.clean_matrix([specs[g] for g in rows], metric))
+        best[rows] = np.maximum.accumulate(streaks, axis=1)[:, positions]
+        current[rows] = streaks[:, positions]
+
+    if metric == "days":
+        x = [date.fromordinal(int(d)).isoformat() for d in index.days[positions]]
+    else:
+        x = []
+        for i in positions:
+            ts = trades[i].entry_time or trades[i].exit_time
+            x.append(ts.isoformat() if ts else None)
+
+    series = []
+    for g, cur, top in zip(goals, current, best):
+        target = g.get("goal") or 0
+        entry = {
+            "title": g.get("title", ""),
+            "goal": target,
+            "start_date": g["start_date"].isoformat() if g.get("start_date") else None,
+            "current": cur.tolist(),
+            "best": top.tolist(),
+            "progress": np.round(cur / target, 2).tolist() if target else [0.0] * len(cur),
+        }
+        if "id" in g:
+            entry["id"] = g["id"]
+        series.append(entry)
+
+    return {
+        "metric": metric,
+        "x": x,
+        "position": positions.tolist(),
+        "goals": series,
+    }
@@ -0,0 +1,175 @@
+"""
+Incremental re-analysis of an order file that grew.
+
+When an upload is an earlier upload plus new rows (the same export, saved
+again later in the session), only the new rows need parsing. The tail is
+appended to the earlier normalized frame and trades are reconstructed over
+the whole of it (cheap). The per-trade order matching (stop-loss tagging and
+risk sizing, the expensive part) is reused for every earlier trade that
+closed more than the stop-loss exit buffer before the tail's first order.
+Those results only depend on orders up to a trade's exit, except that a trade
+whose symbol has no later order at all is flagged as unprotected outright;
+such trades are matched again. The cross-trade
+detectors (outsized loss, revenge, excessive risk) re-run over every trade,
+since new trades move their thresholds; the loss and risk sketches behind
+those thresholds are appended to rather than rebuilt (trade_sketches.py).
+
+The earlier frame doesn't have to be the raw one: project_orders_for_prefix()
+keeps only what extending it reads, and gives the same results.
+"""
+from typing import List, Optional, Tuple
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from models.trade import Trade
+from analytics.trade_counter import count_trades
+from analytics.mistake_analyzer import DETECTOR_ORDER_COLUMNS
+from analytics.stop_loss_analyzer import analyze_trades_for_no_stop_mistake, event_time_column
+from analytics.risk_sizing_analyzer import analyze_trades_for_risk_sizing_consistency
+from analytics.outsized_loss_analyzer import analyze_trades_for_outsized_loss
+from analytics.revenge_analyzer import analyze_trades_for_revenge
+from analytics.excessive_risk_analyzer import analyze_trades_for_excessive_risk
+from analytics.parallel import analyze_orders
+from analytics.trade_sketches import TradeSketches
+
+# Orders up to this long after a trade's exit can still count as its stop
+# (buffer_after_exit in the stop-loss detector).
+EXIT_BUFFER = pd.Timedelta(seconds=2)
+
+NO_STOP = "no stop-loss order"
+
+# Columns trade reconstruction reads on top of the detectors' columns.
+PREFIX_ORDER_COLUMNS = DETECTOR_ORDER_COLUMNS + ["order_id_original", "qty", "price"]
+
+
+def project_orders_for_prefix(orders: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink a normalized order frame to what extend_analysis() reads from it
+    as ``base_orders``.
+
+    Keeps the fills (trade reconstruction), the stop orders (stop-loss
+    tagging and risk sizing) and each symbol's latest order, since the
+    stop-loss detector flags a trade outright when its symbol has no order at
+    or after the entry. Only PREFIX_ORDER_COLUMNS are kept. Extending the
+    projection gives the same trades as extending the full frame.
+    """
+    keep = orders["is_stop"] | orders["is_filled"]
+    ts_col = event_time_column(orders)
+    if ts_col is not None:
+        latest = orders[ts_col].notna()
+        latest &= orders[ts_col] == orders.groupby("symbol", observed=True)[ts_col].transform("max")
+        keep |= latest
+    columns = [c for c in PREFIX_ORDER_COLUMNS if c in orders.columns]
+    projected = orders.loc[keep, columns].reset_index(drop=True)
+    projected.attrs = dict(orders.attrs)
+    return projected
+
+
+def append_orders(base: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    """Concatenate two normalized order frames, keeping categorical columns categorical."""
+    tail = tail.copy()
+    base = base.copy()
+    for col in base.columns:
+        if col in tail.columns and isinstance(base[col].dtype, pd.CategoricalDtype) \
+                and isinstance(tail[col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([base[col], tail[col]], ignore_order=True).categories
+            base[col] = base[col].cat.set_categories(categories)
+            tail[col] = tail[col].cat.set_categories(categories)
+    orders = pd.concat([base, tail], ignore_index=True)
+    orders.attrs = dict(base.attrs)
+    return orders
+
+
+def _settled(base_orders: pd.DataFrame, tail_orders: pd.DataFrame, orders: pd.DataFrame) -> Optional[pd.Timestamp]:
+    """
+    The time before which earlier trades' stop matching can be reused, or
+    None if the tail changes how the earlier trades are reconstructed.
+    """
+    ts_col = event_time_column(base_orders)
+    if ts_col is None or event_time_column(orders) != ts_col:
+        return None
+
+    tail_times = pd.concat([tail_orders["ts"], tail_orders["fill_ts"]]).dropna()
+    base_fills = base_orders.loc[base_orders["is_filled"], "fill_ts"].dropna()
+    if tail_times.empty:
+        return None
+    tail_start = tail_times.min()
+    # Reconstruction walks fills in time order; a tail fill that lands before
+    # the earlier file's last fill reorders the walk.
+    tail_fills = tail_orders.loc[tail_orders["is_filled"], "fill_ts"].dropna()
+    if not base_fills.empty and not tail_fills.empty and tail_fills.min() < base_fills.max():
+        return None
+    return tail_start
+
+
+def extend_analysis(
+    base_orders: pd.DataFrame,
+    base_trades: List[Trade],
+    tail_orders: pd.DataFrame,
+    point_values=None,
+    sigma_multiplier: float = 1.0,
+    revenge_multiplier: float = 1.0,
+    sigma_risk: float = 1.5,
+    base_sketches: Optional[TradeSketches] = None,
+) -> Tuple[pd.DataFrame, List[Trade], int, TradeSketches]:
+    """
+    Analyze ``base_orders`` + ``tail_orders`` given the analyzed base trades.
+
+    Args:
+        base_orders: Normalized orders of the earlier upload
+        base_trades: Its analyzed trades (read, not modified)
+        tail_orders: Normalized orders of the new rows
+        point_values, sigma_multiplier, revenge_multiplier, sigma_risk: as
+            for analyze_orders(); must match the base analysis
+        base_sketches: TradeSketches of the base trades, if kept
+
+    Returns:
+        (orders, trades, reused, sketches) - the combined frame, its analyzed
+        trades (as analyze_orders() would produce them), how many trades kept
+        their earlier stop-loss / risk-sizing results, and the trades'
+        TradeSketches
+    """
+    orders = append_orders(base_orders, tail_orders)
+    tail_start = _settled(base_orders, tail_orders, orders)
+    if tail_start is None:
+        trades = analyze_orders(orders, point_values, sigma_multiplier, revenge_multiplier, sigma_risk)
+        return orders, trades, 0, TradeSketches.build(trades)
+    if base_sketches is None:
+        base_sketches = TradeSketches.build(base_trades)
+
+    trades, _ = count_trades(orders, point_values)
+
+    # A trade whose symbol had no order at or after its entry in the earlier
+    # file was flagged for that alone; the tail's orders can change it.
+    ts_col = event_time_column(base_orders)
+    last_order = base_orders.groupby("symbol", observed=True)[ts_col].max()
+
+    fresh: List[Trade] = []
+    for i, new in enumerate(trades):
+        old = base_trades[i] if i < len(base_trades) else None
+        if old is None or old.exit_time + EXIT_BUFFER >= tail_start or \
+                (new.symbol, new.entry_time, new.exit_time, new.exit_qty) != \
+                (old.symbol, old.entry_time, old.exit_time, old.exit_qty):
+            fresh.extend(trades[i:])
+            break
+        if not last_order.get(old.symbol, pd.NaT) >= old.entry_time:
+            fresh.append(new)
+            continue
+        if NO_STOP in old.mistakes:
+            new.mistakes.append(NO_STOP)
+        new.risk_points = old.risk_points
+    reused = len(trades) - len(fresh)
+
+    # Same detector order as analyze_all_mistakes(), with the order-matching
+    # stages limited to the trades that weren't settled.
+    if fresh:
+        analyze_trades_for_no_stop_mistake(fresh, orders)
+    losses = base_sketches.loss_sketches_for(base_trades, trades)
+    analyze_trades_for_outsized_loss(trades, sigma_multiplier, losses.get())
+    analyze_trades_for_revenge(trades, revenge_multiplier)
+    if fresh:
+        analyze_trades_for_risk_sizing_consistency(fresh, orders)
+    risk = base_sketches.risk_sketches_for(base_trades, trades)
+    analyze_trades_for_excessive_risk(trades, sigma_risk, risk.get())
+    return orders, trades, reused, TradeSketches(losses, risk)
@@ -2,6 +2,7 @@ from typing import List, Optional, Dict, Any
 from models.trade import Trade
 import pandas as pd
 
+from parsing.ingest import with_order_flags
 from analytics.stop_loss_analyzer import analyze_trades_for_no_stop_mistake
 from analytics.outsized_loss_analyzer import analyze_trades_for_outsized_loss
 from analytics.revenge_analyzer import analyze_trades_for_revenge
@@ -12,11 +13,15 @@ def analyze_all_mistakes(
     trades, orders_df,
     sigma_multiplier: float = 1.0,
     revenge_multiplier: float = 1.0,
-    sigma_risk: float = 1.5
+    sigma_risk: float = 1.5,
+    sketches=None,
 ):
     """
     Apply all configured mistake detection functions in sequence.
     Mutates trades in place.
+
+    ``sketches`` (a TradeSketches of these trades) supplies the outsized-loss
+    and excessive-risk thresholds when the caller already keeps them.
     """
     # DEBUG: track how many times this orchestrator is invoked at runtime
     # print(f"analyze_all_mistakes called on {len(trades)} trades")
@@ -24,7 +29,7 @@ def analyze_all_mistakes(
     analyze_trades_for_no_stop_mistake(trades, orders_df)
 
     # Detect outsized loss trades
-    analyze_trades_for_outsized_loss(trades, sigma_multiplier)
+    analyze_trades_for_outsized_loss(trades, sigma_multiplier, sketches.losses.get() if sketches else None)
 
     # Detect revenge trades
     analyze_trades_for_revenge(trades, revenge_multiplier)
@@ -33,10 +38,45 @@ def analyze_all_mistakes(
     analyze_trades_for_risk_sizing_consistency(trades, orders_df)
 
     # Detect trades with excessive risk
-    analyze_trades_for_excessive_risk(trades, sigma_risk)
+    analyze_trades_for_excessive_risk(trades, sigma_risk, sketches.risk.get() if sketches else None)
 
     return trades
 
+# Columns the order-based detectors (stop-loss + risk-sizing) read after
+# trades have been reconstructed.
+DETECTOR_ORDER_COLUMNS = [
+    "ts", "fill_ts", "symbol", "side", "Type", "Status", "Stop Price",
+    "is_stop", "is_filled", "is_canceled",
+]
+
+
+def project_orders_for_detectors(orders_df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    Shrink an order DataFrame to what analyze_trades_for_no_stop_mistake() and
+    analyze_trades_for_risk_sizing_consistency() need on a re-run.
+
+    Both detectors only ever *match* stop-type orders, so every other row is
+    dead weight once trades exist. Fills are kept as well so the stop-loss
+    detector resolves the same timestamp column it would on the full frame.
+    String columns are stored as categoricals and the order flags are kept,
+    so a re-run does no string matching at all.
+
+    Returns a new, compact DataFrame; the caller can drop the original.
+    """
+    if orders_df is None or orders_df.empty:
+        return orders_df
+
+    orders_df = with_order_flags(orders_df)
+    keep = orders_df["is_stop"] | orders_df["is_filled"]
+
+    columns = [c for c in DETECTOR_ORDER_COLUMNS if c in orders_df.columns]
+    projected = orders_df.loc[keep, columns].reset_index(drop=True)
+    for col in ("symbol", "side", "Type", "Status"):
+        if col in projected.columns:
+            projected[col] = projected[col].cat.remove_unused_categories()
+    return projected
+
+
 def calculate_summary_stats(trades: List[Trade], orders: Any) -> Dict[str, Any]:
     """
     Calculate statistics needed for Summary insight.
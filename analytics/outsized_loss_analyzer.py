@@ -1,9 +1,31 @@
 import statistics
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from models.trade import Trade
+from analytics.sketches import DistributionSketch, RunningStats, SymbolSketches
 
 
-def calculate_outsized_loss_stats(trades: List[Trade], sigma_multiplier: float = 1.0) -> Dict[str, Any]:
+def _loss_value(trade: Trade) -> float:
+    # points_lost (per-contract points) when available, otherwise abs(pnl) to
+    # support legacy data / tests that don't set points_lost.
+    return trade.points_lost if getattr(trade, "points_lost", None) is not None else abs(trade.pnl)
+
+
+def build_loss_sketches(trades: List[Trade]) -> SymbolSketches:
+    """
+    Sketch the loss values of every losing trade, per dataset and per symbol.
+
+    The result can be passed (via .get(symbol)) as the ``sketch`` argument of
+    calculate_outsized_loss_stats() for the same losing trades.
+    """
+    losing = [t for t in trades if t.pnl is not None and t.pnl < 0]
+    return SymbolSketches().extend([_loss_value(t) for t in losing], [t.symbol for t in losing])
+
+
+def calculate_outsized_loss_stats(
+    trades: List[Trade],
+    sigma_multiplier: float = 1.0,
+    sketch: Optional[DistributionSketch] = None,
+) -> Dict[str, Any]:
     """
     Calculate statistics needed for Outsized Losses insight.
     Pure statistics calculation - no narrative generation.
@@ -11,6 +33,9 @@ def calculate_outsized_loss_stats(trades: List[Trade], sigma_multiplier: float =
     Args:
         trades: List of Trade objects
         sigma_multiplier: Standard deviation multiplier for threshold (default 1.0)
+        sketch: Optional DistributionSketch of the losing trades' loss values
+            (see build_loss_sketches()); when given, mean/std/median/MAD come
+            from it instead of re-scanning and re-sorting the losses
 
     Returns:
         Dictionary containing:
@@ -53,20 +78,19 @@ def calculate_outsized_loss_stats(trades: List[Trade], sigma_multiplier: float =
             "sigma_used": sigma_multiplier
         }
 
-    # Calculate statistics using points_lost (per-contract points) when available,
-    # otherwise fall back to abs(pnl) to support legacy data / tests that don’t set points_lost.
-    def _loss_value(trade):
-        return trade.points_lost if getattr(trade, "points_lost", None) is not None else abs(trade.pnl)
-
     all_losses = [_loss_value(t) for t in losing_trades]
 
-    mean_loss = statistics.mean(all_losses)
-    median_loss = statistics.median(all_losses)
-    std_loss = statistics.pstdev(all_losses) if len(all_losses) > 1 else 0.0
+    if sketch is not None:
+        mean_loss, std_loss = sketch.mean, sketch.pstdev
+        median_loss, mad = sketch.median(), sketch.mad()
+    else:
+        mean_loss = statistics.mean(all_losses)
+        median_loss = statistics.median(all_losses)
+        std_loss = statistics.pstdev(all_losses) if len(all_losses) > 1 else 0.0
+        # Median Absolute Deviation (MAD) for robust consistency measurement
+        mad = statistics.median([abs(x - median_loss) for x in all_losses])
     threshold = mean_loss + sigma_multiplier * std_loss
 
-    # Calculate Median Absolute Deviation (MAD) for robust consistency measurement
-    mad = statistics.median([abs(x - median_loss) for x in all_losses]) if all_losses else 0.0
     mad_cv = mad / median_loss if median_loss > 0 else 0.0
 
     # Identify outsized loss trades using the same metric as above
@@ -95,20 +119,23 @@ def calculate_outsized_loss_stats(trades: List[Trade], sigma_multiplier: float =
 
 
 def analyze_trades_for_outsized_loss(
-    trades: List[Trade], sigma_multiplier: float = 1.0
+    trades: List[Trade], sigma_multiplier: float = 1.0, sketch: Optional[DistributionSketch] = None
 ) -> List[Trade]:
     """
     Marks trades with an 'outsized loss' mistake if their points_lost
     exceeds mean + (sigma_multiplier × std_dev).
+
+    ``sketch`` is the dataset's loss sketch (build_loss_sketches().get())
+    when the caller keeps one; otherwise the mean and deviation are folded
+    from the losses in one batch.
     """
     # Consider only *losing* trades when computing the threshold
     losses = [t.points_lost for t in trades if t.pnl is not None and t.pnl < 0]
     if not losses:
         return trades
 
-    mean_pts = statistics.mean(losses)
-    std_pts  = statistics.pstdev(losses)
-    threshold = mean_pts + sigma_multiplier * std_pts
+    moments = sketch.stats if sketch is not None else RunningStats().extend(losses)
+    threshold = moments.mean + sigma_multiplier * moments.pstdev
 
     for t in trades:
         if t.pnl is not None and t.pnl < 0 and t.points_lost > threshold:
@@ -0,0 +1,245 @@
+"""
+Per-symbol parallel analysis.
+
+Position tracking in count_trades() and stop matching in the stop-loss and
+risk-sizing detectors never look past one symbol's orders, so a
+multi-instrument file splits into independent partitions. analyze_orders()
+runs those three stages per symbol on a process pool, merges the trades back
+in exit-fill order, and only then runs the detectors that compare trades
+across symbols (outsized loss, revenge, excessive risk) - the same result
+count_trades() followed by analyze_all_mistakes() gives.
+
+Workers are not sent pickled DataFrames. The parent sorts the orders by
+symbol, copies each column once into a shared-memory block (categoricals as
+their integer codes) and sends each task only the block names and its
+[start, stop) row range; the trades come back pickled.
+
+The pool is created on first use and kept for the life of the process. Its
+workers come from a forkserver (spawn where that's unavailable) rather than
+by forking the caller, which in the web app is a threaded gunicorn worker:
+a fork would copy locks held by its other threads and could deadlock.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.trade import Trade, next_trade_id
+from parsing.ingest import with_order_flags, ORDER_FLAGS
+from analytics.trade_counter import count_trades, reconstruct_trades
+from analytics.mistake_analyzer import analyze_all_mistakes
+from analytics.stop_loss_analyzer import analyze_trades_for_no_stop_mistake, event_time_column
+from analytics.risk_sizing_analyzer import analyze_trades_for_risk_sizing_consistency
+from analytics.outsized_loss_analyzer import analyze_trades_for_outsized_loss
+from analytics.revenge_analyzer import analyze_trades_for_revenge
+from analytics.excessive_risk_analyzer import analyze_trades_for_excessive_risk
+
+# Columns the per-symbol stages read.
+PARTITION_COLUMNS = (
+    "ts", "fill_ts", "side", "symbol", "qty", "price", "Type", "Status", "Stop Price",
+    *ORDER_FLAGS,
+)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_key: Optional[Tuple[int, int]] = None  # (owning pid, worker count)
+_pool_lock = threading.Lock()
+
+
+def _mp_context():
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """The process's shared analysis pool, (re)created for ``workers`` processes."""
+    global _pool, _pool_key
+    key = (os.getpid(), workers)
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            if _pool is not None and _pool_key[0] == key[0]:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # A pool inherited across a fork belongs to the parent; just drop it.
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+            _pool_key = key
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the shared pool's workers (it is recreated on next use)."""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None and _pool_key[0] == os.getpid():
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_key = None, None
+
+
+def encode_column(values: pd.Series) -> Tuple[np.ndarray, Tuple[str, Any]]:
+    """Plain NumPy array for a column plus what decode_column() needs to rebuild it."""
+    if values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+        # Python objects can't live in shared memory; strings travel as codes.
+        values = values.astype("category")
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), ("category", list(values.cat.categories))
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return values.dt.tz_convert(None).to_numpy(), ("datetime", str(values.dt.tz))
+    return values.to_numpy(), ("plain", None)
+
+
+def decode_column(array: np.ndarray, spec: Tuple[str, Any]) -> Any:
+    """Column values from encode_column()'s array and spec; plain arrays are returned as-is."""
+    kind, meta = spec
+    if kind == "category":
+        return pd.Categorical.from_codes(array, categories=meta)
+    if kind == "datetime":
+        return pd.DatetimeIndex(array).tz_localize("UTC").tz_convert(meta)
+    return array
+
+
+def _analyze_partition(
+    blocks: Dict[str, Tuple[str, str, Tuple[str, Any]]],
+    start: int,
+    stop: int,
+    ts_col: Optional[str],
+    point_values: Optional[Dict[str, float]],
+) -> Tuple[List[Trade], List[int]]:
+    """
+    Reconstruct and tag one symbol's trades from the shared column blocks.
+
+    Runs in a pool worker; ``blocks`` maps column -> (block name, dtype, spec).
+
+    Returns the trades and the (symbol-sorted) row position of each exit fill.
+    """
+    columns = {}
+    for name, (shm_name, dtype, spec) in blocks.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            array = np.ndarray((stop,), dtype=dtype, buffer=shm.buf)[start:stop].copy()
+        finally:
+            shm.close()
+        columns[name] = decode_column(array, spec)
+    orders = pd.DataFrame(columns, index=pd.RangeIndex(start, stop))
+
+    trades, exit_rows = reconstruct_trades(orders, point_values)
+    if not trades:
+        return trades, exit_rows
+
+    # The stop-loss detector picks its timestamp column from the whole file;
+    # a symbol whose own "ts" is empty must not fall back to "fill_ts" here.
+    stop_orders = orders
+    if ts_col == "ts" and event_time_column(orders) != "ts":
+        stop_orders = orders.drop(columns=["fill_ts"])
+    analyze_trades_for_no_stop_mistake(trades, stop_orders)
+    analyze_trades_for_risk_sizing_consistency(trades, orders)
+    return trades, exit_rows
+
+
+def _share_columns(orders: pd.DataFrame) -> Tuple[Dict[str, Tuple[str, str, Tuple[str, Any]]], List[shared_memory.SharedMemory]]:
+    """Copy each partition column into its own shared-memory block."""
+    blocks, segments = {}, []
+    try:
+        for name in PARTITION_COLUMNS:
+            if name not in orders.columns:
+                continue
+            array, spec = encode_column(orders[name])
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            segments.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            blocks[name] = (shm.name, array.dtype.str, spec)
+    except BaseException:
+        _release(segments)
+        raise
+    return blocks, segments
+
+
+def _release(segments: List[shared_memory.SharedMemory]) -> None:
+    for shm in segments:
+        shm.close()
+        shm.unlink()
+
+
+def analyze_orders(
+    orders_df: pd.DataFrame,
+    point_values: Optional[Dict[str, float]] = None,
+    sigma_multiplier: float = 1.0,
+    revenge_multiplier: float = 1.0,
+    sigma_risk: float = 1.5,
+    workers: int = 1,
+) -> List[Trade]:
+    """
+    Reconstruct trades from orders and tag every mistake type.
+
+    Equivalent to count_trades() followed by analyze_all_mistakes(). With
+    ``workers`` > 1 and more than one symbol, reconstruction, stop-loss
+    tagging and risk sizing run per symbol on that many processes.
+
+    Args:
+        orders_df: Normalized order DataFrame (see parsing.ingest)
+        point_values: Symbol -> dollars-per-point multiplier for pnl
+        sigma_multiplier: Outsized-loss sigma threshold
+        revenge_multiplier: Revenge-trade hold-time multiplier (k)
+        sigma_risk: Excessive-risk sigma threshold
+        workers: Process count; 1 (or a single symbol) runs in-process
+
+    Returns:
+        List of analyzed Trade objects in exit-fill order
+    """
+    if workers <= 1 or orders_df["symbol"].nunique(dropna=False) < 2:
+        trades, _ = count_trades(orders_df, point_values)
+        return analyze_all_mistakes(trades, orders_df, sigma_multiplier, revenge_multiplier, sigma_risk)
+
+    orders = with_order_flags(orders_df.reset_index(drop=True))
+    codes = orders["symbol"].cat.codes.to_numpy()
+
+    # Contiguous row range per symbol; a stable sort keeps each symbol's
+    # rows in file order.
+    order = np.argsort(codes, kind="stable")
+    by_symbol = orders.iloc[order].reset_index(drop=True)
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    ranges = list(zip(np.r_[0, bounds], np.r_[bounds, len(order)]))
+    # Largest partitions first so one big symbol doesn't start last.
+    ranges.sort(key=lambda r: r[0] - r[1])
+
+    ts_col = event_time_column(orders)
+    blocks, segments = _share_columns(by_symbol)
+    try:
+        pool = get_pool(workers)
+        futures = [
+            pool.submit(_analyze_partition, blocks, int(start), int(stop),
+                        ts_col, point_values)
+            for start, stop in ranges
+        ]
+        results = [f.result() for f in futures]
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool next time.
+        shutdown_pool()
+        raise
+    finally:
+        _release(segments)
+
+    # Merge in the order count_trades() creates trades: by exit fill time,
+    # ties in file order.
+    trades = [t for part, _ in results for t in part]
+    exit_rows = order[np.concatenate([rows for _, rows in results]).astype(np.int64)]
+    exit_times = pd.DatetimeIndex(orders["fill_ts"]).asi8[exit_rows]
+    merge = np.lexsort((exit_rows, exit_times))
+    trades = [trades[i] for i in merge]
+
+    order_ids = orders["order_id_original"].astype(object).to_numpy() if "order_id_original" in orders.columns else None
+    for t, row in zip(trades, exit_rows[merge]):
+        # Workers number trades from their own counters and may have cached
+        # to_dict() payloads with those ids.
+        t.id = next_trade_id()
+        t.exit_order_id = order_ids[row] if order_ids is not None else None
+        t._dict_cache = None
+
+    analyze_trades_for_outsized_loss(trades, sigma_multiplier)
+    analyze_trades_for_revenge(trades, revenge_multiplier)
+    analyze_trades_for_excessive_risk(trades, sigma_risk)
+    return trades
@@ -1,3 +1,4 @@
+from dataclasses import replace
 from typing import List, Dict, Any
 from datetime import timedelta
 from models.trade import Trade
@@ -148,3 +149,21 @@ def analyze_trades_for_revenge(
                 curr.mistakes.append("revenge trade")
 
     return trades
+
+
+def retag_revenge_copies(
+    trades: List[Trade],
+    multiplier: float = 1.0
+) -> List[Trade]:
+    """
+    Return copies of trades tagged for revenge with this multiplier.
+
+    The copies drop any "revenge trade" tag the originals already carry
+    (e.g. from the upload's default k) before re-tagging, so a smaller
+    multiplier can lower the count. The originals are left untouched.
+    """
+    cloned = [
+        replace(t, mistakes=[m for m in t.mistakes if m != "revenge trade"])
+        for t in trades
+    ]
+    return analyze_trades_for_revenge(cloned, multiplier)
@@ -2,6 +2,10 @@ import pandas as pd
 from typing import List, Dict, Any
 import statistics
 from models.trade import Trade
+from parsing.ingest import with_order_flags, category_mask
+
+# Scratch column marking the orders whose Stop Price sets a trade's risk.
+_RISK_STOP = "_risk_stop"
 
 
 def calculate_risk_sizing_consistency_stats(trades: List[Trade], vr: float = 0.35) -> Dict[str, Any]:
@@ -102,10 +106,13 @@ def analyze_trades_for_risk_sizing_consistency(
     if orders is None or orders.empty:
         return trades
 
-    orders = orders.copy()
-    orders["Type"] = orders["Type"].astype(str).str.strip().str.lower()
-    orders["side"] = orders["side"].astype(str).str.strip()
-    orders["ts"] = pd.to_datetime(orders["ts"], errors="coerce")
+    orders = with_order_flags(orders)
+    # Plain stop / stop-limit orders only (narrower than is_stop), matched
+    # once per distinct Type rather than per row.
+    orders = orders.assign(
+        ts=pd.to_datetime(orders["ts"], errors="coerce"),
+        **{_RISK_STOP: category_mask(orders["Type"], lambda v: v in ("stop", "stop limit"))},
+    )
 
     for tr in trades:
         # Skip trades without stops or with the no-stop mistake
@@ -118,7 +125,7 @@ def analyze_trades_for_risk_sizing_consistency(
         # Find stop orders within the trade's duration
         matching_stops = orders[
             (orders["symbol"] == tr.symbol) &
-            (orders["Type"].isin({"stop", "stop limit"})) &
+            orders[_RISK_STOP] &
             (orders["side"] == opp_side) &
             (orders["ts"] >= tr.entry_time) &
             (orders["ts"] <= tr.exit_time) &
@@ -0,0 +1,268 @@
+"""
+Mergeable streaming summaries for the robust-statistics detectors.
+
+RunningStats keeps count/mean/variance with Welford's update; QuantileSketch
+is a deterministic KLL sketch for medians and MAD. Both take O(log n)
+amortized work per value, never re-sort the full history and can be merged,
+so per-symbol sketches roll up into a dataset sketch and dataset sketches
+into cohort baselines. A QuantileSketch that has never compacted (small
+inputs) answers exactly.
+
+extend() takes a whole array at once: the moments are folded in as one
+batch, and the values land in the bottom compactor together, so building a
+sketch is a handful of sorts rather than a Python call per value.
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Capacity of the top compactor; rank error is roughly 1.7 / k.
+DEFAULT_K = 200
+
+# Lower compactors shrink geometrically by this factor (KLL's c).
+_CAPACITY_DECAY = 2.0 / 3.0
+
+
+def _weighted_quantile(values: np.ndarray, weights: np.ndarray, q: float) -> float:
+    order = np.argsort(values, kind="stable")
+    values, weights = values[order], weights[order]
+    cum = np.cumsum(weights)
+    idx = int(np.searchsorted(cum, q * cum[-1], side="left"))
+    return float(values[min(idx, len(values) - 1)])
+
+
+class RunningStats:
+    """Welford accumulator for count, mean and population variance."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    def extend(self, values: Iterable[float]) -> "RunningStats":
+        """Fold a batch of values in at once and return self."""
+        values = np.asarray(values, dtype=float)
+        if values.size:
+            batch = RunningStats()
+            batch.count = int(values.size)
+            batch.mean = float(values.mean())
+            batch._m2 = float(np.square(values - batch.mean).sum())
+            self.merge(batch)
+        return self
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Fold ``other`` into this accumulator (Chan et al.) and return self."""
+        if other.count:
+            n = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / n
+            self._m2 += other._m2 + delta * delta * self.count * other.count / n
+            self.count = n
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count > 1 else 0.0
+
+    @property
+    def pstdev(self) -> float:
+        return math.sqrt(max(self.variance, 0.0))
+
+
+class QuantileSketch:
+    """
+    Deterministic KLL quantile sketch.
+
+    Values land in level 0; a full level is sorted and every other item
+    (alternating offset per level) is promoted to the next level with twice
+    the weight. Memory stays O(k) regardless of stream length.
+    """
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = k
+        self.n = 0
+        self.levels: List[List[float]] = [[]]
+        self._offsets: List[int] = [0]
+        self._size = 0
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * _CAPACITY_DECAY ** depth)))
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _compact(self, level: int) -> None:
+        if level + 1 == len(self.levels):
+            self.levels.append([])
+            self._offsets.append(0)
+        items = sorted(self.levels[level])
+        keep = [items.pop()] if len(items) % 2 else []
+        offset = self._offsets[level]
+        self._offsets[level] ^= 1
+        self.levels[level + 1].extend(items[offset::2])
+        self.levels[level] = keep
+        self._size = sum(len(items) for items in self.levels)
+
+    def _compress(self) -> None:
+        while self._size >= self._max_size():
+            for h in range(len(self.levels)):
+                if len(self.levels[h]) >= self._capacity(h):
+                    self._compact(h)
+                    break
+
+    def add(self, x: float) -> None:
+        self.levels[0].append(float(x))
+        self.n += 1
+        self._size += 1
+        if self._size >= self._max_size():
+            self._compress()
+
+    def extend(self, values: Iterable[float]) -> "QuantileSketch":
+        """Add a batch of values and return self."""
+        values = np.asarray(values, dtype=float)
+        if values.size:
+            self.levels[0].extend(values.tolist())
+            self.n += int(values.size)
+            self._size += int(values.size)
+            if self._size >= self._max_size():
+                self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold ``other`` into this sketch and return self."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+            self._offsets.append(0)
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self._size = sum(len(items) for items in self.levels)
+        self._compress()
+        return self
+
+    @property
+    def exact(self) -> bool:
+        """True while every value ever added is still stored at weight 1."""
+        return len(self.levels) == 1
+
+    def weighted_values(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Stored values and their weights (2**level)."""
+        values = np.fromiter((x for items in self.levels for x in items), dtype=float, count=self._size)
+        weights = np.concatenate([np.full(len(items), 2 ** h, dtype=float) for h, items in enumerate(self.levels)])
+        return values, weights
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return 0.0
+        if self.exact:
+            return float(np.quantile(self.levels[0], q))
+        values, weights = self.weighted_values()
+        return _weighted_quantile(values, weights, q)
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def mad(self) -> float:
+        """Median absolute deviation from the (sketched) median."""
+        if self.n == 0:
+            return 0.0
+        center = self.median()
+        if self.exact:
+            return float(np.median(np.abs(np.asarray(self.levels[0]) - center)))
+        values, weights = self.weighted_values()
+        return _weighted_quantile(np.abs(values - center), weights, 0.5)
+
+
+class DistributionSketch:
+    """RunningStats plus a QuantileSketch over the same values."""
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.stats = RunningStats()
+        self.quantiles = QuantileSketch(k)
+
+    def add(self, x: float) -> None:
+        self.stats.add(x)
+        self.quantiles.add(x)
+
+    def extend(self, values: Iterable[float]) -> "DistributionSketch":
+        values = np.asarray(values, dtype=float)
+        self.stats.extend(values)
+        self.quantiles.extend(values)
+        return self
+
+    def merge(self, other: "DistributionSketch") -> "DistributionSketch":
+        self.stats.merge(other.stats)
+        self.quantiles.merge(other.quantiles)
+        return self
+
+    @property
+    def count(self) -> int:
+        return self.stats.count
+
+    @property
+    def mean(self) -> float:
+        return self.stats.mean
+
+    @property
+    def pstdev(self) -> float:
+        return self.stats.pstdev
+
+    def median(self) -> float:
+        return self.quantiles.median()
+
+    def mad(self) -> float:
+        return self.quantiles.mad()
+
+
+class SymbolSketches:
+    """A DistributionSketch for a whole dataset plus one per symbol."""
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = k
+        self.total = DistributionSketch(k)
+        self.by_symbol: Dict[str, DistributionSketch] = {}
+
+    def add(self, x: float, symbol: Optional[str] = None) -> None:
+        self.total.add(x)
+        if symbol is not None:
+            sketch = self.by_symbol.get(symbol)
+            if sketch is None:
+                sketch = self.by_symbol[symbol] = DistributionSketch(self.k)
+            sketch.add(x)
+
+    def extend(self, values: Iterable[float], symbols: Optional[Iterable[str]] = None) -> "SymbolSketches":
+        """Add a batch of values (and the symbol of each) and return self."""
+        values = np.asarray(values, dtype=float)
+        self.total.extend(values)
+        if symbols is not None and values.size:
+            labels, codes = np.unique(np.asarray(symbols, dtype=str), return_inverse=True)
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+            for i, symbol in enumerate(labels.tolist()):
+                sketch = self.by_symbol.get(symbol)
+                if sketch is None:
+                    sketch = self.by_symbol[symbol] = DistributionSketch(self.k)
+                sketch.extend(values[order[bounds[i]:bounds[i + 1]]])
+        return self
+
+    def get(self, symbol: Optional[str] = None) -> DistributionSketch:
+        """The sketch for ``symbol`` (an empty one if unseen), or the total."""
+        if symbol is None:
+            return self.total
+        return self.by_symbol.get(symbol) or DistributionSketch(self.k)
+
+    def merge(self, other: "SymbolSketches") -> "SymbolSketches":
+        self.total.merge(other.total)
+        for symbol, sketch in other.by_symbol.items():
+            self.by_symbol.setdefault(symbol, DistributionSketch(self.k)).merge(sketch)
+        return self
@@ -1,13 +1,28 @@
 import logging
-from typing import List
+from typing import List, Optional
 import pandas as pd
 import statistics
 from dataclasses import asdict
 from models.trade import Trade
+from parsing.ingest import with_order_flags, category_mask
+
+# Scratch column marking the stops this detector treats as cancelled. Only the
+# "canceled" spelling has ever matched here, so NinjaTrader's "Cancelled"
+# stops keep counting as live (unlike the loader's is_canceled flag, which
+# accepts both); keeping that rule leaves the no-stop flags unchanged.
+_CANCELED = "_stop_canceled"
 
 # Optionally configure logging externally; no default verbose output here.
 
 
+def event_time_column(orders: pd.DataFrame) -> Optional[str]:
+    """The timestamp column stops are matched on: 'ts' if it has any values, else 'fill_ts', else None."""
+    for col in ("ts", "fill_ts"):
+        if col in orders.columns and orders[col].notna().any():
+            return col
+    return None
+
+
 def _check_single_trade_for_no_stop(tr: Trade, orders: pd.DataFrame) -> None:
     """Marks tr.mistakes with 'no stop-loss order' if *no* protective stop
     was *placed* any time *after* the trade's entry.  We do **not** enforce an
@@ -23,11 +38,8 @@ def _check_single_trade_for_no_stop(tr: Trade, orders: pd.DataFrame) -> None:
     # trade_counter (where 'ts' can be NaT/duplicated and 'fill_ts' holds the
     # usable event time).  Pick whichever column contains real datetimes.
 
-    if "ts" in orders.columns and orders["ts"].notna().any():
-        ts_col = "ts"
-    elif "fill_ts" in orders.columns and orders["fill_ts"].notna().any():
-        ts_col = "fill_ts"
-    else:
+    ts_col = event_time_column(orders)
+    if ts_col is None:
         # No usable timestamp column – abort with conservative flag.
         tr.mistakes.append("no stop-loss order")
         return
@@ -38,28 +50,20 @@ def _check_single_trade_for_no_stop(tr: Trade, orders: pd.DataFrame) -> None:
     df = orders[
         (orders["symbol"] == tr.symbol) &
         (orders[ts_col] >= tr.entry_time)
-    ].copy()
+    ]
     
     # If *no* orders exist after entry, we can immediately mark as unprotected.
     if df.empty:
         tr.mistakes.append("no stop-loss order")
         return
-    
-    # normalize columns
-    df["Type"] = df["Type"].astype(str).str.strip().str.lower()
-    df["side"] = df["side"].astype(str).str.strip()
 
     # Look for any stop orders placed after entry
-    stop_orders = df[
-        (df["Type"].str.contains("stop", case=False, na=False)) &
-        (df["side"] == opp_side)
-    ].copy()
+    stop_orders = df[df["is_stop"] & (df["side"] == opp_side)]
 
     if not stop_orders.empty:
         # A cancelled stop only counts if its recorded timestamp is **after**
         # the trade exited (meaning it was active during the trade and then
         # cancelled).  Otherwise it provided no protection.
-        stop_orders["Status"] = stop_orders["Status"].astype(str).str.strip().str.lower()
         buffer_after_exit = pd.Timedelta(seconds=2)
         min_live = pd.Timedelta(seconds=2)  # cancelled stops must live ≥2 s
 
@@ -68,7 +72,7 @@ def _check_single_trade_for_no_stop(tr: Trade, orders: pd.DataFrame) -> None:
             (stop_orders[ts_col] <= tr.exit_time + buffer_after_exit) &
             (
                 # Filled or working stops always count …
-                (stop_orders["Status"] != "canceled") |
+                ~stop_orders[_CANCELED] |
                 # … Cancelled stops count as long as they were NOT cancelled
                 # immediately (≥2 s after entry).  This captures genuine
                 # protective stops that were pulled later while excluding
@@ -84,7 +88,7 @@ def _check_single_trade_for_no_stop(tr: Trade, orders: pd.DataFrame) -> None:
     exit_stop = df[
         (df[ts_col] == tr.exit_time) &
         (df["side"] == opp_side) &
-        (df["Type"].str.contains("stop", case=False, na=False))
+        df["is_stop"]
     ]
 
     if not exit_stop.empty:
@@ -105,19 +109,15 @@ def _check_single_trade_for_no_stop(tr: Trade, orders: pd.DataFrame) -> None:
         (orders["symbol"] == tr.symbol) &
         (orders[ts_col] >= lb_start) &
         (orders[ts_col] < tr.entry_time)
-    ].copy()
+    ]
 
     if not pre_window.empty:
-        pre_window["Type"] = pre_window["Type"].astype(str).str.strip().str.lower()
-        pre_window["side"] = pre_window["side"].astype(str).str.strip()
-        pre_window["Status"] = pre_window["Status"].astype(str).str.strip().str.lower()
-
         min_live = pd.Timedelta(seconds=2)
         pre_stops = pre_window[
-            (pre_window["Type"].str.contains("stop", case=False, na=False)) &
+            pre_window["is_stop"] &
             (pre_window["side"] == opp_side) &
             (
-                (pre_window["Status"] != "canceled") |
+                ~pre_window[_CANCELED] |
                 (pre_window[ts_col] - tr.entry_time >= min_live)
             )
         ]
@@ -147,9 +147,14 @@ def analyze_trades_for_no_stop_mistake(
     # Ensure timestamp column is datetime
     raw_orders_df["ts"] = pd.to_datetime(raw_orders_df["ts"], errors="coerce")
 
+    # Type/side/Status are matched through categoricals and boolean flags
+    # computed once here, not re-normalized per trade.
+    orders = with_order_flags(raw_orders_df)
+    orders = orders.assign(**{_CANCELED: category_mask(orders["Status"], lambda v: v == "canceled")})
+
     # logging.debug(f"Analyzing {len(trades)} trades for stop-loss usage.")
     for tr in trades:
-        _check_single_trade_for_no_stop(tr, raw_orders_df)
+        _check_single_trade_for_no_stop(tr, orders)
 
     # logging.debug("Stop-loss analysis complete.")
     return trades
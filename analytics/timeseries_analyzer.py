@@ -0,0 +1,101 @@
+from typing import List, Dict, Any
+
+import pandas as pd
+
+from analytics.trade_frame import grouped_sums, rolling_sums, derive_window_stats
+
+# Calendar period name -> pandas period frequency. Weeks run Monday–Sunday.
+PERIODS = {
+    "day": "D",
+    "week": "W-SUN",
+    "month": "M",
+}
+
+
+def _iso(ts) -> Any:
+    return None if pd.isna(ts) else ts.isoformat()
+
+
+def calculate_period_stats(
+    frame: pd.DataFrame,
+    period: str = "week",
+    sigma_loss: float = 1.0,
+    vr: float = 0.35,
+) -> List[Dict[str, Any]]:
+    """
+    Calculate per-calendar-period statistics for a trade frame.
+    Pure statistics calculation - no narrative generation.
+
+    Trades are bucketed by the calendar period of their entry time in the
+    frame's time zone (``frame.attrs["tz"]``, UTC if unset) and every bucket
+    is reduced in a single grouped pass. Periods without trades are omitted;
+    untimed trades are ignored.
+
+    Args:
+        frame: Output of trades_to_frame()
+        period: "day", "week" or "month"
+        sigma_loss: Outsized-loss sigma multiplier (per period)
+        vr: Risk-sizing coefficient-of-variation cutoff
+
+    Returns:
+        List of dicts in chronological order, each with period, start, end
+        (ISO dates) and the fields from derive_window_stats()
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unsupported period '{period}'. Expected one of: {', '.join(PERIODS)}.")
+
+    dated = frame[frame["time"].notna()]
+    if dated.empty:
+        return []
+
+    local = dated["time"].dt.tz_convert(frame.attrs.get("tz", "UTC"))
+    periods = local.dt.tz_localize(None).dt.to_period(PERIODS[period])
+    codes, uniques = pd.factorize(periods, sort=True)
+
+    sums = grouped_sums(dated, codes, len(uniques), sigma_loss)
+    records = derive_window_stats(sums, sigma_loss, vr)
+
+    for rec, p in zip(records, uniques):
+        rec["period"] = str(p)
+        rec["start"] = p.start_time.date().isoformat()
+        rec["end"] = p.end_time.date().isoformat()
+    return records
+
+
+def calculate_rolling_stats(
+    frame: pd.DataFrame,
+    window: int,
+    step: int = 1,
+    sigma_loss: float = 1.0,
+    vr: float = 0.35,
+) -> List[Dict[str, Any]]:
+    """
+    Calculate statistics over rolling windows of ``window`` consecutive trades.
+    Pure statistics calculation - no narrative generation.
+
+    Args:
+        frame: Output of trades_to_frame(), in chronological order
+        window: Trades per window, at most len(frame)
+        step: Trades between consecutive window starts
+        sigma_loss: Outsized-loss sigma multiplier (per window)
+        vr: Risk-sizing coefficient-of-variation cutoff
+
+    Returns:
+        List of dicts, each with first_trade (row index), start and end
+        (entry times of the first and last trade) and the fields from
+        derive_window_stats()
+    """
+    if window < 1 or step < 1:
+        raise ValueError("window and step must be positive")
+    if window > len(frame):
+        raise ValueError(f"window must be at most the number of trades ({len(frame)})")
+
+    sums = rolling_sums(frame, window, step, sigma_loss)
+    records = derive_window_stats(sums, sigma_loss, vr)
+
+    times = frame["time"]
+    for rec, start in zip(records, sums["start"]):
+        rec["first_trade"] = int(start)
+        rec["start"] = _iso(times.iloc[start])
+        rec["end"] = _iso(times.iloc[start + window - 1])
+    return records
@@ -1,7 +1,8 @@
 from models.trade import Trade
+import numpy as np
 import pandas as pd
-from typing import List, Tuple, Dict, Any
-from parsing.utils import normalize_timestamps_in_df
+from typing import List, Tuple, Dict, Any, Optional
+from parsing.ingest import normalize, detect_format, ORDER_FLAGS
 from datetime import datetime, timedelta, timezone
 
 def parse_datetime_safe(value):
@@ -19,96 +20,85 @@ def normalize_and_prepare_orders_df(df: pd.DataFrame) -> pd.DataFrame:
     """
     Takes a loaded DataFrame, renames columns, normalizes timestamps,
     and ensures correct data types for further processing.
+
+    Runs the parsing.ingest normalize stage for the detected broker with
+    timestamps converted to UTC, then lays the result out in the legacy
+    column set (including the raw timestamp strings). The input is not
+    modified and only one output frame is assembled.
     """
-    df_processed = df.copy()
-
-    # --- Column Renaming --- 
-    column_rename_map = {
-        "Timestamp": "original_ts",       # Raw event timestamp
-        "Fill Time": "original_fill_ts",  # Raw fill timestamp
-        "Date": "date_original",
-        "B/S": "side",
-        "Contract": "symbol",
-        "avgPrice": "price",
-        "filledQty": "qty",
-        "Type": "Type",
-        "Status": "Status",
-        "Stop Price": "Stop Price",
-        "Limit Price": "Limit Price",
-        "Order ID": "order_id_original"
-    }
-    cols_to_rename = {k: v for k, v in column_rename_map.items() if k in df_processed.columns}
-    df_renamed = df_processed.rename(columns=cols_to_rename)
-
-    # --- Timestamp Normalization --- 
-    # Normalize 'original_ts' (from CSV 'Timestamp') into 'ts'
-    if 'original_ts' in df_renamed.columns:
-        df_normalized = normalize_timestamps_in_df(df_renamed, 'original_ts', 'ts')
-    else:
-        print("Warning: 'Timestamp' (expected as 'original_ts') column not found. 'ts' column will be NaT.")
-        df_normalized = df_renamed.copy()
-        df_normalized['ts'] = pd.NaT
+    normalized = normalize(df, detect_format(df.columns), utc=True)
 
-    # Normalize 'original_fill_ts' (from CSV 'Fill Time') into 'fill_ts'
-    if 'original_fill_ts' in df_normalized.columns:
-        df_normalized = normalize_timestamps_in_df(df_normalized, 'original_fill_ts', 'fill_ts')
-    else:
-        print("Warning: 'Fill Time' (expected as 'original_fill_ts') column not found. 'fill_ts' column will be NaT.")
-        # Ensure column exists even if source was missing
-        df_normalized['fill_ts'] = pd.NaT
+    # Legacy column -> raw export column kept verbatim for reference.
+    raw_columns = {"date_original": "Date", "original_ts": "Timestamp", "original_fill_ts": "Fill Time"}
 
-    # --- Define final structure and ensure essential columns exist ---
     final_expected_cols = [
         'ts', 'fill_ts', 'side', 'symbol', 'price', 'qty', 'Type', 'Status',
         'Stop Price', 'Limit Price', 'order_id_original', 'date_original',
         'original_ts', 'original_fill_ts' # Keep original non-normalized for reference if needed
     ]
-    df_current = df_normalized.copy() # Start with the normalized df
+    columns = {}
     for col in final_expected_cols:
-        if col not in df_current.columns:
-            df_current[col] = pd.NA # Add if missing, with NA (or NaT for time if appropriate)
-            if col in ['ts', 'fill_ts']:
-                 df_current[col] = pd.NaT
-
-    df_current = df_current.reindex(columns=final_expected_cols) # Ensure order and all columns are present
-
-    # --- Data Type Conversions (excluding already converted timestamps) ---
-    df_current["Status"] = df_current["Status"].astype(str).str.strip()
-    df_current["side"] = df_current["side"].astype(str).str.strip()
-    df_current["symbol"] = df_current["symbol"].astype(str)
-    df_current["Type"] = df_current["Type"].astype(str).str.strip()
-    if 'order_id_original' in df_current.columns:
-        df_current["order_id_original"] = df_current["order_id_original"].astype(str)
-    
-    for price_col in ['price', 'Stop Price', 'Limit Price']:
-        if price_col in df_current.columns:
-            # Convert to numeric, coercing errors. Then try to fill NAs with 0 if appropriate or handle elsewhere.
-            df_current[price_col] = pd.to_numeric(df_current[price_col], errors='coerce')
-    if 'qty' in df_current.columns:
-        df_current['qty'] = pd.to_numeric(df_current['qty'], errors='coerce') #.fillna(0).astype(int) - decide on fillna later
-
-    # --- Final Checks for Timestamp Columns ---
-    for ts_col_name in ['ts', 'fill_ts']:
-        if ts_col_name not in df_current.columns:
-            print(f"CRITICAL ERROR: Timestamp column '{ts_col_name}' is missing after processing!")
-            # Potentially raise error or return None/empty to halt execution
-            return pd.DataFrame() # Return empty to signify failure
-        
-        if df_current[ts_col_name].isna().all() and ts_col_name == 'ts': # Primary 'ts' should ideally not be all NaT if original data existed
-            print(f"Warning: The primary event timestamp column '{ts_col_name}' contains all NaT values.")
-        
-        if not pd.api.types.is_datetime64_any_dtype(df_current[ts_col_name].dtype) or df_current[ts_col_name].dt.tz != timezone.utc:
-            print(f"Warning: Column '{ts_col_name}' is not a UTC-aware datetime. Actual dtype: {df_current[ts_col_name].dtype}, TZ: {df_current[ts_col_name].dt.tz}")
-            # This state indicates a problem in the normalization logic or source data that wasn't caught/handled by normalize_timestamps_in_df
-            # Depending on strictness, could raise an error here.
-            # For now, this print serves as a strong warning.
-            # Consider a fallback if absolutely necessary, though normalize_timestamps_in_df should handle it:
-            # df_current[ts_col_name] = pd.to_datetime(df_current[ts_col_name], errors='coerce').dt.tz_localize('America/New_York').dt.tz_convert('UTC')
+        if col in raw_columns:
+            source = raw_columns[col]
+            columns[col] = df[source] if source in df.columns else pd.Series(pd.NA, index=df.index, dtype=object)
+        elif col in normalized.columns:
+            columns[col] = normalized[col]
+        elif col in ('ts', 'fill_ts'):
+            print(f"Warning: '{col}' source column not found. '{col}' column will be NaT.")
+            columns[col] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+        else:
+            columns[col] = pd.Series(pd.NA, index=df.index, dtype=object)
+
+    columns['order_id_original'] = columns['order_id_original'].astype(str)
+    # Order flags ride along whenever their source columns existed.
+    columns.update({flag: normalized[flag] for flag in ORDER_FLAGS if flag in normalized.columns})
+
+    df_current = pd.DataFrame(columns, index=df.index)
+
+    if df_current['ts'].isna().all():
+        print("Warning: The primary event timestamp column 'ts' contains all NaT values.")
 
     return df_current
 
 
-def count_trades(input_data: pd.DataFrame) -> Tuple[List[Trade], pd.DataFrame]:
+def _assign_pnl(
+    trades: List[Trade],
+    entry_prices: List[float],
+    exit_prices: List[float],
+    directions: List[int],
+    exit_qtys: List[int],
+    point_values: Optional[Dict[str, float]] = None,
+) -> None:
+    """
+    Compute pnl and points_lost for every reconstructed trade in one vectorized pass.
+
+    points_lost is the per-contract loss in points (for the loss-consistency
+    chart); pnl is points × direction × exit quantity, scaled by the symbol's
+    point value when one is supplied so mixed instruments share a dollar scale.
+    """
+    if not trades:
+        return
+
+    raw_points = (np.asarray(exit_prices, dtype=float) - np.asarray(entry_prices, dtype=float)) \
+        * np.asarray(directions, dtype=float)
+
+    multipliers = np.ones(len(trades))
+    if point_values:
+        symbols = pd.Series([t.symbol for t in trades], dtype="object")
+        multipliers = symbols.map(point_values).fillna(1.0).to_numpy(dtype=float)
+
+    pnl = np.round(raw_points * np.asarray(exit_qtys, dtype=float) * multipliers, 2)
+    points_lost = np.abs(np.round(raw_points, 2))
+
+    for t, p, pts in zip(trades, pnl.tolist(), points_lost.tolist()):
+        t.pnl = p
+        t.points_lost = pts
+
+
+def count_trades(
+    input_data: pd.DataFrame,
+    point_values: Optional[Dict[str, float]] = None,
+) -> Tuple[List[Trade], pd.DataFrame]:
     """
     Parses a DataFrame of order data and returns a list of completed Trade objects,
     based on position exits (each exit counts as a separate trade).
@@ -116,10 +106,16 @@ def count_trades(input_data: pd.DataFrame) -> Tuple[List[Trade], pd.DataFrame]:
     One exit order (opposite-side fill) increments the trade counter by +1.
     Partial exits create additional trades; scale-ins do not.
 
+    PnL and points_lost are filled in during reconstruction, so callers get
+    fully priced trades back.
+
     Parameters
     ----------
     input_data : pd.DataFrame
         A DataFrame already processed by normalize_and_prepare_orders_df.
+    point_values : dict, optional
+        Symbol → dollars-per-point multiplier applied to pnl. Symbols that are
+        missing (or no mapping at all) keep a multiplier of 1.0.
 
     Returns
     -------
@@ -127,21 +123,55 @@ def count_trades(input_data: pd.DataFrame) -> Tuple[List[Trade], pd.DataFrame]:
         - List of total trades found in the file.
         - The processed DataFrame (passed through).
     """
+    trades, _ = reconstruct_trades(input_data, point_values)
+    return trades, input_data
+
+
+def reconstruct_trades(
+    input_data: pd.DataFrame,
+    point_values: Optional[Dict[str, float]] = None,
+) -> Tuple[List[Trade], List[Any]]:
+    """
+    count_trades() that also reports where each trade came from.
+
+    Returns
+    -------
+    Tuple[List[Trade], List[Any]]
+        - The trades, in exit-fill order.
+        - The index label of each trade's exit fill, aligned with the trades.
+
+    Fills are processed in fill_ts order with ties kept in row order, so the
+    result is deterministic and a subset of symbols reconstructs exactly the
+    trades it would within the whole file (see analytics/parallel.py).
+    """
     processed_df = input_data
 
+    if "is_filled" in processed_df.columns:
+        is_filled = processed_df["is_filled"]
+    else:
+        is_filled = processed_df["Status"] == "Filled"
+
     filled = processed_df[
-        (processed_df["Status"] == "Filled") &
+        is_filled &
         processed_df["qty"].notna() & (processed_df["qty"] > 0) &
         processed_df["fill_ts"].notna() # Crucially, ensure there's a fill_ts for filled orders
     ].copy()
 
-    filled = filled.sort_values("fill_ts") # Sort by fill_ts for processing trade entries/exits
+    filled = filled.sort_values("fill_ts", kind="stable") # Sort by fill_ts for processing trade entries/exits
 
     positions = {}  # symbol → open position state
     trades: List[Trade] = []
     trade_id_counter = 1
 
-    for _, row in filled.iterrows():
+    # Columnar copies of the pricing inputs; pnl is computed from these in
+    # bulk once reconstruction finishes.
+    entry_prices: List[float] = []
+    exit_prices: List[float] = []
+    directions: List[int] = []
+    exit_qtys: List[int] = []
+    exit_rows: List[Any] = []
+
+    for label, row in filled.iterrows():
         symbol = row["symbol"]
         side = row["side"]
         qty = int(row["qty"])
@@ -200,6 +230,11 @@ def count_trades(input_data: pd.DataFrame) -> Tuple[List[Trade], pd.DataFrame]:
                 pnl=None,
             )
             trades.append(trade)
+            entry_prices.append(position["entry_price"])
+            exit_prices.append(price)
+            directions.append(1 if str(position["side"]).lower() == "buy" else -1)
+            exit_qtys.append(exit_qty)
+            exit_rows.append(label)
             trade_id_counter += 1
 
             new_net = net + signed_qty
@@ -211,6 +246,6 @@ def count_trades(input_data: pd.DataFrame) -> Tuple[List[Trade], pd.DataFrame]:
                 positions[symbol]["entry_price"] = price
                 positions[symbol]["side"] = "Buy" if new_net > 0 else "Sell"
 
-    # Return the original processed_df as the second tuple element if other parts of the system expect it unchanged
-    # or return 'filled' if that's more useful. For now, returning input_data (which is processed_df here)
-    return trades, input_data
+    _assign_pnl(trades, entry_prices, exit_prices, directions, exit_qtys, point_values)
+
+    return trades, exit_rows
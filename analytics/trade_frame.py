@@ -0,0 +1,329 @@
+"""
+Columnar view of analyzed trades and statistics over groups of them.
+
+trades_to_frame() turns a list of Trade objects into one DataFrame row per
+trade. The stats functions here then reduce that frame per group (np.bincount
+over integer group codes) or per rolling N-trade window (prefix-sum
+differences). Each produces, for every group or window in one pass, the
+breakeven, outsized-loss and risk-sizing figures that
+calculate_breakeven_stats(), calculate_outsized_loss_stats() and
+calculate_risk_sizing_consistency_stats() give for a single list.
+Slices are never materialized as Trade lists.
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from models.trade import Trade
+from parsing.utils import localize_to_utc
+
+# Prefix of the per-mistake-type count columns in a trade frame.
+MISTAKE_PREFIX = "mistake:"
+
+
+def trades_to_frame(trades: List[Trade], tz: str = "UTC") -> pd.DataFrame:
+    """
+    Build a one-row-per-trade DataFrame for grouped statistics.
+
+    Args:
+        trades: List of Trade objects (already analyzed with mistakes populated)
+        tz: Time zone of naive trade times (the ingest ``tz``); recorded in
+            ``frame.attrs["tz"]`` so calendar bucketing can use local days
+
+    Returns:
+        DataFrame with columns:
+        - time: datetime64[UTC] - entry time (exit time if no entry)
+        - symbol, side: category
+        - pnl: float (NaN if unknown)
+        - loss_value: float - loss size as the outsized-loss analyzer
+          measures it (points_lost, else abs(pnl)); NaN for non-losers
+        - risk_points: float (NaN if unknown)
+        - clean: bool - trade has no mistakes
+        - "mistake:<label>": int - occurrences of each mistake type
+    """
+    pnl = np.array([np.nan if t.pnl is None else t.pnl for t in trades], dtype=float)
+    points_lost = np.array([np.nan if t.points_lost is None else t.points_lost for t in trades], dtype=float)
+    risk = np.array([np.nan if t.risk_points is None else t.risk_points for t in trades], dtype=float)
+
+    with np.errstate(invalid="ignore"):
+        loss_value = np.where(pnl < 0, np.where(np.isnan(points_lost), np.abs(pnl), points_lost), np.nan)
+
+    times = pd.Series(pd.to_datetime([t.entry_time or t.exit_time for t in trades]))
+
+    frame = pd.DataFrame({
+        "time": localize_to_utc([times], tz)[0],
+        "symbol": pd.Categorical([t.symbol for t in trades]),
+        "side": pd.Categorical([t.side for t in trades]),
+        "pnl": pnl,
+        "loss_value": loss_value,
+        "risk_points": risk,
+        "clean": np.array([not t.mistakes for t in trades], dtype=bool),
+    })
+
+    labels = sorted({m for t in trades for m in t.mistakes})
+    for label in labels:
+        frame[MISTAKE_PREFIX + label] = np.array([t.mistakes.count(label) for t in trades], dtype=np.int64)
+
+    frame.attrs["tz"] = tz
+    return frame
+
+
+def _additive_columns(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Per-trade values whose per-group statistic is a plain sum."""
+    pnl = frame["pnl"].to_numpy()
+    loss_value = frame["loss_value"].to_numpy()
+    risk = frame["risk_points"].to_numpy()
+
+    win = pnl > 0
+    loss = pnl < 0
+    has_loss_value = ~np.isnan(loss_value)
+    has_risk = ~np.isnan(risk)
+
+    columns = {
+        "trades": np.ones(len(frame)),
+        "wins": win.astype(float),
+        "losses": loss.astype(float),
+        "win_sum": np.where(win, pnl, 0.0),
+        "loss_sum": np.where(loss, -pnl, 0.0),
+        "clean": frame["clean"].to_numpy().astype(float),
+        "lv_n": has_loss_value.astype(float),
+        "lv_sum": np.where(has_loss_value, loss_value, 0.0),
+        "lv_sq": np.where(has_loss_value, loss_value, 0.0) ** 2,
+        "risk_n": has_risk.astype(float),
+        "risk_sum": np.where(has_risk, risk, 0.0),
+        "risk_sq": np.where(has_risk, risk, 0.0) ** 2,
+    }
+    for col in frame.columns:
+        if col.startswith(MISTAKE_PREFIX):
+            columns[col] = frame[col].to_numpy().astype(float)
+    return columns
+
+
+def _loss_thresholds(sums: Dict[str, np.ndarray], sigma_loss: float):
+    n = sums["lv_n"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(n > 0, sums["lv_sum"] / n, 0.0)
+        var = np.where(n > 1, sums["lv_sq"] / n - mean ** 2, 0.0)
+    std = np.sqrt(np.maximum(var, 0.0))
+    return mean, std, mean + sigma_loss * std
+
+
+def grouped_sums(frame: pd.DataFrame, codes: np.ndarray, n_groups: int, sigma_loss: float = 1.0) -> Dict[str, np.ndarray]:
+    """
+    Reduce a trade frame to per-group sums in one pass per column.
+
+    Args:
+        frame: Output of trades_to_frame()
+        codes: int array, group number (0..n_groups-1) of each row
+        n_groups: Number of groups
+        sigma_loss: Outsized-loss sigma multiplier
+
+    Returns:
+        Dictionary of float arrays of length n_groups, suitable for
+        derive_window_stats()
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    sums = {
+        key: np.bincount(codes, weights=values, minlength=n_groups)
+        for key, values in _additive_columns(frame).items()
+    }
+
+    risk = frame["risk_points"].to_numpy()
+    has_risk = ~np.isnan(risk)
+    sums["risk_min"] = np.full(n_groups, np.inf)
+    sums["risk_max"] = np.full(n_groups, -np.inf)
+    np.minimum.at(sums["risk_min"], codes[has_risk], risk[has_risk])
+    np.maximum.at(sums["risk_max"], codes[has_risk], risk[has_risk])
+
+    # Outsized losses are judged against each group's own threshold.
+    _, _, threshold = _loss_thresholds(sums, sigma_loss)
+    loss_value = frame["loss_value"].to_numpy()
+    with np.errstate(invalid="ignore"):
+        outsized = loss_value > threshold[codes]
+    sums["outsized"] = np.bincount(codes[outsized], minlength=n_groups).astype(float)
+    return sums
+
+
+def _window_extreme(values: np.ndarray, starts: np.ndarray, window: int, reduce) -> np.ndarray:
+    """
+    ``reduce`` (np.minimum or np.maximum) over values[s:s + window] for each start s.
+
+    Builds one sparse-table level at a time, keeping only the current one:
+    after doubling, table[i] covers values[i:i + span]. Two overlapping spans
+    then cover each window. O(n log window) time, O(n) memory.
+    """
+    table, span = values, 1
+    while span * 2 <= window:
+        table = reduce(table[:-span], table[span:])
+        span *= 2
+    return reduce(table[starts], table[starts + window - span])
+
+
+def _count_above_before(values: np.ndarray, thresholds: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    """
+    For each query j, how many i < stops[j] have values[i] > thresholds[j].
+
+    NaN values and NaN thresholds never count. The values above a threshold
+    are a prefix of the positions sorted by value (descending), so each query
+    counts the positions below its stop within that prefix. A merge-sort tree
+    over those positions answers it, built one level at a time: the prefix
+    splits into at most one sorted block per level. O(n log² n) time, O(n)
+    memory.
+    """
+    valid = ~np.isnan(values)
+    ascending = np.sort(values[valid])
+    positions = np.flatnonzero(valid)[np.argsort(values[valid], kind="stable")[::-1]]
+    above = len(ascending) - np.searchsorted(ascending, thresholds, side="right")
+
+    stride = len(values) + 1
+    counts = np.zeros(len(thresholds), dtype=np.int64)
+    level, size = 0, 1
+    while size <= len(positions):
+        # Each block of ``size`` positions, sorted within the block.
+        blocks = np.sort(np.arange(len(positions)) // size * stride + positions)
+        use = (above & size) != 0
+        block = (above[use] >> level) - 1
+        counts[use] += np.searchsorted(blocks, block * stride + stops[use]) - block * size
+        level, size = level + 1, size * 2
+    return counts
+
+
+def rolling_sums(frame: pd.DataFrame, window: int, step: int = 1, sigma_loss: float = 1.0) -> Dict[str, np.ndarray]:
+    """
+    Reduce a trade frame to sums over every ``window``-trade window.
+
+    Window i covers rows [i*step, i*step + window). Additive columns come from
+    prefix-sum differences. Risk min/max come from a sparse table, and the
+    per-window outsized-loss count from range counting against each window's
+    own threshold, so no window is ever materialized.
+
+    Args:
+        frame: Output of trades_to_frame(), in chronological order
+        window: Trades per window (windows are only produced when the frame
+            has at least this many rows)
+        step: Rows between consecutive window starts
+        sigma_loss: Outsized-loss sigma multiplier
+
+    Returns:
+        Dictionary of float arrays, one entry per window, plus "start"
+        (first row of each window)
+    """
+    n = len(frame)
+    starts = np.arange(0, max(n - window + 1, 0), step)
+    ends = starts + window
+
+    sums: Dict[str, np.ndarray] = {"start": starts}
+    for key, values in _additive_columns(frame).items():
+        prefix = np.concatenate(([0.0], np.cumsum(values)))
+        sums[key] = prefix[ends] - prefix[starts]
+
+    if not starts.size:
+        for key in ("risk_min", "risk_max", "outsized"):
+            sums[key] = np.empty(0)
+        return sums
+
+    risk = frame["risk_points"].to_numpy()
+    has_risk = ~np.isnan(risk)
+    sums["risk_min"] = _window_extreme(np.where(has_risk, risk, np.inf), starts, window, np.minimum)
+    sums["risk_max"] = _window_extreme(np.where(has_risk, risk, -np.inf), starts, window, np.maximum)
+
+    _, _, threshold = _loss_thresholds(sums, sigma_loss)
+    loss_value = frame["loss_value"].to_numpy()
+    outsized = _count_above_before(loss_value, threshold, ends) - _count_above_before(loss_value, threshold, starts)
+    sums["outsized"] = outsized.astype(float)
+    return sums
+
+
+def derive_window_stats(sums: Dict[str, np.ndarray], sigma_loss: float = 1.0, vr: float = 0.35) -> List[Dict[str, Any]]:
+    """
+    Turn per-group (or per-window) sums into stats dicts.
+
+    Field names and rounding follow calculate_breakeven_stats(),
+    calculate_outsized_loss_stats() and
+    calculate_risk_sizing_consistency_stats(); the order-statistic fields
+    (median, MAD) and per-trade lists are omitted.
+
+    Returns:
+        One dict per group with total_trades, clean_trade_rate,
+        mistake_counts, breakeven, outsized_loss and risk_sizing
+    """
+    trades = sums["trades"]
+    wins, losses = sums["wins"], sums["losses"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(trades > 0, wins / trades, 0.0)
+        avg_win = np.where(wins > 0, sums["win_sum"] / wins, 0.0)
+        avg_loss = np.where(losses > 0, sums["loss_sum"] / losses, 0.0)
+        payoff = np.where(avg_loss > 0, avg_win / avg_loss, 0.0)
+        expectancy = win_rate * avg_win - (1 - win_rate) * avg_loss
+
+        has_loss = avg_loss > 0
+        breakeven_wr = np.where(has_loss, avg_loss / (avg_win + avg_loss) + 0.01, 0.0)
+        delta = np.where(has_loss, win_rate - breakeven_wr, 0.0)
+        category = np.select(
+            [~has_loss, delta >= 0.02, delta > 0, delta >= -0.02],
+            ["insufficient_data", "comfortably_above", "just_above", "around"],
+            "below",
+        )
+
+        mean_loss, std_loss, threshold = _loss_thresholds(sums, sigma_loss)
+        losers = sums["lv_n"]
+        outsized_pct = np.where(losers > 0, 100 * sums["outsized"] / losers, 0.0)
+
+        risk_n = sums["risk_n"]
+        enough_risk = risk_n >= 2
+        mean_risk = np.where(enough_risk, sums["risk_sum"] / risk_n, 0.0)
+        std_risk = np.sqrt(np.maximum(np.where(enough_risk, sums["risk_sq"] / risk_n - mean_risk ** 2, 0.0), 0.0))
+        cv = np.where(mean_risk > 0, std_risk / mean_risk, 0.0)
+        clean_rate = np.where(trades > 0, sums["clean"] / trades, 0.0)
+
+    mistake_keys = [k for k in sums if k.startswith(MISTAKE_PREFIX)]
+
+    records = []
+    for i in range(trades.size):
+        required_raw = float(breakeven_wr[i]) - 0.01 if has_loss[i] else None
+        consistent = bool(enough_risk[i] and cv[i] < vr)
+        records.append({
+            "total_trades": int(trades[i]),
+            "clean_trade_rate": round(float(clean_rate[i]), 2),
+            "mistake_counts": {
+                k[len(MISTAKE_PREFIX):]: int(sums[k][i]) for k in mistake_keys if sums[k][i]
+            },
+            "breakeven": {
+                "winning_trades": int(wins[i]),
+                "losing_trades": int(losses[i]),
+                "win_rate": round(float(win_rate[i]), 4),
+                "avg_win": round(float(avg_win[i]), 2),
+                "avg_loss": round(float(avg_loss[i]), 2),
+                "payoff_ratio": round(float(payoff[i]), 2),
+                "expectancy": round(float(expectancy[i]), 2),
+                "breakeven_win_rate": round(float(breakeven_wr[i]), 4),
+                "required_wr_adj": round(required_raw * 1.01, 2) if required_raw is not None else None,
+                "delta": round(float(delta[i]), 4),
+                "performance_category": str(category[i]),
+            },
+            "outsized_loss": {
+                "total_losing_trades": int(losers[i]),
+                "outsized_loss_count": int(sums["outsized"][i]),
+                "mean_loss": round(float(mean_loss[i]), 2),
+                "std_loss": round(float(std_loss[i]), 2),
+                "threshold": round(float(threshold[i]), 2) if losers[i] else 0.0,
+                "outsized_percent": round(float(outsized_pct[i]), 1),
+                "sigma_used": sigma_loss,
+            },
+            "risk_sizing": {
+                "trades_with_risk_data": int(risk_n[i]),
+                "mean_risk": round(float(mean_risk[i]), 2),
+                "std_dev_risk": round(float(std_risk[i]), 2),
+                "min_risk": round(float(sums["risk_min"][i]), 2) if enough_risk[i] else 0.0,
+                "max_risk": round(float(sums["risk_max"][i]), 2) if enough_risk[i] else 0.0,
+                "risk_variation_ratio": round(float(cv[i]), 2),
+                "variation_threshold": vr,
+                "is_consistent": consistent,
+                "consistency_level": (
+                    "insufficient_data" if not enough_risk[i] else "consistent" if consistent else "inconsistent"
+                ),
+            },
+        })
+    return records
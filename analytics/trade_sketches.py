@@ -0,0 +1,72 @@
+"""
+Loss and risk sketches kept for one analyzed dataset.
+
+A trade's loss value and risk points don't depend on any threshold, so the
+sketches of a dataset stay valid when trades are re-tagged with new
+thresholds, and an upload that extends a cached one only appends its new
+trades to the cached sketches. They feed the tagging thresholds of the
+outsized-loss and excessive-risk detectors and, under ROBUST_STATS=sketch,
+the statistics endpoints.
+"""
+import copy
+from typing import Callable, List
+
+from models.trade import Trade
+from analytics.sketches import SymbolSketches
+from analytics.outsized_loss_analyzer import build_loss_sketches
+from analytics.excessive_risk_analyzer import build_risk_sketches
+
+
+def _loss_key(trade: Trade):
+    return trade.symbol, trade.pnl, trade.points_lost
+
+
+def _risk_key(trade: Trade):
+    return trade.symbol, trade.risk_points
+
+
+def _appended(
+    sketches: SymbolSketches,
+    build: Callable[[List[Trade]], SymbolSketches],
+    key: Callable[[Trade], tuple],
+    covered: List[Trade],
+    trades: List[Trade],
+) -> SymbolSketches:
+    n = len(covered)
+    if len(trades) >= n and [key(t) for t in covered] == [key(t) for t in trades[:n]]:
+        return copy.deepcopy(sketches).merge(build(trades[n:]))
+    return build(trades)
+
+
+class TradeSketches:
+    """
+    Per-dataset and per-symbol sketches of loss values and risk points.
+
+    Attributes:
+        losses: build_loss_sketches() of the trades
+        risk: build_risk_sketches() of the trades
+    """
+
+    __slots__ = ("losses", "risk")
+
+    def __init__(self, losses: SymbolSketches, risk: SymbolSketches):
+        self.losses = losses
+        self.risk = risk
+
+    @classmethod
+    def build(cls, trades: List[Trade]) -> "TradeSketches":
+        return cls(build_loss_sketches(trades), build_risk_sketches(trades))
+
+    def loss_sketches_for(self, covered: List[Trade], trades: List[Trade]) -> SymbolSketches:
+        """
+        Loss sketches of ``trades``, given these sketches cover ``covered``.
+
+        When ``trades`` starts with the same losses as ``covered``, only the
+        remaining trades are sketched and merged into a copy; otherwise the
+        sketches are rebuilt. The copy leaves this object untouched.
+        """
+        return _appended(self.losses, build_loss_sketches, _loss_key, covered, trades)
+
+    def risk_sketches_for(self, covered: List[Trade], trades: List[Trade]) -> SymbolSketches:
+        """Risk sketches of ``trades``, as loss_sketches_for() (risk points must be set)."""
+        return _appended(self.risk, build_risk_sketches, _risk_key, covered, trades)
@@ -1,17 +1,26 @@
-from flask import Flask, request, jsonify, abort
+from flask import Flask, Response, request, jsonify, abort
 from flask_cors import CORS, cross_origin
 
 from dataclasses import asdict
 from errors import init_error_handlers, error_response
-
-from models.trade import Trade
+from http_cache import conditional_get, bump_dataset_version, dataset_version
+from compression import init_compression
+from serialization import requested_format, trades_response
+from cohort_store import CohortStore, dataset_id
+from jobs import JobQueue, FAILED
+from analysis_cache import AnalysisCache, CachedAnalysis
+from uploads import MB, body_limit, map_upload, open_upload, release_upload
+from shared_datasets import SharedDatasetStore, default_prefix, private_dir
+
+from models.trade import Trade, assign_trade_ids
 from parsing.order_loader import load_orders
-from analytics.trade_counter import count_trades
-from analytics.mistake_analyzer import analyze_all_mistakes, calculate_summary_stats
+from parsing.contract_specs import load_contract_specs, point_values_for
+from analytics.parallel import analyze_orders
+from analytics.incremental import extend_analysis, project_orders_for_prefix
+from analytics.mistake_analyzer import analyze_all_mistakes, calculate_summary_stats, project_orders_for_detectors
 from insights.summary_insight import generate_summary_insight
-from analytics.breakeven_analyzer import calculate_breakeven_stats
 from insights.breakeven_insight import generate_breakeven_insight
-from insights.insights_report import generate_insights_report
+from insights.insights_report import generate_insights_report, InsightCache
 from analytics.outsized_loss_analyzer import calculate_outsized_loss_stats
 from insights.outsized_loss_insight import generate_outsized_loss_insight
 from analytics.risk_sizing_analyzer import calculate_risk_sizing_consistency_stats
@@ -19,12 +28,21 @@ from insights.risk_sizing_insight import generate_risk_sizing_insight
 from analytics.stop_loss_analyzer import calculate_stop_loss_stats
 from insights.stop_loss_insight import generate_stop_loss_insight
 from analytics.excessive_risk_analyzer import calculate_excessive_risk_stats
+from analytics.trade_sketches import TradeSketches
 from insights.excessive_risk_insight import generate_excessive_risk_insight
-from analytics.goal_tracker import generate_goal_report, get_clean_streak_stats, evaluate_goal
+from analytics.goal_tracker import generate_goal_report, evaluate_goal, generate_goal_timeline
+from analytics.goal_index import GoalIndex
+from analytics.aggregates import calculate_trade_aggregates
+from analytics.trade_frame import trades_to_frame
+from analytics.timeseries_analyzer import calculate_period_stats, calculate_rolling_stats
+from analytics.breakdown_analyzer import calculate_breakdown_stats, DEFAULT_TZ
+from analytics.cohort_metrics import calculate_cohort_metrics, COHORT_METRICS
 from mentor.mentor_blueprint import mentor_bp, init_mentor_service
 
 import io
+import json
 import statistics
+import threading
 import pandas as pd
 import os
 
@@ -46,9 +64,13 @@ CORS(
 )
 
 init_error_handlers(app)
+init_compression(app)
 
 trade_objs = []
 order_df = None  # Add global order_df variable
+current_dataset_id = None  # BLAKE2b of the last analyzed upload
+trade_sketches = None  # (trade list key, TradeSketches of trade_objs)
+data_tz = None  # time zone of the last upload's wall-clock timestamps
 
 # Initialize mentor data service with getters that access our globals
 # This must happen AFTER trade_objs and order_df are defined
@@ -59,9 +81,64 @@ def get_trade_objs():
 def get_order_df():
     return globals()['order_df']
 
+# ---------------------------------------------------------------------------
+# Structures derived from the current dataset (e.g. the goal index). Built on
+# first use and rebuilt once the dataset version moves on. The cached entry
+# holds a reference to the trade list so its id() can't be reused.
+# ---------------------------------------------------------------------------
+
+_dataset_cache = {}
+
+def _dataset_cached(name, build):
+    key = (dataset_version(), id(trade_objs))
+    entry = _dataset_cache.get(name)
+    if entry is None or entry[0] != key:
+        entry = _dataset_cache[name] = (key, build(), trade_objs)
+    return entry[1]
+
+def _goal_index():
+    return _dataset_cached("goal_index", lambda: GoalIndex(trade_objs))
+
+def _aggregates():
+    return _dataset_cached("aggregates", lambda: calculate_trade_aggregates(trade_objs, _goal_index()))
+
+def _trade_frame():
+    return _dataset_cached("trade_frame", lambda: trades_to_frame(trade_objs, data_tz or INGEST_TZ))
+
+def _insight_cache():
+    return _dataset_cached("insights", InsightCache)
+
+def _trades_key(trades):
+    return (len(trades), id(trades[0]), id(trades[-1])) if trades else (0,)
+
+def _trade_sketches():
+    """TradeSketches of the current trades. Kept across re-tags (unlike
+    _dataset_cached entries), since loss values and risk points don't depend
+    on the thresholds; rebuilt when the trades themselves are replaced."""
+    global trade_sketches
+    key = _trades_key(trade_objs)
+    if trade_sketches is None or trade_sketches[0] != key:
+        trade_sketches = (key, TradeSketches.build(trade_objs))
+    return trade_sketches[1]
+
+def _stat_sketch(kind, symbol=None):
+    """Loss or risk DistributionSketch for the current trades, or None when
+    ROBUST_STATS asks for exact statistics."""
+    if ROBUST_STATS != "sketch":
+        return None
+    sketches = _trade_sketches()
+    return (sketches.losses if kind == "losses" else sketches.risk).get(symbol)
+
+def get_thresholds():
+    return dict(globals()['THRESHOLDS'])
+
 init_mentor_service(
     trade_objs_getter=get_trade_objs,
-    order_df_getter=get_order_df
+    order_df_getter=get_order_df,
+    goal_index_getter=_goal_index,
+    thresholds_getter=get_thresholds,
+    insight_cache_getter=_insight_cache,
+    trade_frame_getter=_trade_frame,
 )
 
 # ---------------------------------------------------------------------------
@@ -81,6 +158,75 @@ THRESHOLDS = {
     "vr": 0.35,
 }
 
+# ---------------------------------------------------------------------------
+# PnL units. "points" (default) keeps pnl as price points × quantity, which is
+# what every insight narrative reports. "dollars" multiplies by each
+# contract's point value so mixed-instrument accounts (e.g. ES + MES) compare
+# like with like. Contract specs are loaded once per process.
+# ---------------------------------------------------------------------------
+
+PNL_UNITS = os.environ.get("PNL_UNITS", "points")
+CONTRACT_SPECS = load_contract_specs()
+
+# How much of the uploaded order frame to keep after /api/analyze.
+# "projected" (default) keeps only the stop orders, fills and columns the
+# stop-loss / risk-sizing detectors re-read on /api/settings; "full" keeps the
+# raw frame as loaded.
+ORDER_RETENTION = os.environ.get("ORDER_RETENTION", "projected")
+
+# Time zone of the wall-clock timestamps in uploaded order files, unless
+# /api/analyze is given ?tz=. The broker format is detected from the header
+# unless ?broker= (ninjatrader | tradovate | rithmic) names it.
+INGEST_TZ = os.environ.get("INGEST_TZ", "America/New_York")
+
+# CSV reader for uploads: "c" (default, pandas' parser) or "pyarrow"
+# (multithreaded, typed columns, native timestamp parsing; falls back to "c"
+# when pyarrow isn't installed). Both produce the same order frame.
+CSV_ENGINE = os.environ.get("CSV_ENGINE", "c")
+
+# How the outsized-loss and excessive-risk endpoints get mean/std/median/MAD.
+# "exact" (default) recomputes them from the trade list per request; "sketch"
+# reads per-dataset, per-symbol streaming sketches (Welford + KLL) built once
+# per dataset, trading an approximate median/MAD for large histories.
+ROBUST_STATS = os.environ.get("ROBUST_STATS", "exact")
+
+# Worker processes for /api/analyze. Above 1, multi-symbol uploads have trade
+# reconstruction, stop-loss tagging and risk sizing run per symbol on a
+# process pool (analytics/parallel.py); 1 (default) analyzes in-process.
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", "1"))
+
+# Background uploads (/api/analyze?async=1) may be up to ASYNC_MAX_MB, since
+# they don't hold a request worker while they run.
+ASYNC_MAX_MB = int(os.environ.get("ASYNC_MAX_MB", "50"))
+
+# Analyzed uploads by content hash + parameters (analysis_cache.py): an
+# identical re-upload is served from here, and one that extends a cached file
+# only has its new rows analyzed. Under ORDER_RETENTION=projected an entry
+# keeps only the order rows and columns that extending it reads.
+# ANALYSIS_CACHE_SIZE=0 disables it.
+ANALYSIS_CACHE = AnalysisCache(int(os.environ.get("ANALYSIS_CACHE_SIZE", "4")))
+
+# Analyzed datasets shared between gunicorn workers (shared_datasets.py): the
+# worker that analyzes an upload publishes it in /dev/shm, and the others
+# attach to it read-only before their next request, instead of each serving
+# only what it analyzed itself. gunicorn.conf.py sets SHARED_DATASETS=1.
+SHARED_DATASETS = SharedDatasetStore(default_prefix()) if os.environ.get("SHARED_DATASETS", "0") == "1" else None
+_shared_seq = None  # the publication this worker's dataset matches
+
+# /api/analyze?async=1 returns a job id at once and analyzes on this queue
+# (one job at a time; see _run_analysis). With SHARED_DATASETS, job records
+# go to the shared datasets' private directory, so any worker can
+# answer /api/jobs/<id> for a job another worker runs.
+JOBS = JobQueue(
+    workers=1,
+    directory=private_dir(os.path.join(SHARED_DATASETS.path, "jobs"))
+    if SHARED_DATASETS is not None else None,
+)
+
+# Summary metrics of every analyzed upload, for /api/cohort percentile bands.
+# In-memory unless COHORT_STORE_PATH names a JSON file to persist them in.
+COHORT = CohortStore(os.environ.get("COHORT_STORE_PATH"))
+
 # ---- Helper functions (CSV gate) ----
 ALLOWED_EXT = {".csv"}
 MAX_MB = 2  # MB
@@ -88,17 +234,238 @@ MAX_MB = 2  # MB
 def _is_allowed(filename: str) -> bool:
     return filename.lower().endswith(tuple(ALLOWED_EXT))
 
-def _size_ok(file_storage) -> bool:
-    file_storage.seek(0, io.SEEK_END)
-    ok = file_storage.tell() <= MAX_MB * 1024 * 1024
-    file_storage.seek(0)
-    return ok
+def _is_async() -> bool:
+    return request.args.get("async", "").lower() in ("1", "true", "yes")
+
+def _upload_limit_mb() -> int:
+    """Upload size limit for this request: 2 MB, or ASYNC_MAX_MB for background jobs."""
+    return ASYNC_MAX_MB if _is_async() else MAX_MB
+
+def _too_large(limit_mb: int):
+    return error_response(413, f"This file exceeds the {limit_mb} MB size limit.")
+
+# Werkzeug stops reading a request body past this (413). Only background
+# uploads get the larger ASYNC_MAX_MB cap, set per request below.
+app.config["MAX_CONTENT_LENGTH"] = body_limit(MAX_MB)
+
+@app.before_request
+def _limit_request_body():
+    request.max_content_length = body_limit(_upload_limit_mb())
+
+@app.errorhandler(413)
+def handle_too_large(exc):
+    return _too_large(_upload_limit_mb())
 
 # ---- Main route ----
+class AnalysisError(Exception):
+    """An upload that can't be analyzed; reported as a 400 with this message."""
+    status_code = 400
+
+
+# An analysis replaces the module-level dataset; one runs at a time.
+_analysis_lock = threading.Lock()
+
+
+def _share_dataset():
+    """Publish the current dataset for the other workers. Caller holds _analysis_lock."""
+    global _shared_seq
+    if SHARED_DATASETS is not None and current_dataset_id is not None:
+        _shared_seq = SHARED_DATASETS.publish(
+            current_dataset_id, trade_objs, order_df,
+            {"tz": data_tz, "thresholds": dict(THRESHOLDS)},
+        )
+
+
+@app.before_request
+def _attach_shared_dataset():
+    """Switch to a dataset another worker has published since this one's."""
+    global order_df, current_dataset_id, data_tz, _shared_seq
+    if SHARED_DATASETS is None:
+        return
+    current = SHARED_DATASETS.current()
+    if current is None or current[1] == _shared_seq:
+        return
+    with _analysis_lock:
+        shared = SHARED_DATASETS.attach()
+        if shared is None or shared.seq == _shared_seq:
+            return
+        trade_objs.clear()
+        trade_objs.extend(shared.trades)
+        order_df = shared.orders
+        current_dataset_id = shared.dataset_id
+        data_tz = shared.meta.get("tz")
+        THRESHOLDS.update(shared.meta.get("thresholds", {}))
+        _shared_seq = shared.seq
+        bump_dataset_version()
+
+
+def _run_analysis(data, params, stage=lambda name: None):
+    """
+    Parse, reconstruct, tag and summarize an uploaded order file, then
+    publish it as the current dataset.
+
+    Args:
+        data: The CSV upload as bytes or a memory map (see uploads.py)
+        params: The request's query parameters (broker, tz, sigma, ...)
+        stage: Called with each stage name as the analysis reaches it
+
+    Returns:
+        (trades, cache_status, body): the trades and body for
+        trades_response(), and how ANALYSIS_CACHE served the upload
+        ("hit", "prefix" or "miss")
+
+    Raises:
+        AnalysisError: the file can't be parsed or lacks required columns
+    """
+    global trade_objs, order_df, current_dataset_id, data_tz, trade_sketches  # Add order_df to global declaration
+
+    with _analysis_lock:
+        stage("parsing")
+        upload_id = dataset_id(data)
+        broker = params.get("broker")
+        tz = params.get("tz", INGEST_TZ)
+
+        # Read thresholds, allowing per-request override via query-params
+        sigma      = float(params.get("sigma", THRESHOLDS["sigma_loss"]))
+        sigma_risk = float(params.get("sigma_risk", THRESHOLDS["sigma_risk"]))
+        k          = float(params.get("k", THRESHOLDS["k"]))
+
+        # Everything besides the bytes that the analysis depends on.
+        cache_params = (broker, tz, sigma, sigma_risk, k, PNL_UNITS)
+        cached = ANALYSIS_CACHE.get(upload_id, cache_params)
+        base = None if cached else ANALYSIS_CACHE.find_prefix(data, cache_params)
+
+        if cached:
+            cache_status = "hit"
+            order_df, trades, sketches = cached.orders, cached.trades, cached.sketches
+            csv_rows = cached.rows
+        else:
+            try:
+                if base:
+                    # Parse only the rows after the cached file, under its header.
+                    header = data[:data.find(b"\n") + 1]
+                    tail_df = load_orders(io.BytesIO(header + data[base.size:]),
+                                          broker=base.orders.attrs["broker"], tz=tz, engine=CSV_ENGINE)
+                else:
+                    order_df = load_orders(open_upload(data), broker=broker, tz=tz, engine=CSV_ENGINE)
+            except pd.errors.ParserError:
+                raise AnalysisError("This CSV format is not recognized.") from None
+            except ValueError as exc:
+                raise AnalysisError(str(exc)) from None
+            except KeyError as exc:
+                # exc.args[0] will be like "Missing columns: fill_ts"
+                msg = exc.args[0]
+                # Map internal names to original CSV headers for friendlier output
+                col_map = {
+                    "fill_ts": "Fill Time",
+                    "ts": "Timestamp",
+                    "qty": "filledQty",
+                    "side": "B/S",
+                    "symbol": "Contract",
+                    "price": "Avg Fill Price",
+                }
+                for internal, original in col_map.items():
+                    msg = msg.replace(internal, original)
+                raise AnalysisError(f"This file is missing required columns:\n{msg}") from None
+
+            symbols = (base.orders["symbol"], tail_df["symbol"]) if base else (order_df["symbol"],)
+            print("Loaded columns:", list((tail_df if base else order_df).columns))
+
+            point_values = None
+            if PNL_UNITS == "dollars":
+                point_values = point_values_for(pd.concat(symbols).dropna().unique(), CONTRACT_SPECS)
+
+            # 3) Reconstruct trades (pnl/points_lost set) and tag all mistake types
+            #    (stop-loss + outsized loss + revenge + risk sizing + excessive risk)
+            stage("analyzing")
+            if base:
+                cache_status = "prefix"
+                order_df, trades, _, sketches = extend_analysis(
+                    base.orders, base.trades, tail_df, point_values, sigma, k, sigma_risk, base.sketches,
+                )
+                csv_rows = base.rows + len(tail_df)
+            else:
+                cache_status = "miss"
+                trades = analyze_orders(order_df, point_values, sigma, k, sigma_risk, workers=ANALYSIS_WORKERS)
+                sketches = TradeSketches.build(trades)
+                csv_rows = len(order_df)
+            assign_trade_ids(trades, upload_id)
+            if ORDER_RETENTION == "projected":
+                # The cache keeps only what extending this upload reads.
+                order_df = project_orders_for_prefix(order_df)
+            ANALYSIS_CACHE.put(CachedAnalysis(upload_id, len(data), cache_params, order_df, trades, sketches, csv_rows))
+
+        trade_objs.clear()
+        trade_objs.extend(t for t in trades if isinstance(t, Trade))
+        if len(trade_objs) != len(trades):
+            print(f"Warning: {len(trades) - len(trade_objs)} non-Trade items skipped")
+        trade_sketches = (_trades_key(trade_objs), sketches)
+
+        stage("summarizing")
+        if ORDER_RETENTION == "projected":
+            # Release the raw frame; only the detector projection stays resident.
+            order_df = project_orders_for_detectors(order_df)
+
+        # 4) Compute mistake counts by type
+        mistake_counts     = {}
+        for t in trade_objs:
+            for m in t.mistakes:
+                mistake_counts[m] = mistake_counts.get(m, 0) + 1
+        total_mistakes     = sum(mistake_counts.values())
+
+        # 5) Count trades with >=1 mistake
+        trades_with_mistakes = sum(1 for t in trade_objs if t.mistakes)
+
+        # 6) Compute clean trade rate (trades without mistakes / total)
+        clean_trade_rate   = round((len(trade_objs) - trades_with_mistakes) / len(trade_objs), 2)
+
+        current_dataset_id = upload_id
+        data_tz = order_df.attrs.get("tz", INGEST_TZ)
+        COHORT.add(upload_id, calculate_cohort_metrics(trade_objs, sigma, THRESHOLDS["vr"]))
+
+        bump_dataset_version()
+        _share_dataset()
+
+        # 7) Build payload
+        return list(trade_objs), cache_status, {
+            "meta": {
+                "csvRows":            csv_rows,
+                "tradesDetected":     len(trade_objs),
+                "flaggedTrades":      trades_with_mistakes,
+                "totalMistakes":      total_mistakes,
+                "mistakeCounts":      mistake_counts,
+                "cleanTradeRate":     clean_trade_rate,
+                "sigmaUsed":          sigma,
+                "datasetId":          upload_id,
+            },
+        }
+
+
+def _analysis_job(job, data, params):
+    """JobQueue entry point for an ``async`` upload. The result is plain JSON
+    (trades as to_dict()), since other workers may read it from the job's record."""
+    try:
+        trades, cache_status, body = _run_analysis(data, params, job.stage)
+    finally:
+        release_upload(data)
+    return {"cacheStatus": cache_status, "body": body, "trades": [t.to_dict() for t in trades]}
+
+
+def _job_links(job):
+    base = f"/api/jobs/{job.id}"
+    return {"self": base, "events": f"{base}/events", "result": f"{base}/result"}
+
+
 @app.route("/api/analyze", methods=["POST"])
 @cross_origin()
 def analyze():
-    global trade_objs, order_df  # Add order_df to global declaration
+    fmt = requested_format()
+    run_async = _is_async()
+    limit = _upload_limit_mb()
+
+    # Refuse an oversized body from its Content-Length, before reading it.
+    if request.content_length is not None and request.content_length > body_limit(limit):
+        return _too_large(limit)
 
     if "file" not in request.files:
         return error_response(400, "No file part")
@@ -109,222 +476,157 @@ def analyze():
     if not _is_allowed(f.filename):
         return error_response(400, "TradeHabit only works with the CSV file format.")
 
-    # Validate file size (≤2 MB)
-    if not _size_ok(f):
-        return error_response(400, "This file exceeds the 2 MB size limit.")
+    # Validate file size (≤2 MB, or ASYNC_MAX_MB for background jobs)
+    data = map_upload(f.stream)
+    if len(data) > limit * MB:
+        release_upload(data)
+        return _too_large(limit)
+
+    params = request.args.to_dict()
+    if run_async:
+        # The mapping outlives the request's temp file; the job releases it.
+        job = JOBS.submit(_analysis_job, data, params)
+        resp = jsonify({**job.to_dict(), "links": _job_links(job)})
+        resp.status_code = 202
+        resp.headers["Location"] = _job_links(job)["self"]
+        return resp
 
     try:
-        order_df = load_orders(f)  # Store the DataFrame globally
-    except pd.errors.ParserError:
-        return error_response(400, "This CSV format is not recognized.")
-    except KeyError as exc:
-        # exc.args[0] will be like "Missing columns: fill_ts"
-        msg = exc.args[0]
-        # Map internal names to original CSV headers for friendlier output
-        col_map = {
-            "fill_ts": "Fill Time",
-            "ts": "Timestamp",
-            "qty": "filledQty",
-            "side": "B/S",
-            "symbol": "Contract",
-            "price": "Avg Fill Price",
-        }
-        for internal, original in col_map.items():
-            msg = msg.replace(internal, original)
-        return error_response(400, f"This file is missing required columns:\n{msg}")
-    print("Loaded columns:", list(order_df.columns))
-
-    trades, _ = count_trades(order_df)  # list[Trade]
-    trade_objs.clear()
-    trade_objs.extend(t for t in trades if isinstance(t, Trade))
-    if len(trade_objs) != len(trades):
-        print(f"Warning: {len(trades) - len(trade_objs)} non-Trade items skipped")
-
-    # 1) Compute PnL and points_lost for each trade
-    for t in trade_objs:
-        direction    = 1 if t.side.lower() == "buy" else -1
-        raw_points   = t.exit_price - t.entry_price
-
-        # total dollar PnL (price difference × qty)
-        t.pnl         = round(raw_points * direction * t.exit_qty, 2)
-
-        # points lost (for loss‐consistency chart)
-        t.points_lost = abs(round(raw_points * direction, 2))
-
-    # Read thresholds, allowing per-request override via query-params
-    sigma      = float(request.args.get("sigma", THRESHOLDS["sigma_loss"]))
-    sigma_risk = float(request.args.get("sigma_risk", THRESHOLDS["sigma_risk"]))
-    k          = float(request.args.get("k", THRESHOLDS["k"]))
-
-    # 3) Tag all mistake types (stop‐loss + outsized loss + revenge + excessive risk)
-    analyze_all_mistakes(trade_objs, order_df, sigma, k, sigma_risk)
-
-    # 4) Compute mistake counts by type
-    mistake_counts     = {}
-    for t in trade_objs:
-        for m in t.mistakes:
-            mistake_counts[m] = mistake_counts.get(m, 0) + 1
-    total_mistakes     = sum(mistake_counts.values())
-
-    # 5) Count trades with >=1 mistake
-    trades_with_mistakes = sum(1 for t in trade_objs if t.mistakes)
-
-    # 6) Compute clean trade rate (trades without mistakes / total)
-    clean_trade_rate   = round((len(trade_objs) - trades_with_mistakes) / len(trade_objs), 2)
-
-    # 7) Build and return payload
-    payload = {
-        "meta": {
-            "csvRows":            len(order_df),
-            "tradesDetected":     len(trade_objs),
-            "flaggedTrades":      trades_with_mistakes,
-            "totalMistakes":      total_mistakes,
-            "mistakeCounts":      mistake_counts,
-            "cleanTradeRate":     clean_trade_rate,
-            "sigmaUsed":          sigma
-        },
-        "trades": [t.to_dict() for t in trade_objs],
-    }
-    return jsonify(payload)
+        trades, cache_status, body = _run_analysis(data, params)
+    except AnalysisError as exc:
+        return error_response(exc.status_code, str(exc))
+    finally:
+        release_upload(data)
+    resp = trades_response(trades, body, fmt)
+    resp.headers["X-Analysis-Cache"] = cache_status
+    return resp
+
+
+def _get_job(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        abort(404, f"Unknown job '{job_id}'")
+    return job
+
+
+@app.get("/api/jobs/<job_id>")
+def get_job(job_id):
+    """Status and stage history of an async analysis."""
+    job = _get_job(job_id)
+    return jsonify({**job.to_dict(), "links": _job_links(job)})
+
+
+@app.get("/api/jobs/<job_id>/events")
+def get_job_events(job_id):
+    """Server-sent events: one ``stage`` event per stage, ending when the job finishes."""
+    job = _get_job(job_id)
+
+    def stream():
+        for event in job.follow():
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: stage\ndata: {json.dumps(event)}\n\n"
+
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/api/jobs/<job_id>/result")
+def get_job_result(job_id):
+    """The /api/analyze response of a finished job (202 with its status while it runs)."""
+    job = _get_job(job_id)
+    if job.status == FAILED:
+        return error_response(job.error["status"], job.error["message"])
+    if not job.finished:
+        resp = jsonify({**job.to_dict(), "links": _job_links(job)})
+        resp.status_code = 202
+        return resp
+    result = job.result
+    trades = [Trade.from_dict(t) for t in result["trades"]]
+    resp = trades_response(trades, result["body"], requested_format())
+    resp.headers["X-Analysis-Cache"] = result["cacheStatus"]
+    return resp
 
-@app.get("/api/summary")
-def get_summary():
+# ---------------------------------------------------------------------------
+# Section builders. Each per-section endpoint and /api/dashboard share these,
+# so a section's JSON is identical whichever route served it.
+# ---------------------------------------------------------------------------
+
+def _build_summary(trades, aggs):
     """
     High-level dashboard summary.
     Includes: success rate, streaks, payoff stats, and
     a headline diagnostic chosen from a risk-weighted decision tree.
     """
-    global trade_objs
-    if not trade_objs:
-        abort(400, "No trades have been analyzed yet")
-
-    total_trades = len(trade_objs)
-
-    # ---------- 1) basic mistake tallies ----------
-    mistake_counts: dict[str, int] = {}
-    for t in trade_objs:
-        for m in t.mistakes:
-            mistake_counts[m] = mistake_counts.get(m, 0) + 1
-    total_mistakes = sum(mistake_counts.values())
-
-    # Number of trades that have at least one mistake
-    flagged_trades = sum(1 for t in trade_objs if t.mistakes)
+    total_trades = aggs["total_trades"]
+    mistake_counts = aggs["mistake_counts"]
+    flagged_trades = aggs["flagged_trades"]
 
-    # ---------- 2) headline success metrics ----------
-    clean_trade_rate = round((total_trades - flagged_trades) / total_trades, 2)
-
-    # streaks
-    current_streak, best_streak = get_clean_streak_stats(trade_objs)
-
-    # ---------- 3) payoff & win-rate stats ----------
-    # Get all breakeven stats from the analyzer
-    breakeven_stats = calculate_breakeven_stats(trade_objs)
-    
+    # ---------- payoff & win-rate stats ----------
+    breakeven_stats = aggs["breakeven_stats"]
     win_rate         = round(breakeven_stats["win_rate"], 2)
-    avg_win          = breakeven_stats["avg_win"]
-    avg_loss         = breakeven_stats["avg_loss"]
-    payoff_ratio     = breakeven_stats["payoff_ratio"]
-    expectancy       = breakeven_stats["expectancy"]
     required_wr_adj  = breakeven_stats["required_wr_adj"]
-    win_count        = breakeven_stats["winning_trades"]
-    loss_count       = breakeven_stats["losing_trades"]
-
-    # ---------- 4) helper counters ----------
-    pct = lambda n: round(100 * n / total_trades, 1) if total_trades else 0.0
-    no_stop_pct        = mistake_counts.get("no stop-loss order", 0)
-    excess_risk_pct    = mistake_counts.get("excessive risk", 0)
-    outsized_loss_pct  = mistake_counts.get("outsized loss", 0)
-    revenge_count      = mistake_counts.get("revenge trade", 0)
-    no_stop_pct        = pct(mistake_counts.get("no stop-loss order", 0))
-    excess_risk_pct    = pct(mistake_counts.get("excessive risk", 0))
-    outsized_loss_pct  = pct(mistake_counts.get("outsized loss", 0))
-    revenge_count_pct  = pct(mistake_counts.get("revenge trade", 0))
-
-    # ---------- 5) risk-sizing variation ----------
-    risk_vals = [t.risk_points for t in trade_objs if t.risk_points is not None]
+
+    # ---------- risk-sizing variation ----------
+    risk_vals = [t.risk_points for t in trades if t.risk_points is not None]
     risk_var_flag = False
     if risk_vals:
         mean_risk = statistics.mean(risk_vals)
         std_risk  = statistics.pstdev(risk_vals) if len(risk_vals) > 1 else 0.0
         risk_var_flag = (std_risk / mean_risk) >= THRESHOLDS["vr"]
 
-    # ---------- 6) headline diagnostic (shared with insights) ----------
-    # Build stats dict for summary insight
+    # ---------- headline diagnostic (shared with insights) ----------
     summary_stats = {
         "total_trades": total_trades,
         "mistake_counts": mistake_counts,
         "trades_with_mistakes": flagged_trades,
-        "clean_trades": total_trades - flagged_trades,
+        "clean_trades": aggs["clean_trades"],
         "required_wr": required_wr_adj,
         "win_rate": win_rate,
         "risk_sizing_stats": {"is_consistent": not risk_var_flag}
     }
     summary_insight = generate_summary_insight(summary_stats)
-    summary_text = summary_insight.get("diagnostic", "")
 
-    # ---------- 7) response
-    return jsonify({
+    return {
         "total_trades":       total_trades,
-        "win_count":          win_count,
-        "loss_count":         loss_count,
-        "total_mistakes":     total_mistakes,
+        "win_count":          breakeven_stats["winning_trades"],
+        "loss_count":         breakeven_stats["losing_trades"],
+        "total_mistakes":     aggs["total_mistakes"],
         "flagged_trades":     flagged_trades,
-        "clean_trade_rate":   clean_trade_rate,
-        "streak_current":     current_streak,
-        "streak_record":      best_streak,
+        "clean_trade_rate":   aggs["clean_trade_rate"],
+        "streak_current":     aggs["streak_current"],
+        "streak_record":      aggs["streak_record"],
         "mistake_counts":     mistake_counts,
         "win_rate":           win_rate,
-        "average_win":        avg_win,
-        "average_loss":       avg_loss,
-        "payoff_ratio":       payoff_ratio,
-        "expectancy":         expectancy,
+        "average_win":        breakeven_stats["avg_win"],
+        "average_loss":       breakeven_stats["avg_loss"],
+        "payoff_ratio":       breakeven_stats["payoff_ratio"],
+        "expectancy":         breakeven_stats["expectancy"],
         "required_wr_adj":    required_wr_adj,
-        "diagnostic_text":    summary_text,
-    })
-
-@app.get("/api/trades")
-def get_trades():
-    global trade_objs
-
-    if not trade_objs:
-        abort(400, "No trades have been analyzed yet")
-
-    trades_list = [t.to_dict() for t in trade_objs]
-    if trades_list:
-        # Use the correct camelCase keys
-        entry_times = [t["entryTime"] for t in trades_list if t.get("entryTime")]
-        exit_times = [t["exitTime"] for t in trades_list if t.get("exitTime")]
-        start = min(entry_times) if entry_times else None
-        end = max(exit_times) if exit_times else None
-    else:
-        start = end = None
-
-    return jsonify({
-        "trades": trades_list,
-        "date_range": {
-            "start": start,
-            "end": end
-        }
-    })
+        "diagnostic_text":    summary_insight.get("diagnostic", ""),
+    }
 
-@app.get("/api/losses")
-def get_losses():
-    global trade_objs
 
-    if not trade_objs:
-        abort(400, "No trades have been analyzed yet")
+def _trades_date_range(trades):
+    # Use the correct camelCase keys
+    trades_list = [t.to_dict() for t in trades]
+    entry_times = [t["entryTime"] for t in trades_list if t.get("entryTime")]
+    exit_times = [t["exitTime"] for t in trades_list if t.get("exitTime")]
+    return {
+        "start": min(entry_times) if entry_times else None,
+        "end": max(exit_times) if exit_times else None,
+    }
 
-    sigma = float(request.args.get("sigma", THRESHOLDS["sigma_loss"]))
-    symbol = request.args.get("symbol", None)
 
+def _build_losses(trades, sigma, symbol=None, sketch=None):
     # 1) Filter to actual losing trades
     filtered = [
-        t for t in trade_objs
+        t for t in trades
         if t.pnl < 0 and (symbol is None or t.symbol == symbol)
     ]
 
     # 2) Calculate stats once
-    stats = calculate_outsized_loss_stats(filtered, sigma)
+    stats = calculate_outsized_loss_stats(filtered, sigma, sketch=sketch)
 
     # 3) Generate insight from stats
     insight = generate_outsized_loss_insight(stats)
@@ -347,74 +649,52 @@ def get_losses():
         })
 
     # 5) Return with all available stats
-    return jsonify({
-    "losses": loss_list,
-    "meanPointsLost": stats["mean_loss"],
-    "stdDevPointsLost": stats["std_loss"],
-    "thresholdPointsLost": stats["threshold"],
-    "sigmaUsed": sigma,
-    "symbolFiltered": symbol,
-    "diagnostic": insight["diagnostic"],
-    "count": stats["outsized_loss_count"],
-    "percentage": stats["outsized_percent"],
-    "excessLossPoints": stats["excess_loss_points"]
-})
-
-
-@app.get("/api/revenge")
-def get_revenge_stats():
-    global trade_objs
-    if not trade_objs:
-        abort(400, "No trades have been analyzed yet")
+    return {
+        "losses": loss_list,
+        "meanPointsLost": stats["mean_loss"],
+        "stdDevPointsLost": stats["std_loss"],
+        "thresholdPointsLost": stats["threshold"],
+        "sigmaUsed": sigma,
+        "symbolFiltered": symbol,
+        "diagnostic": insight["diagnostic"],
+        "count": stats["outsized_loss_count"],
+        "percentage": stats["outsized_percent"],
+        "excessLossPoints": stats["excess_loss_points"]
+    }
 
-    # 1) Read multiplier (default 1.0× median hold)
-    k = float(request.args.get("k", THRESHOLDS["k"]))
 
-    # 2) Clone and tag trades for revenge pattern
-    from copy import deepcopy
-    trades = deepcopy(trade_objs)
-    from analytics.revenge_analyzer import analyze_trades_for_revenge, calculate_revenge_stats
+def _build_revenge(trades, k):
+    # 1) Clone and tag trades for revenge pattern
+    from analytics.revenge_analyzer import retag_revenge_copies, calculate_revenge_stats
     from insights.revenge_insight import generate_revenge_insight
-    analyze_trades_for_revenge(trades, k)
+    cloned = retag_revenge_copies(trades, k)
 
-    # 3) Calculate stats once
-    stats = calculate_revenge_stats(trades)
+    # 2) Calculate stats once
+    stats = calculate_revenge_stats(cloned)
 
-    # 4) Generate insight from stats
+    # 3) Generate insight from stats
     insight = generate_revenge_insight(stats)
 
-    # 5) Return
-    return jsonify({
+    return {
         "revenge_multiplier":         k,
         "total_revenge_trades":       stats["revenge_count"],
-        "revenge_win_rate":           stats["revenge_win_rate"],
-        "average_win_revenge":        stats["revenge_avg_win"],
-        "average_loss_revenge":       stats["revenge_avg_loss"],
-        "payoff_ratio_revenge":       stats["revenge_payoff_ratio"],
-        "net_pnl_revenge":            stats["revenge_net_pnl"],
-        "net_pnl_per_trade_revenge":  stats["revenge_net_pnl_per_trade"],
-        "overall_win_rate":           stats["overall_win_rate"],
-        "overall_payoff_ratio":       stats["overall_payoff_ratio"],
+        "revenge_win_rate":           stats["win_rate_revenge"],
+        "average_win_revenge":        stats["avg_win_revenge"],
+        "average_loss_revenge":       stats["avg_loss_revenge"],
+        "payoff_ratio_revenge":       stats["payoff_ratio_revenge"],
+        "net_pnl_revenge":            stats["net_pnl_revenge"],
+        "net_pnl_per_trade_revenge":  stats["net_pnl_per_revenge"],
+        "overall_win_rate":           stats["win_rate_overall"],
+        "overall_payoff_ratio":       stats["payoff_ratio_overall"],
         "diagnostic":                 insight["diagnostic"]
-    })
-
-@app.get("/api/risk-sizing")
-def get_risk_sizing():
-    global trade_objs
-    if not trade_objs:
-        abort(400, "No trades have been analyzed yet")
-
-    # Query parameter (?vr=0.35) – coefficient of variation threshold
-    vr = float(request.args.get("vr", THRESHOLDS["vr"]))
+    }
 
-    # Calculate stats once
-    stats = calculate_risk_sizing_consistency_stats(trade_objs, vr)
 
-    # Generate insight from stats
+def _build_risk_sizing(trades, vr):
+    stats = calculate_risk_sizing_consistency_stats(trades, vr)
     insight = generate_risk_sizing_insight(stats)
 
-    # Return with all available stats
-    return jsonify({
+    return {
         "count": stats["trades_with_risk_data"],
         "minRiskPoints": stats["min_risk"],
         "maxRiskPoints": stats["max_risk"],
@@ -423,25 +703,14 @@ def get_risk_sizing():
         "variationRatio": stats["risk_variation_ratio"],
         "variationThreshold": vr,
         "diagnostic": insight["diagnostic"]
-    })
-
-@app.get("/api/excessive-risk")
-def get_excessive_risk_summary():
-    global trade_objs
-    if not trade_objs:
-        abort(400, "No trades have been analyzed yet")
-
-    # Get sigma multiplier from query (?sigma=...)
-    sigma = float(request.args.get("sigma", THRESHOLDS["sigma_risk"]))
+    }
 
-    # Calculate stats once
-    stats = calculate_excessive_risk_stats(trade_objs, sigma)
 
-    # Generate insight from stats
+def _build_excessive_risk(trades, sigma, sketch=None):
+    stats = calculate_excessive_risk_stats(trades, sigma, sketch=sketch)
     insight = generate_excessive_risk_insight(stats)
 
-    # Return with all available stats
-    return jsonify({
+    return {
         "totalTradesWithStops": stats["total_trades_with_stops"],
         "meanRiskPoints": stats["mean_risk"],
         "stdDevRiskPoints": stats["std_dev_risk"],
@@ -451,22 +720,14 @@ def get_excessive_risk_summary():
         "averageRiskAmongExcessive": stats["avg_excessive_risk"],
         "sigmaUsed": sigma,
         "diagnostic": insight["diagnostic"]
-    })
-
-@app.get("/api/stop-loss")
-def get_stop_loss_summary():
-    global trade_objs
-    if not trade_objs:
-        abort(400, "No trades have been analyzed yet")
+    }
 
-    # Calculate stats once
-    stats = calculate_stop_loss_stats(trade_objs)
 
-    # Generate insight from stats
+def _build_stop_loss(trades):
+    stats = calculate_stop_loss_stats(trades)
     insight = generate_stop_loss_insight(stats)
 
-    # Return with all available stats
-    return jsonify({
+    return {
         "totalTrades": stats["total_trades"],
         "tradesWithStops": stats["trades_with_stops"],
         "tradesWithoutStops": stats["trades_without_stops"],
@@ -474,35 +735,154 @@ def get_stop_loss_summary():
         "averageLossWithoutStop": stats["avg_loss_without_stops"],
         "maxLossWithoutStop": stats["max_loss_without_stops"],
         "diagnostic": insight["diagnostic"]
-    })
+    }
 
-@app.get("/api/winrate-payoff")
-def get_winrate_payoff_summary():
-    global trade_objs
-    if not trade_objs:
-        abort(400, "No trades have been analyzed yet")
 
-    # Calculate stats once
-    stats = calculate_breakeven_stats(trade_objs)
+def _build_winrate_payoff(aggs):
+    stats = aggs["breakeven_stats"]
 
     # Check if we have sufficient data
     if stats["total_trades"] == 0 or stats["winning_trades"] == 0 or stats["losing_trades"] == 0:
-        return jsonify({
+        return {
             "message": "Not enough win/loss data to compute win rate and payoff ratio."
-        })
+        }
 
-    # Generate insight from stats
     insight = generate_breakeven_insight(stats)
 
-    return jsonify({
+    return {
         "winRate": round(stats["win_rate"], 4),
         "averageWin": round(stats["avg_win"], 2),
         "averageLoss": round(stats["avg_loss"], 2),
         "payoffRatio": round(stats["payoff_ratio"], 2),
         "diagnostic": insight["diagnostic"]
-    })
+    }
+
+
+def _build_insights(trades, orders, vr, sigma_loss, sigma_risk, k):
+    # Sections are memoized per dataset by the thresholds they depend on.
+    insights = generate_insights_report(
+        trades,
+        orders,
+        vr=vr,
+        sigma_loss=sigma_loss,
+        sigma_risk=sigma_risk,
+        k=k,
+        aggregates=_aggregates(),
+        cache=_insight_cache(),
+    )
+
+    # Convert new insights format to old API format for backward compatibility
+    # New format has {title, diagnostic}, old format needs {title, diagnostic, priority}
+    insights_with_priority = []
+    for idx, insight in enumerate(insights):
+        insights_with_priority.append({
+            "title": insight["title"],
+            "diagnostic": insight["diagnostic"],
+            "priority": idx  # Summary is 0, rest are 1, 2, 3...
+        })
+    return insights_with_priority
+
+
+# ---- Per-section routes ----
+
+@app.get("/api/summary")
+@conditional_get
+def get_summary():
+    """
+    High-level dashboard summary.
+    Includes: success rate, streaks, payoff stats, and
+    a headline diagnostic chosen from a risk-weighted decision tree.
+    """
+    global trade_objs
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    return jsonify(_build_summary(trade_objs, _aggregates()))
+
+@app.get("/api/trades")
+@conditional_get
+def get_trades():
+    global trade_objs
+
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    return trades_response(
+        trade_objs,
+        {"date_range": _trades_date_range(trade_objs)},
+        requested_format(),
+    )
+
+@app.get("/api/losses")
+@conditional_get
+def get_losses():
+    global trade_objs
+
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    sigma = float(request.args.get("sigma", THRESHOLDS["sigma_loss"]))
+    symbol = request.args.get("symbol", None)
+
+    return jsonify(_build_losses(trade_objs, sigma, symbol, _stat_sketch("losses", symbol)))
+
+
+@app.get("/api/revenge")
+@conditional_get
+def get_revenge_stats():
+    global trade_objs
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    # Read multiplier (default 1.0× median hold)
+    k = float(request.args.get("k", THRESHOLDS["k"]))
+
+    return jsonify(_build_revenge(trade_objs, k))
+
+@app.get("/api/risk-sizing")
+@conditional_get
+def get_risk_sizing():
+    global trade_objs
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    # Query parameter (?vr=0.35) – coefficient of variation threshold
+    vr = float(request.args.get("vr", THRESHOLDS["vr"]))
+
+    return jsonify(_build_risk_sizing(trade_objs, vr))
+
+@app.get("/api/excessive-risk")
+@conditional_get
+def get_excessive_risk_summary():
+    global trade_objs
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    # Get sigma multiplier from query (?sigma=...)
+    sigma = float(request.args.get("sigma", THRESHOLDS["sigma_risk"]))
+
+    return jsonify(_build_excessive_risk(trade_objs, sigma, _stat_sketch("risk")))
+
+@app.get("/api/stop-loss")
+@conditional_get
+def get_stop_loss_summary():
+    global trade_objs
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    return jsonify(_build_stop_loss(trade_objs))
+
+@app.get("/api/winrate-payoff")
+@conditional_get
+def get_winrate_payoff_summary():
+    global trade_objs
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    return jsonify(_build_winrate_payoff(_aggregates()))
 
 @app.get("/api/insights")
+@conditional_get
 def get_insights():
     """
     Full insights report (summary + prioritized insight sections).
@@ -523,34 +903,223 @@ def get_insights():
     sigma_risk = float(request.args.get("sigma_risk", THRESHOLDS["sigma_risk"]))
     k = float(request.args.get("k", THRESHOLDS["k"]))
 
-    insights = generate_insights_report(
-        trade_objs,
-        order_df,
-        vr=vr,
-        sigma_loss=sigma_loss,
-        sigma_risk=sigma_risk,
-        k=k
-    )
+    return jsonify(_build_insights(trade_objs, order_df, vr, sigma_loss, sigma_risk, k))
 
-    # Convert new insights format to old API format for backward compatibility
-    # New format has {title, diagnostic}, old format needs {title, diagnostic, priority}
-    insights_with_priority = []
-    for idx, insight in enumerate(insights):
-        insights_with_priority.append({
-            "title": insight["title"],
-            "diagnostic": insight["diagnostic"],
-            "priority": idx  # Summary is 0, rest are 1, 2, 3...
+@app.get("/api/timeseries")
+@conditional_get
+def get_timeseries():
+    """Breakeven, outsized-loss and risk-sizing stats per window of trades.
+
+    Windows are either calendar periods (``period=day|week|month``, the
+    default being week) or rolling runs of ``window`` consecutive trades
+    advanced by ``step`` (default 1). ``sigma_loss`` and ``vr`` override the
+    server thresholds.
+    """
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    sigma_loss = float(request.args.get("sigma_loss", THRESHOLDS["sigma_loss"]))
+    vr = float(request.args.get("vr", THRESHOLDS["vr"]))
+    frame = _trade_frame()
+
+    try:
+        if "window" in request.args:
+            window = int(request.args["window"])
+            step = int(request.args.get("step", 1))
+            return jsonify({
+                "window": window,
+                "step": step,
+                "windows": calculate_rolling_stats(frame, window, step, sigma_loss, vr),
+            })
+
+        period = request.args.get("period", "week")
+        return jsonify({
+            "period": period,
+            "windows": calculate_period_stats(frame, period, sigma_loss, vr),
         })
+    except ValueError as exc:
+        abort(400, str(exc))
+
+@app.get("/api/breakdown")
+@conditional_get
+def get_breakdown():
+    """Per-group stats by ``by=symbol|side|hour|weekday|session``.
+
+    Hour, weekday and session use ``tz`` (default US/Eastern exchange time).
+    ``sigma_loss`` and ``vr`` override the server thresholds.
+    """
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    by = request.args.get("by", "symbol")
+    tz = request.args.get("tz", DEFAULT_TZ)
+    sigma_loss = float(request.args.get("sigma_loss", THRESHOLDS["sigma_loss"]))
+    vr = float(request.args.get("vr", THRESHOLDS["vr"]))
+
+    try:
+        groups = calculate_breakdown_stats(_trade_frame(), by, sigma_loss, vr, tz)
+    except ValueError as exc:
+        abort(400, str(exc))
+
+    return jsonify({"by": by, "tz": tz, "groups": groups})
+
+@app.get("/api/cohort")
+@conditional_get
+def get_cohort():
+    """Benchmark a dataset's metrics against every analyzed upload.
+
+    ``dataset`` selects a stored dataset id (default: the last upload).
+    """
+    ds_id = request.args.get("dataset", current_dataset_id)
+    if ds_id is None:
+        abort(400, "No trades have been analyzed yet")
+
+    metrics = COHORT.metrics(ds_id)
+    if metrics is None:
+        abort(404, f"Unknown dataset '{ds_id}'")
 
-    return jsonify(insights_with_priority)
+    return jsonify({
+        "datasetId": ds_id,
+        "cohortSize": len(COHORT),
+        "metrics": COHORT.compare(metrics, COHORT_METRICS),
+    })
 
 @app.get("/api/goals")
+@conditional_get
 def get_goals():
     global trade_objs
     if not trade_objs:
         abort(400, "No trades have been analyzed yet")
 
-    return jsonify(generate_goal_report(trade_objs))
+    return jsonify(generate_goal_report(trade_objs, _goal_index()))
+
+@app.get("/api/dashboard")
+@conditional_get
+def get_dashboard():
+    """Every dashboard section in one response.
+
+    Mistake tallies, streaks and breakeven stats are computed once and shared
+    by the summary and win-rate/payoff sections. Threshold query-params use
+    the ``THRESHOLDS`` names (sigma_loss, sigma_risk, k, vr) and ``symbol``
+    filters the losses section. A client sending ``If-None-Match`` gets a 304
+    when the dataset and query are unchanged.
+    """
+    global trade_objs, order_df
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+    if order_df is None:
+        abort(400, "Order data is missing or has not been processed yet")
+
+    vr = float(request.args.get("vr", THRESHOLDS["vr"]))
+    sigma_loss = float(request.args.get("sigma_loss", THRESHOLDS["sigma_loss"]))
+    sigma_risk = float(request.args.get("sigma_risk", THRESHOLDS["sigma_risk"]))
+    k = float(request.args.get("k", THRESHOLDS["k"]))
+    symbol = request.args.get("symbol", None)
+
+    aggs = _aggregates()
+
+    return jsonify({
+        "summary":         _build_summary(trade_objs, aggs),
+        "losses":          _build_losses(trade_objs, sigma_loss, symbol, _stat_sketch("losses", symbol)),
+        "revenge":         _build_revenge(trade_objs, k),
+        "risk-sizing":     _build_risk_sizing(trade_objs, vr),
+        "excessive-risk":  _build_excessive_risk(trade_objs, sigma_risk, _stat_sketch("risk")),
+        "stop-loss":       _build_stop_loss(trade_objs),
+        "winrate-payoff":  _build_winrate_payoff(aggs),
+        "insights":        _build_insights(trade_objs, order_df, vr, sigma_loss, sigma_risk, k),
+        "goals":           generate_goal_report(trade_objs, _goal_index()),
+    })
+
+def _custom_goals_from_request():
+    """Parse a custom-goal request body into normalized goal dicts.
+
+    Accepts a bare list or ``{"goals": [...]}``; non-dict entries are skipped
+    and unparseable start dates are ignored. Returns the list, or an error
+    response for a malformed body.
+    """
+    from datetime import datetime
+
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return error_response(400, "Request body must be valid JSON.")
+
+    # Accept either a dict with key "goals" or a bare list
+    if isinstance(payload, dict):
+        goals_in = payload.get("goals")
+    else:
+        goals_in = payload
+
+    if not isinstance(goals_in, list):
+        return error_response(400, "Payload must be a list of goal objects or {\"goals\": [...]}.")
+
+    goals = []
+    for goal in goals_in:
+        if not isinstance(goal, dict):
+            continue  # skip invalid entries silently
+
+        start_date_str = goal.get("start_date") or goal.get("startDate")
+        try:
+            start_dt = datetime.fromisoformat(start_date_str).date() if start_date_str else None
+        except ValueError:
+            # Invalid date format – ignore the filter
+            start_dt = None
+
+        goals.append({
+            "id": goal.get("id"),
+            "title": goal.get("title", ""),
+            "mistake_types": goal.get("mistake_types", []) or [],
+            "goal": goal.get("target") or goal.get("goal") or 1,
+            "metric": goal.get("metric", "trades"),
+            "start_date_str": start_date_str,
+            "start_date": start_dt,
+        })
+    return goals
+
+
+def _timeline_params():
+    metric = request.args.get("metric", "trades")
+    if metric not in ("trades", "days"):
+        abort(400, f"Unsupported metric '{metric}'. Expected 'trades' or 'days'.")
+    try:
+        points = int(request.args.get("points", 200))
+    except ValueError:
+        abort(400, "points must be an integer")
+    return metric, max(2, min(points, 5000))
+
+
+@app.get("/api/goals/timeline")
+@conditional_get
+def get_goals_timeline():
+    """Downsampled streak/progress history of the predefined goals.
+
+    Query params: ``metric`` (trades | days, default trades) and ``points``
+    (max samples per series, default 200).
+    """
+    if not trade_objs:
+        abort(400, "No trades have been analyzed yet")
+
+    metric, points = _timeline_params()
+    return jsonify(generate_goal_timeline(trade_objs, None, metric, points, _goal_index()))
+
+
+@app.post("/api/goals/timeline")
+@cross_origin()
+def calculate_goals_timeline():
+    """Downsampled streak/progress history for a custom list of goals.
+
+    Takes the same body as /api/goals/calculate and the same query params as
+    GET /api/goals/timeline.
+    """
+    if not trade_objs:
+        return error_response(400, "No trades have been analyzed yet.")
+
+    metric, points = _timeline_params()
+    goals = _custom_goals_from_request()
+    if not isinstance(goals, list):
+        return goals  # error response
+
+    return jsonify(generate_goal_timeline(trade_objs, goals, metric, points, _goal_index()))
+
 
 @app.post("/api/goals/calculate")
 @cross_origin()
@@ -584,37 +1153,20 @@ def calculate_goals():
     if not trade_objs:
         return error_response(400, "No trades have been analyzed yet.")
 
-    payload = request.get_json(silent=True)
-    if payload is None:
-        return error_response(400, "Request body must be valid JSON.")
-
-    # Accept either a dict with key "goals" or a bare list
-    if isinstance(payload, dict):
-        goals_in = payload.get("goals")
-    else:
-        goals_in = payload
-
+    goals_in = _custom_goals_from_request()
     if not isinstance(goals_in, list):
-        return error_response(400, "Payload must be a list of goal objects or {\"goals\": [...]}.")
-
-    from datetime import datetime
+        return goals_in  # error response
 
+    index = _goal_index()
     results = []
     for goal in goals_in:
-        if not isinstance(goal, dict):
-            continue  # skip invalid entries silently
-
-        gid = goal.get("id")
-        title = goal.get("title", "")
-        mistake_types = goal.get("mistake_types", []) or []
-        target = goal.get("target") or goal.get("goal") or 1
-        metric = goal.get("metric", "trades")
-        start_date_str = goal.get("start_date") or goal.get("startDate")
-        try:
-            start_dt = datetime.fromisoformat(start_date_str).date() if start_date_str else None
-        except ValueError:
-            # Invalid date format – ignore the filter
-            start_dt = None
+        gid = goal["id"]
+        title = goal["title"]
+        mistake_types = goal["mistake_types"]
+        target = goal["goal"]
+        metric = goal["metric"]
+        start_date_str = goal["start_date_str"]
+        start_dt = goal["start_date"]
 
         try:
             current, best, progress = evaluate_goal(
@@ -623,6 +1175,7 @@ def calculate_goals():
                 goal_target=target,
                 metric=metric,
                 start_date=start_dt,
+                index=index,
             )
         except ValueError as exc:
             # Unsupported metric – propagate as error field in result
@@ -670,36 +1223,45 @@ def settings():
     if payload is None:
         return error_response(400, "Request body must be valid JSON.")
 
-    updated = {}
-    for key, val in payload.items():
-        if key not in THRESHOLDS:
-            # Ignore unknown keys silently to keep the contract simple
-            continue
-        try:
-            THRESHOLDS[key] = float(val)
-            updated[key] = THRESHOLDS[key]
-        except (TypeError, ValueError):
-            return error_response(400, f"Value for '{key}' must be numeric.")
-
-    # ------------------------------------------------------------------
-    # Optional: re-run mistake tagging on existing in-memory trades so that
-    # dashboard summary and insights reflect the new thresholds without
-    # requiring the user to re-upload the CSV.
-    # ------------------------------------------------------------------
-
     global trade_objs, order_df
-    if trade_objs and order_df is not None:
-        # Clear old mistake lists to avoid duplicates
-        for t in trade_objs:
-            t.mistakes.clear()
-
-        analyze_all_mistakes(
-            trade_objs,
-            order_df,
-            sigma_multiplier=THRESHOLDS["sigma_loss"],
-            revenge_multiplier=THRESHOLDS["k"],
-            sigma_risk=THRESHOLDS["sigma_risk"],
-        )
+    # An analysis (possibly a background job) replaces trade_objs and
+    # order_df under this lock; hold it from the threshold update until the
+    # re-tagged dataset is published, so no trade is left half re-tagged.
+    with _analysis_lock:
+        updated = {}
+        for key, val in payload.items():
+            if key not in THRESHOLDS:
+                # Ignore unknown keys silently to keep the contract simple
+                continue
+            try:
+                THRESHOLDS[key] = float(val)
+                updated[key] = THRESHOLDS[key]
+            except (TypeError, ValueError):
+                return error_response(400, f"Value for '{key}' must be numeric.")
+
+        # --------------------------------------------------------------
+        # Optional: re-run mistake tagging on existing in-memory trades so
+        # that dashboard summary and insights reflect the new thresholds
+        # without requiring the user to re-upload the CSV.
+        # --------------------------------------------------------------
+
+        if trade_objs and order_df is not None:
+            # Clear old mistake lists to avoid duplicates
+            for t in trade_objs:
+                t.mistakes.clear()
+
+            analyze_all_mistakes(
+                trade_objs,
+                order_df,
+                sigma_multiplier=THRESHOLDS["sigma_loss"],
+                revenge_multiplier=THRESHOLDS["k"],
+                sigma_risk=THRESHOLDS["sigma_risk"],
+                sketches=_trade_sketches(),
+            )
+
+        # Thresholds feed every analytics response, so cached copies are stale.
+        bump_dataset_version()
+        _share_dataset()
 
     return jsonify({
         "status": "OK",
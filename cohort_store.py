@@ -0,0 +1,167 @@
+"""
+Cohort benchmarking store.
+
+Keeps a small record of summary metrics per analyzed dataset (keyed by a
+BLAKE2b hash of the uploaded bytes, so re-uploading the same file replaces
+its entry rather than double-counting it) and serves percentile lookups
+against the whole cohort. Each metric's percentile table (the 0th..100th
+percentiles of the cohort) is rebuilt lazily after a write, so a lookup is a
+bisect over 101 values no matter how many datasets are stored.
+
+Storage is in-memory; set ``COHORT_STORE_PATH`` to a JSON file to keep the
+cohort across restarts. Several processes (gunicorn workers) can share one
+file: a write takes an exclusive flock on ``<path>.lock``, re-reads the file
+and merges its own record in before replacing it, and a lookup reloads the
+file when another process has replaced it since.
+"""
+import bisect
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+PERCENTILES = np.arange(101)
+
+# Bands returned alongside each lookup.
+BANDS = (10, 25, 50, 75, 90)
+
+
+def dataset_id(data) -> str:
+    """BLAKE2b-128 hex digest of an upload (any bytes-like buffer, e.g. an mmap, or a binary file object)."""
+    try:
+        view = memoryview(data)
+    except TypeError:
+        return hashlib.file_digest(data, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+    with view:
+        return hashlib.blake2b(view, digest_size=16).hexdigest()
+
+
+class CohortStore:
+    """Per-dataset metric records plus lazily rebuilt percentile tables."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._datasets: Dict[str, Dict[str, Any]] = {}
+        self._tables: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._mtime = None
+        if path:
+            self._reload()
+
+    def __len__(self) -> int:
+        return len(self._datasets)
+
+    def __contains__(self, ds_id: str) -> bool:
+        return ds_id in self._datasets
+
+    def add(self, ds_id: str, metrics: Dict[str, float]) -> None:
+        """Record (or replace) one dataset's metrics."""
+        entry = {
+            "metrics": dict(metrics),
+            "updated": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            if self.path:
+                with open(f"{self.path}.lock", "a") as lock:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                    self._reload()
+                    self._datasets[ds_id] = entry
+                    self._save()
+            else:
+                self._datasets[ds_id] = entry
+            self._tables.clear()
+
+    def metrics(self, ds_id: str) -> Optional[Dict[str, float]]:
+        self._refresh()
+        entry = self._datasets.get(ds_id)
+        return dict(entry["metrics"]) if entry else None
+
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _reload(self) -> None:
+        """Take every record from the file (other processes' writes included)."""
+        mtime = self._file_mtime()
+        if mtime is not None and mtime != self._mtime:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                self._datasets.update(json.load(fh).get("datasets", {}))
+            self._tables.clear()
+        self._mtime = mtime
+
+    def _refresh(self) -> None:
+        if self.path and self._file_mtime() != self._mtime:
+            with self._lock:
+                self._reload()
+
+    def _save(self) -> None:
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"datasets": self._datasets}, fh)
+        os.replace(tmp, self.path)
+        self._mtime = self._file_mtime()
+
+    def _table(self, metric: str) -> List[float]:
+        self._refresh()
+        table = self._tables.get(metric)
+        if table is None:
+            with self._lock:
+                values = [e["metrics"][metric] for e in self._datasets.values() if metric in e["metrics"]]
+                table = np.percentile(values, PERCENTILES).tolist() if values else []
+                self._tables[metric] = table
+        return table
+
+    def percentile(self, metric: str, value: float) -> Optional[int]:
+        """Percent of the cohort (0-100) whose ``metric`` is at or below ``value``."""
+        table = self._table(metric)
+        if not table:
+            return None
+        return min(max(bisect.bisect_right(table, value) - 1, 0), 100)
+
+    def share_at_or_above(self, metric: str, value: float) -> Optional[int]:
+        """Percent of the cohort (0-100) whose ``metric`` is at or above ``value``."""
+        table = self._table(metric)
+        if not table:
+            return None
+        return min(max(len(table) - bisect.bisect_left(table, value), 0), 100)
+
+    def bands(self, metric: str) -> Dict[str, float]:
+        """The cohort's p10/p25/p50/p75/p90 for ``metric`` (empty if unknown)."""
+        table = self._table(metric)
+        return {f"p{p}": round(table[p], 4) for p in BANDS} if table else {}
+
+    def compare(
+        self, metrics: Dict[str, float], higher_is_better: Optional[Dict[str, bool]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Value, cohort percentile and bands for every metric in ``metrics``.
+
+        With ``higher_is_better`` (metric -> direction, e.g. COHORT_METRICS)
+        each metric also gets ``standing``: the percent of the cohort this
+        value does at least as well as (at or below it when higher is better,
+        at or above it otherwise), and ``bands`` run from the worst tenth to
+        the best, so p90 is always the value the best 10% reach.
+        """
+        out = {}
+        for name, value in metrics.items():
+            percentile, bands = self.percentile(name, value), self.bands(name)
+            out[name] = {"value": value, "percentile": percentile, "bands": bands}
+            if higher_is_better is None or name not in higher_is_better:
+                continue
+            higher = higher_is_better[name]
+            if not higher and bands:
+                # Lower is better: the value the best 10% reach is the raw p10.
+                bands = {f"p{p}": bands[f"p{100 - p}"] for p in BANDS}
+            out[name].update({
+                "higher_is_better": higher,
+                "standing": percentile if higher else self.share_at_or_above(name, value),
+                "bands": bands,
+            })
+        return out
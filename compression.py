@@ -0,0 +1,80 @@
+"""
+Response compression.
+
+Compresses successful responses above a size threshold with brotli (when the
+optional ``brotli`` package is installed) or gzip, according to the client's
+Accept-Encoding. A compressed response's strong ETag gets an encoding suffix
+(``"<tag>-gzip"``) because its bytes differ from the identity representation;
+http_cache.conditional_get() accepts the suffixed forms in If-None-Match.
+"""
+import gzip
+
+from flask import request
+
+try:  # optional
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+# Below this many bytes compression costs more than it saves.
+MIN_SIZE = 1024
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/msgpack",
+    "application/vnd.apache.arrow.stream",
+    "text/plain",
+    "text/html",
+    "text/csv",
+}
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # fast setting; higher levels cost far more CPU for JSON
+
+
+def available_encodings() -> list:
+    """Content codings this server can produce, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def init_compression(app, min_size: int = MIN_SIZE):
+    """Register an after_request hook that compresses large responses."""
+
+    @app.after_request
+    def compress_response(resp):
+        if resp.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return resp
+
+        # The chosen representation depends on Accept-Encoding, including for
+        # the 304s that revalidate it.
+        resp.vary.add("Accept-Encoding")
+
+        if (
+            resp.status_code != 200
+            or resp.direct_passthrough
+            or "Content-Encoding" in resp.headers
+        ):
+            return resp
+
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return resp
+
+        data = resp.get_data()
+        if len(data) < min_size:
+            return resp
+
+        resp.set_data(_compress(data, encoding))
+        resp.headers["Content-Encoding"] = encoding
+
+        etag, weak = resp.get_etag()
+        if etag and not weak:
+            resp.set_etag(f"{etag}-{encoding}")
+
+        return resp
@@ -0,0 +1,50 @@
+"""
+Gunicorn settings, picked up with ``gunicorn -c gunicorn.conf.py app:app``.
+
+preload_app imports app.py (pandas, the analytics modules) once in the master
+before forking, so workers start with those modules already loaded and share
+their memory copy-on-write. A worker that is restarted later comes up
+without re-importing anything.
+
+app.py itself only imports what the analysis routes need; the mentor
+orchestrator (openai, dotenv) loads on the first /api/mentor/chat request.
+Once a worker is up, and /api/health can answer, it warms the orchestrator
+in a background thread, so the first chat doesn't pay for the import either.
+MENTOR_WARM_START=0 turns that off.
+
+Workers also share analyzed datasets through /dev/shm (shared_datasets.py).
+The store is a private directory named after the master's pid, because the
+master is the process that imports app.py, and it is removed when the master
+exits. SHARED_DATASETS=0 turns sharing off. Background job records
+(/api/analyze?async=1) are kept in the same directory, so any worker can
+answer for a job another worker runs.
+
+Workers are threaded (gthread): a client following a job's server-sent
+events holds one thread, not a whole worker, and the worker keeps answering
+gunicorn's heartbeat meanwhile. ``timeout`` only bounds a worker that stops
+responding altogether, and is well above the 30 s default so a large
+synchronous analysis isn't cut short.
+"""
+import os
+import threading
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+preload_app = True
+
+os.environ.setdefault("SHARED_DATASETS", "1")
+
+
+def post_worker_init(worker):
+    if os.environ.get("MENTOR_WARM_START", "1") != "1":
+        return
+    from mentor.mentor_blueprint import warm_orchestrator
+    threading.Thread(target=warm_orchestrator, name="mentor-warm-start", daemon=True).start()
+
+
+def on_exit(server):
+    from shared_datasets import SharedDatasetStore, default_prefix
+    SharedDatasetStore(default_prefix()).clear()
@@ -0,0 +1,96 @@
+"""
+Conditional-GET support for the analytics endpoints.
+
+Every analytics GET response is a pure function of the analyzed dataset, the
+server-side thresholds and the request's query string. /api/analyze and
+/api/settings are the only writers of that state and bump a dataset version
+when they run, so (version, endpoint, query) is a strong validator that can
+be checked *before* any computation or serialization happens.
+"""
+import hashlib
+import os
+import uuid
+from functools import wraps
+
+from flask import request, make_response
+
+# Clients may store responses but must revalidate each time; the ETag makes
+# revalidation a cheap 304. Safe for shared caches because the validator
+# changes whenever the underlying data does.
+CACHE_CONTROL = "no-cache"
+
+# Distinguishes workers and restarts, whose counters all start at zero.
+# Drawn again in every forked child: with gunicorn's preload_app the workers
+# would otherwise inherit the master's id, and two workers holding different
+# data at the same version would issue the same ETag.
+_BOOT_ID = uuid.uuid4().hex
+_dataset_version = 0
+
+
+def _reseed_boot_id() -> None:
+    global _BOOT_ID
+    _BOOT_ID = uuid.uuid4().hex
+
+
+os.register_at_fork(after_in_child=_reseed_boot_id)
+
+
+def bump_dataset_version() -> int:
+    """Invalidate every outstanding ETag. Call after mutating analysis state."""
+    global _dataset_version
+    _dataset_version += 1
+    return _dataset_version
+
+
+def dataset_version() -> int:
+    """Return the current dataset version."""
+    return _dataset_version
+
+
+def make_etag(endpoint: str, args) -> str:
+    """Strong ETag for ``endpoint`` + query ``args`` at the current version."""
+    query = "&".join(f"{k}={v}" for k, v in sorted(args.items(multi=True)))
+    raw = f"{_BOOT_ID}:{_dataset_version}:{endpoint}?{query}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _matching_etag(etag: str):
+    """Return the If-None-Match tag that validates ``etag``, if any.
+
+    compression.py serves encoded representations as ``<etag>-<coding>``;
+    those revalidate the same underlying data.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return etag
+    for tag in if_none_match.as_set():
+        if tag == etag or tag.startswith(etag + "-"):
+            return tag
+    return None
+
+
+def conditional_get(view):
+    """Decorator adding ETag / If-None-Match handling to a GET view.
+
+    A matching ``If-None-Match`` returns 304 without calling the view.
+    Successful responses get the ETag and ``Cache-Control`` headers; error
+    responses are passed through untouched.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = make_etag(request.path, request.args)
+
+        matched = _matching_etag(etag)
+        if matched is not None:
+            resp = make_response("", 304)
+            resp.set_etag(matched)
+            resp.headers["Cache-Control"] = CACHE_CONTROL
+            return resp
+
+        resp = make_response(view(*args, **kwargs))
+        if resp.status_code == 200:
+            resp.set_etag(etag)
+            resp.headers["Cache-Control"] = CACHE_CONTROL
+        return resp
+
+    return wrapper
@@ -3,15 +3,17 @@ Insights Report Generator
 
 Orchestrates the generation and prioritization of all trading insights.
 This module coordinates calling stats calculators and insight generators.
+Sections can be memoized per dataset with an InsightCache.
 """
-from typing import List, Dict, Any
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Optional, Tuple
 
 # Import stats calculators from analytics
 from analytics.mistake_analyzer import calculate_summary_stats
 from analytics.stop_loss_analyzer import calculate_stop_loss_stats
 from analytics.excessive_risk_analyzer import calculate_excessive_risk_stats
 from analytics.outsized_loss_analyzer import calculate_outsized_loss_stats
-from analytics.revenge_analyzer import calculate_revenge_stats
+from analytics.revenge_analyzer import retag_revenge_copies, calculate_revenge_stats
 from analytics.risk_sizing_analyzer import calculate_risk_sizing_consistency_stats
 from analytics.breakeven_analyzer import calculate_breakeven_stats
 
@@ -25,13 +27,62 @@ from insights.risk_sizing_insight import generate_risk_sizing_insight
 from insights.breakeven_insight import generate_breakeven_insight
 
 
+# Thresholds each section's output depends on. Sections with none depend
+# only on the dataset (its trades and their mistake tags).
+SECTION_THRESHOLDS = {
+    "summary": (),
+    "no stop-loss order": (),
+    "excessive risk": ("sigma_risk",),
+    "outsized loss": ("sigma_loss",),
+    "revenge trade": ("k",),
+    "risk sizing": ("vr",),
+    "breakeven": (),
+}
+
+
+class InsightCache:
+    """
+    Memo of generated insight sections for one dataset.
+
+    Entries are keyed by section and the values of the thresholds that
+    section depends on (SECTION_THRESHOLDS), so a request that changes only
+    ``k`` regenerates only the revenge section. Create a new cache whenever
+    the dataset (trades or their mistake tags) changes. Cached insights are
+    shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+
+    def get(self, section: str, params: Tuple, build: Callable[[], Any]) -> Any:
+        key = (section, params)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        value = self._entries[key] = build()
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _revenge_stats(trades: List, k: float) -> Dict[str, Any]:
+    # Same tagging as /api/revenge: tag a copy with this k, leave trades as-is.
+    return calculate_revenge_stats(retag_revenge_copies(trades, k))
+
+
 def generate_insights_report(
     trades: List,
     orders: Any,
     vr: float = 0.35,
     sigma_loss: float = 1.0,
     sigma_risk: float = 1.5,
-    k: float = 1.0
+    k: float = 1.0,
+    aggregates: Optional[Dict[str, Any]] = None,
+    cache: Optional[InsightCache] = None,
 ) -> List[Dict[str, Any]]:
     """
     Generate and prioritize all insights based on trades and orders.
@@ -49,55 +100,73 @@ def generate_insights_report(
         sigma_loss: Loss sigma multiplier (default 1.0)
         sigma_risk: Risk sigma multiplier (default 1.5)
         k: Revenge window multiplier (default 1.0)
+        aggregates: Optional output of calculate_trade_aggregates(trades);
+            reused for the summary and breakeven sections instead of
+            recounting mistakes and recomputing breakeven stats
+        cache: Optional InsightCache for this dataset. Sections already
+            generated with the same relevant thresholds are reused.
 
     Returns:
         List of insight dictionaries ordered by priority.
         Summary insight always first, mistake-based insights sorted by count descending.
         All insights are included (even with 0 mistakes) as they contain valuable feedback.
     """
+    thresholds = {"vr": vr, "sigma_loss": sigma_loss, "sigma_risk": sigma_risk, "k": k}
+
+    def section(name: str, build: Callable[[], Any]) -> Any:
+        if cache is None:
+            return build()
+        params = tuple(thresholds[p] for p in SECTION_THRESHOLDS[name])
+        return cache.get(name, params, build)
+
+    def summary_stats() -> Dict[str, Any]:
+        if aggregates is None:
+            return calculate_summary_stats(trades, orders)
+        return {
+            "total_trades": aggregates["total_trades"],
+            "mistake_counts": aggregates["mistake_counts"],
+            "trades_with_mistakes": aggregates["flagged_trades"],
+            "clean_trades": aggregates["clean_trades"],
+        }
+
+    def breakeven_stats() -> Dict[str, Any]:
+        if aggregates is None:
+            return calculate_breakeven_stats(trades)
+        return aggregates["breakeven_stats"]
+
+    def counted(stats: Dict[str, Any], count_key: str, generator: Callable) -> Tuple[int, Dict[str, Any]]:
+        return stats[count_key], generator(stats)
+
     # 1. Summary insight (always first)
-    summary_stats = calculate_summary_stats(trades, orders)
-    summary_insight = generate_summary_insight(summary_stats)
-
-    # Calculate all other insights with their mistake counts
-    stop_loss_stats = calculate_stop_loss_stats(trades)
-    excessive_risk_stats = calculate_excessive_risk_stats(trades, sigma=sigma_risk)
-    outsized_loss_stats = calculate_outsized_loss_stats(trades, sigma_multiplier=sigma_loss)
-    revenge_stats = calculate_revenge_stats(trades)
-    risk_sizing_stats = calculate_risk_sizing_consistency_stats(trades, vr=vr)
-    breakeven_stats = calculate_breakeven_stats(trades)
-
-    # Generate all insights (order: matches tiebreaker priority)
+    summary_insight = section("summary", lambda: generate_summary_insight(summary_stats()))
+
+    # Mistake insights as (mistake count, insight), in tiebreaker priority order
     all_insights = [
-        ("no stop-loss order", stop_loss_stats, generate_stop_loss_insight),
-        ("excessive risk", excessive_risk_stats, generate_excessive_risk_insight),
-        ("outsized loss", outsized_loss_stats, generate_outsized_loss_insight),
-        ("revenge trade", revenge_stats, generate_revenge_insight),
+        ("no stop-loss order", section("no stop-loss order", lambda: counted(
+            calculate_stop_loss_stats(trades), "trades_without_stops", generate_stop_loss_insight))),
+        ("excessive risk", section("excessive risk", lambda: counted(
+            calculate_excessive_risk_stats(trades, sigma=sigma_risk), "excessive_risk_count",
+            generate_excessive_risk_insight))),
+        ("outsized loss", section("outsized loss", lambda: counted(
+            calculate_outsized_loss_stats(trades, sigma_multiplier=sigma_loss), "outsized_loss_count",
+            generate_outsized_loss_insight))),
+        ("revenge trade", section("revenge trade", lambda: counted(
+            _revenge_stats(trades, k), "revenge_count", generate_revenge_insight))),
     ]
-    
+
     # Risk Sizing and Breakeven are pattern analysis, always include them
-    risk_sizing_insight = generate_risk_sizing_insight(risk_sizing_stats)
-    breakeven_insight = generate_breakeven_insight(breakeven_stats)
-
-    # Build mistake count mapping
-    mistake_counts = {
-        "no stop-loss order": stop_loss_stats["trades_without_stops"],
-        "excessive risk": excessive_risk_stats["excessive_risk_count"],
-        "outsized loss": outsized_loss_stats["outsized_loss_count"],
-        "revenge trade": revenge_stats["revenge_count"]
-    }
-    
+    risk_sizing_insight = section("risk sizing", lambda: generate_risk_sizing_insight(
+        calculate_risk_sizing_consistency_stats(trades, vr=vr)))
+    breakeven_insight = section("breakeven", lambda: generate_breakeven_insight(breakeven_stats()))
+
     # Define tiebreaker priority order (from Summary Insight logic)
     tiebreaker_order = ["no stop-loss order", "outsized loss", "excessive risk", "revenge trade"]
-    
+
     # Separate insights by mistake count
     mistake_insights_nonzero = []  # Insights with mistakes (count > 0)
     mistake_insights_zero = []     # Insights with 0 mistakes (count == 0)
-    
-    for mistake_type, stats, generator in all_insights:
-        count = mistake_counts.get(mistake_type, 0)
-        insight = generator(stats)
-        
+
+    for mistake_type, (count, insight) in all_insights:
         if count > 0:
             mistake_insights_nonzero.append((count, tiebreaker_order.index(mistake_type), insight))
         else:
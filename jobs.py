@@ -0,0 +1,200 @@
+"""
+Background job queue for long-running requests.
+
+An in-process stand-in for an RQ-style queue: submit() records a Job and
+runs ``fn(job, *args)`` on a thread pool, the request returns the job id at
+once, and the client polls the job (or follows its stage events) until it is
+done. The function reports progress with job.stage(name); whatever it
+returns becomes job.result. An exception fails the job with the exception's
+``status_code`` (default 500) and message.
+
+By default jobs live in memory and only the process that ran a job can
+answer for it. With a ``directory`` (one private directory shared by every
+worker process), each job's status, events and result are also written there
+as JSON, replaced atomically on every change, so any process can look up,
+follow or fetch a job another one is running. Results must then be
+JSON-serializable. Only the most recent ``history`` finished jobs of each
+queue are kept.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+# How often a job run by another process is re-read while following it.
+POLL_INTERVAL = 0.25
+
+
+def _record_path(directory: str, job_id: str) -> str:
+    return os.path.join(directory, f"{job_id}.json")
+
+
+class Job:
+    """One submitted unit of work plus the stage events it has emitted."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[Dict[str, Any]] = None
+        self.created = time.time()
+        self.events: List[Dict[str, Any]] = []
+        self._changed = threading.Condition()
+        self._path = _record_path(directory, self.id) if directory else None
+        self._remote = False
+        self._emit(QUEUED)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Job"]:
+        """A read-only view of a job written by another process, or None."""
+        job = cls.__new__(cls)
+        job._changed = threading.Condition()
+        job._path = path
+        job._remote = True
+        return job if job.refresh() else None
+
+    def refresh(self) -> bool:
+        """Re-read a loaded job's record; False if it is gone."""
+        try:
+            with open(self._path, "r", encoding="utf-8") as fh:
+                record = json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return False
+        for name in ("id", "status", "result", "error", "created", "events"):
+            setattr(self, name, record[name])
+        return True
+
+    def _save(self) -> None:
+        record = {name: getattr(self, name) for name in ("id", "status", "result", "error", "created", "events")}
+        tmp = f"{self._path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(record, fh, default=str)
+        os.replace(tmp, self._path)
+
+    def _emit(self, stage: str, status: Optional[str] = None) -> None:
+        # Status and event change together so a follower never sees a
+        # finished job without its final event.
+        with self._changed:
+            if status:
+                self.status = status
+            self.events.append({
+                "stage": stage,
+                "status": self.status,
+                "elapsed": round(time.time() - self.created, 3),
+            })
+            if self._path:
+                self._save()
+            self._changed.notify_all()
+
+    def stage(self, name: str) -> None:
+        """Record that the job has entered stage ``name``."""
+        self._emit(name)
+
+    def _start(self) -> None:
+        self._emit(RUNNING, RUNNING)
+
+    def _finish(self, result: Any) -> None:
+        self.result = result
+        self._emit(DONE, DONE)
+
+    def _fail(self, exc: BaseException) -> None:
+        self.error = {"status": getattr(exc, "status_code", 500), "message": str(exc)}
+        self._emit(FAILED, FAILED)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def _wait(self, timeout: float) -> None:
+        # Called with self._changed held.
+        if not self._remote:
+            self._changed.wait(timeout)
+            return
+        deadline = time.monotonic() + timeout
+        seen = len(self.events)
+        while time.monotonic() < deadline:
+            time.sleep(min(POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+            if not self.refresh() or len(self.events) != seen:
+                return
+
+    def follow(self, timeout: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Yield every event, waiting for new ones until the job finishes.
+
+        Yields None whenever ``timeout`` seconds pass without an event, so a
+        streaming caller can send a keep-alive.
+        """
+        seen = 0
+        while True:
+            with self._changed:
+                if seen == len(self.events):
+                    if self.finished:
+                        return
+                    self._wait(timeout)
+                new = self.events[seen:]
+            if not new:
+                yield None
+            seen += len(new)
+            yield from new
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "jobId": self.id,
+            "status": self.status,
+            "stage": self.events[-1]["stage"],
+            "events": list(self.events),
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Runs submitted jobs on a thread pool and keeps them addressable by id."""
+
+    def __init__(self, workers: int = 1, history: int = 32, directory: Optional[str] = None):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._history = history
+        self._lock = threading.Lock()
+        self.directory = directory
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Job:
+        """Queue ``fn(job, *args)`` and return its Job immediately."""
+        job = Job(self.directory)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        # Ids are uuid4 hex; anything else never reaches the file system.
+        if job is None and self.directory and len(job_id) == 32 and all(c in "0123456789abcdef" for c in job_id):
+            job = Job.load(_record_path(self.directory, job_id))
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args) -> None:
+        job._start()
+        try:
+            result = fn(job, *args)
+        except Exception as exc:  # noqa: BLE001 - reported through the job
+            job._fail(exc)
+        else:
+            job._finish(result)
+
+    def _evict(self) -> None:
+        finished = [jid for jid, job in self._jobs.items() if job.finished]
+        for jid in finished[:max(0, len(finished) - self._history)]:
+            del self._jobs[jid]
+            if self.directory:
+                try:
+                    os.unlink(_record_path(self.directory, jid))
+                except FileNotFoundError:
+                    pass
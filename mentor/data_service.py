@@ -20,7 +20,8 @@ class MentorDataService:
     - api: Computes analytics in real-time from app.trade_objs and app.order_df
     """
 
-    def __init__(self, mode: str = "fixtures", fixtures_path: str = None, trade_objs_ref=None, order_df_ref=None):
+    def __init__(self, mode: str = "fixtures", fixtures_path: str = None, trade_objs_ref=None, order_df_ref=None,
+                 goal_index_ref=None, thresholds_ref=None, insight_cache_ref=None, trade_frame_ref=None):
         """
         Initialize the data service.
 
@@ -29,10 +30,22 @@ class MentorDataService:
             fixtures_path: Path to fixture directory. Defaults to data/static/
             trade_objs_ref: Callable that returns trade_objs list (for api mode)
             order_df_ref: Callable that returns order_df (for api mode)
+            goal_index_ref: Callable that returns a GoalIndex for trade_objs
+                (for api mode; built on demand if omitted)
+            thresholds_ref: Callable that returns the user's analysis
+                thresholds (for api mode; library defaults if omitted)
+            insight_cache_ref: Callable that returns an InsightCache for
+                trade_objs (for api mode; no memoization if omitted)
+            trade_frame_ref: Callable that returns the trades_to_frame()
+                columns for trade_objs (for api mode; built on demand if omitted)
         """
         self.mode = mode
         self._trade_objs_ref = trade_objs_ref
         self._order_df_ref = order_df_ref
+        self._goal_index_ref = goal_index_ref
+        self._thresholds_ref = thresholds_ref
+        self._insight_cache_ref = insight_cache_ref
+        self._trade_frame_ref = trade_frame_ref
         
         if fixtures_path is None:
             # Default to data/static relative to project root
@@ -64,6 +77,51 @@ class MentorDataService:
             return self._order_df_ref()
         return None
 
+    def _get_goal_index(self) -> Optional[Any]:
+        """
+        Access the app's cached GoalIndex, if one was provided.
+
+        Returns:
+            GoalIndex or None
+        """
+        if self._goal_index_ref:
+            return self._goal_index_ref()
+        return None
+
+    def _get_thresholds(self) -> Dict[str, float]:
+        """
+        Access the app's current analysis thresholds.
+
+        Returns:
+            Dict with any of k, sigma_loss, sigma_risk, vr (empty if not provided)
+        """
+        if self._thresholds_ref:
+            return self._thresholds_ref()
+        return {}
+
+    def _get_insight_cache(self) -> Optional[Any]:
+        """
+        Access the app's InsightCache for the current trades.
+
+        Returns:
+            InsightCache or None
+        """
+        if self._insight_cache_ref:
+            return self._insight_cache_ref()
+        return None
+
+    def _get_trade_frame(self) -> Any:
+        """
+        Access the app's cached trade frame, building one if none was provided.
+
+        Returns:
+            pandas DataFrame from trades_to_frame()
+        """
+        if self._trade_frame_ref:
+            return self._trade_frame_ref()
+        from analytics.trade_frame import trades_to_frame
+        return trades_to_frame(self._get_trade_objs())
+
     def load_json(self, filename: str) -> Tuple[Dict[str, Any], int]:
         """
         Load a JSON fixture file with caching.
@@ -133,7 +191,7 @@ class MentorDataService:
         
         # Streaks (import from analytics)
         from analytics.goal_tracker import get_clean_streak_stats
-        current_streak, best_streak = get_clean_streak_stats(trade_objs)
+        current_streak, best_streak = get_clean_streak_stats(trade_objs, self._get_goal_index())
         
         # 3) Payoff & win-rate stats
         wins = [t.pnl for t in trade_objs if t.pnl and t.pnl > 0]
@@ -310,6 +368,55 @@ class MentorDataService:
             "excessLossPoints": stats.get('excess_loss_points', 0.0)
         }, 200
 
+    def get_breakdown(self, by: str = "symbol", tz: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+        """
+        Get per-group statistics for one breakdown dimension.
+
+        Args:
+            by: "symbol", "side", "hour", "weekday" or "session"
+            tz: Time zone for the time-of-day dimensions (exchange time if None)
+
+        Returns:
+            Tuple of (data_dict, status_code)
+        """
+        from analytics.breakdown_analyzer import DIMENSIONS
+
+        # ``by`` names a fixture file below, so only known dimensions pass.
+        if by not in DIMENSIONS:
+            return {
+                "status": "ERROR",
+                "message": f"Unsupported breakdown '{by}'. Expected one of: {', '.join(DIMENSIONS)}."
+            }, 400
+        if self.mode == "api":
+            return self._compute_api_breakdown(by, tz)
+        # Fixtures are snapshots in exchange time; ``tz`` is not applied.
+        return self.load_json(f"breakdown-{by}.json")
+
+    def _compute_api_breakdown(self, by: str, tz: Optional[str]) -> Tuple[Dict[str, Any], int]:
+        """Compute a breakdown from api trade_objs using the current thresholds."""
+        from analytics.breakdown_analyzer import calculate_breakdown_stats, DEFAULT_TZ
+
+        if not self._get_trade_objs():
+            return {
+                "status": "ERROR",
+                "message": "No trades have been analyzed yet"
+            }, 400
+
+        thresholds = self._get_thresholds()
+        tz = tz or DEFAULT_TZ
+        try:
+            groups = calculate_breakdown_stats(
+                self._get_trade_frame(),
+                by,
+                sigma_loss=thresholds.get("sigma_loss", 1.0),
+                vr=thresholds.get("vr", 0.35),
+                tz=tz,
+            )
+        except ValueError as e:
+            return {"status": "ERROR", "message": str(e)}, 400
+
+        return {"by": by, "tz": tz, "groups": groups}, 200
+
     def get_endpoint(self, endpoint_name: str) -> Tuple[Dict[str, Any], int]:
         """
         Get data for a specific analytics endpoint.
@@ -378,13 +485,11 @@ class MentorDataService:
 
     def _compute_revenge_endpoint(self, trade_objs: List[Any], k: float = 1.0) -> Tuple[Dict[str, Any], int]:
         """Compute revenge trading analysis."""
-        from copy import deepcopy
-        from analytics.revenge_analyzer import analyze_trades_for_revenge, calculate_revenge_stats
+        from analytics.revenge_analyzer import retag_revenge_copies, calculate_revenge_stats
         from insights.revenge_insight import generate_revenge_insight
         
-        # Tag revenge trades
-        trades = deepcopy(trade_objs)
-        analyze_trades_for_revenge(trades, k)
+        # Tag revenge trades on copies, dropping tags from any earlier k
+        trades = retag_revenge_copies(trade_objs, k)
         
         # Calculate statistics
         stats = calculate_revenge_stats(trades)
@@ -499,7 +604,13 @@ class MentorDataService:
         """Compute full insights report."""
         from insights.insights_report import generate_insights_report
 
-        insights = generate_insights_report(trade_objs, order_df)
+        thresholds = self._get_thresholds()
+        insights = generate_insights_report(
+            trade_objs,
+            order_df,
+            cache=self._get_insight_cache(),
+            **{key: thresholds[key] for key in ("vr", "sigma_loss", "sigma_risk", "k") if key in thresholds},
+        )
 
         # Convert new insights format to old API format for backward compatibility
         insights_with_priority = []
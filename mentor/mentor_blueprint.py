@@ -13,6 +13,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict
 import os
 import statistics
+import sys
 
 # Create blueprint with /api/mentor prefix
 mentor_bp = Blueprint("mentor", __name__, url_prefix="/api/mentor")
@@ -25,7 +26,8 @@ MENTOR_DATA_SOURCE = os.environ.get("MENTOR_DATA_SOURCE", "fixtures")
 data_service = None
 
 
-def init_mentor_service(trade_objs_getter, order_df_getter):
+def init_mentor_service(trade_objs_getter, order_df_getter, goal_index_getter=None,
+                        thresholds_getter=None, insight_cache_getter=None, trade_frame_getter=None):
     """
     Initialize the data service with references to app's global state.
     Must be called from app.py after the blueprint is registered.
@@ -33,18 +35,45 @@ def init_mentor_service(trade_objs_getter, order_df_getter):
     Args:
         trade_objs_getter: Callable that returns the trade_objs list
         order_df_getter: Callable that returns the order_df DataFrame
+        goal_index_getter: Optional callable returning the app's cached
+            GoalIndex for the current trades
+        thresholds_getter: Optional callable returning the current analysis
+            thresholds (k, sigma_loss, sigma_risk, vr)
+        insight_cache_getter: Optional callable returning the app's
+            InsightCache for the current trades
+        trade_frame_getter: Optional callable returning the app's cached
+            trades_to_frame() columns for the current trades
     """
     global data_service
     data_service = MentorDataService(
         mode=MENTOR_DATA_SOURCE,
         trade_objs_ref=trade_objs_getter,
-        order_df_ref=order_df_getter
+        order_df_ref=order_df_getter,
+        goal_index_ref=goal_index_getter,
+        thresholds_ref=thresholds_getter,
+        insight_cache_ref=insight_cache_getter,
+        trade_frame_ref=trade_frame_getter,
     )
     
-    # Also set the data service in the orchestrator module
-    from mentor.openai_orchestrator import data_service as orchestrator_data_service
-    import mentor.openai_orchestrator
-    mentor.openai_orchestrator.data_service = data_service
+    # The orchestrator (and the openai client it pulls in) is imported on the
+    # first /chat request and picks the service up from here then; if it is
+    # already loaded, hand it the new one.
+    orchestrator = sys.modules.get("mentor.openai_orchestrator")
+    if orchestrator is not None:
+        orchestrator.data_service = data_service
+
+
+def warm_orchestrator() -> bool:
+    """
+    Import the orchestrator ahead of the first /chat request (see
+    gunicorn.conf.py). Returns False when it can't load, e.g. without
+    OPENAI_API_KEY; /chat then reports that itself.
+    """
+    try:
+        import mentor.openai_orchestrator  # noqa: F401
+    except Exception:
+        return False
+    return True
 
 # Constants
 MAX_PAGE_SIZE = 50
@@ -375,6 +404,20 @@ def get_endpoint_data():
     return jsonify(data), 200
 
 
+@mentor_bp.route("/get_breakdown", methods=["POST", "OPTIONS"])
+def get_breakdown():
+    """Per-symbol / per-side / per-session (time-of-day) statistics."""
+    if request.method == "OPTIONS":
+        return ("", 204)
+
+    payload = request.get_json(silent=True) or {}
+    by = canonicalize(payload.get("by", "symbol")) or "symbol"
+    data, code = data_service.get_breakdown(by, payload.get("tz"))
+    if code != 200:
+        return err(code, data.get("message", f"Failed to load breakdown-{by}.json"))
+    return jsonify(data), 200
+
+
 @mentor_bp.route("/filter_trades", methods=["POST", "OPTIONS"])
 def filter_trades():
     """Filter and paginate trades with flexible criteria."""
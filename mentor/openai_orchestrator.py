@@ -31,8 +31,11 @@ client = OpenAI(api_key=OPENAI_API_KEY)
 
 # --- Data service instance ---
 # Note: We'll get the data service from the blueprint module to ensure
-# we use the same instance that has access to global state
-data_service = None  # Will be set by init_mentor_service
+# we use the same instance that has access to global state. This module is
+# imported lazily (first /chat request), usually after init_mentor_service
+# has run; init_mentor_service updates it if it runs again later.
+from mentor import mentor_blueprint
+data_service = mentor_blueprint.data_service
 
 
 # --- Helper functions (ported from blueprint to avoid circular imports) ---
@@ -172,6 +175,14 @@ def _call_tool_runner(name: str, args: Dict[str, Any], user_text: Optional[str]
             raise RuntimeError(data.get("message", "Failed to load summary"))
         return data
 
+    # get_breakdown: per-symbol / per-side / per-session stats
+    if name == "get_breakdown":
+        by = canonicalize(payload.get("by", "symbol")) or "symbol"
+        data, code = data_service.get_breakdown(by, payload.get("tz"))
+        if code != 200:
+            raise RuntimeError(data.get("message", f"Failed to compute {by} breakdown"))
+        return data
+
     # get_endpoint_data with normalization and safe defaults
     if name == "get_endpoint_data":
         safe = dict(payload)
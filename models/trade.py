@@ -1,14 +1,47 @@
-from dataclasses import dataclass, field, asdict
-from datetime import datetime
-from typing import Optional, List
-from uuid import uuid4
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import count
+from typing import Any, Dict, Iterable, Optional, List
+
+# Process-wide sequence for provisional trade ids. Analyzed uploads replace
+# them with assign_trade_ids(), which doesn't depend on the process.
+_trade_ids = count(1)
+
+
+def next_trade_id() -> str:
+    """Return the next sequential trade id as a string."""
+    return str(next(_trade_ids))
+
+
+def assign_trade_ids(trades: Iterable["Trade"], dataset_id: str) -> None:
+    """Give each trade an id derived from its upload and its position.
+
+    The id is the first 8 hex digits of the dataset id plus the trade's
+    1-based position in exit-fill order (e.g. "3f2a9c01-17"). Reconstruction
+    is deterministic, so every worker that analyzes (or attaches to) the same
+    upload hands out the same ids, and clients can use them as keys.
+    """
+    prefix = dataset_id[:8]
+    for position, trade in enumerate(trades, 1):
+        trade.id = f"{prefix}-{position}"
+        trade._dict_cache = None
+
 
 def _fmt_time(value):
     return value.isoformat() if isinstance(value, datetime) else str(value)
 
-@dataclass
+
+def _epoch_ms(value) -> Optional[int]:
+    """Milliseconds since the Unix epoch; naive datetimes are taken as UTC."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return round(value.timestamp() * 1000)
+
+@dataclass(slots=True)
 class Trade:
-    id: str = field(default_factory=lambda: str(uuid4()))
+    id: str = field(default_factory=next_trade_id)
     symbol: str = ""
     entry_time: datetime = None
     entry_price: float = 0.0
@@ -21,9 +54,31 @@ class Trade:
     pnl: Optional[float] = None
     mistakes: List[str] = field(default_factory=list)
     risk_points: Optional[float] = None
+    points_lost: Optional[float] = None
+    # (fingerprint, dict) pair backing to_dict(); see _dict_fingerprint().
+    _dict_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    def _dict_fingerprint(self) -> tuple:
+        """Snapshot of the fields analyzers mutate after construction.
+
+        Everything else on a Trade is fixed once count_trades() builds it, so
+        the cached API dict only goes stale when one of these changes.
+        """
+        return (self.pnl, self.points_lost, self.risk_points, tuple(self.mistakes))
 
     def to_dict(self):
-        return {
+        """Return the camelCase API representation of this trade.
+
+        The dict is cached on the instance and rebuilt only when pnl,
+        points_lost, risk_points or mistakes change, so callers must treat
+        the result as read-only.
+        """
+        fingerprint = self._dict_fingerprint()
+        cached = self._dict_cache
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        data = {
             "id": self.id,
             "symbol": self.symbol,
             "side": self.side,
@@ -35,10 +90,22 @@ class Trade:
             "exitQty": self.exit_qty,
             "exitOrderId": self.exit_order_id,
             "pnl": self.pnl,
-            "pointsLost": getattr(self, "points_lost", None),
-            "riskPoints": getattr(self, "risk_points", None),
-            "mistakes": self.mistakes,
+            "pointsLost": self.points_lost,
+            "riskPoints": self.risk_points,
+            "mistakes": list(self.mistakes),
         }
+        self._dict_cache = (fingerprint, data)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Trade":
+        """Rebuild a Trade from its to_dict() representation."""
+        values = {attr: data[key] for attr, key in TRADE_COLUMNS.items()}
+        for attr in _TIME_ATTRS:
+            value = values[attr]
+            values[attr] = datetime.fromisoformat(value) if value and value != "None" else None
+        values["mistakes"] = list(values["mistakes"])
+        return cls(**values)
 
     @property
     def has_stop_order(self) -> bool:
@@ -52,3 +119,42 @@ class Trade:
         mistake tallies. Fixing the string restores accurate reporting.
         """
         return "no stop-loss order" not in self.mistakes
+
+
+# Trade attribute → camelCase column name, in to_dict() order.
+TRADE_COLUMNS = {
+    "id": "id",
+    "symbol": "symbol",
+    "side": "side",
+    "entry_time": "entryTime",
+    "entry_price": "entryPrice",
+    "entry_qty": "entryQty",
+    "exit_time": "exitTime",
+    "exit_price": "exitPrice",
+    "exit_qty": "exitQty",
+    "exit_order_id": "exitOrderId",
+    "pnl": "pnl",
+    "points_lost": "pointsLost",
+    "risk_points": "riskPoints",
+    "mistakes": "mistakes",
+}
+
+_TIME_ATTRS = {"entry_time", "exit_time"}
+
+
+def trades_to_columns(trades: Iterable[Trade]) -> Dict[str, List[Any]]:
+    """Return trades as one list per field (column-oriented).
+
+    Keys match to_dict(); entryTime/exitTime are epoch milliseconds instead of
+    ISO strings, which is both smaller on the wire and cheaper to parse.
+    """
+    trades = list(trades)
+    columns: Dict[str, List[Any]] = {}
+    for attr, key in TRADE_COLUMNS.items():
+        if attr in _TIME_ATTRS:
+            columns[key] = [_epoch_ms(getattr(t, attr)) for t in trades]
+        elif attr == "mistakes":
+            columns[key] = [list(t.mistakes) for t in trades]
+        else:
+            columns[key] = [getattr(t, attr) for t in trades]
+    return columns
@@ -1,14 +1,22 @@
 import argparse
-from .trade_counter import count_trades
+
+from analytics.trade_counter import count_trades
+from parsing.ingest import ingest_orders, ADAPTERS
+from parsing.utils import EXCHANGE_TZ
+
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Parse and count trades from a NinjaTrader order CSV")
+    parser = argparse.ArgumentParser(description="Parse and count trades from a broker order CSV")
     parser.add_argument("csv", help="Path to the order CSV file")
+    parser.add_argument("--broker", choices=sorted(ADAPTERS), help="Skip format detection")
+    parser.add_argument("--tz", default=EXCHANGE_TZ, help="Time zone of the export's timestamps")
     parser.add_argument("--verbose", action="store_true", help="Print sample trades")
 
     args = parser.parse_args()
-    trades = count_trades(args.csv)
+    orders = ingest_orders(args.csv, broker=args.broker, tz=args.tz)
+    trades, _ = count_trades(orders)
 
+    print(f"Detected format: {orders.attrs['broker']}")
     print(f"Total trades: {len(trades)}")
 
     if args.verbose:
@@ -0,0 +1,122 @@
+"""
+Futures contract specifications.
+
+Maps the root of a futures contract code (``MNQ`` in ``MNQH4``) to its
+dollar value per point and minimum tick. The registry is built once per
+process and turned into a small symbol → point-value dict for each upload,
+which count_trades() applies vectorially when pricing trades.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class ContractSpec:
+    root: str
+    point_value: float  # dollars per 1.0 point move, per contract
+    tick_size: float    # minimum price increment in points
+
+
+# Built-in specs for the CME products TradeHabit users trade most.
+_DEFAULT_SPECS = [
+    # Equity indices
+    ContractSpec("ES", 50.0, 0.25),
+    ContractSpec("MES", 5.0, 0.25),
+    ContractSpec("NQ", 20.0, 0.25),
+    ContractSpec("MNQ", 2.0, 0.25),
+    ContractSpec("YM", 5.0, 1.0),
+    ContractSpec("MYM", 0.5, 1.0),
+    ContractSpec("RTY", 50.0, 0.1),
+    ContractSpec("M2K", 5.0, 0.1),
+    # Energy
+    ContractSpec("CL", 1000.0, 0.01),
+    ContractSpec("MCL", 100.0, 0.01),
+    ContractSpec("QM", 500.0, 0.025),
+    ContractSpec("NG", 10000.0, 0.001),
+    # Metals
+    ContractSpec("GC", 100.0, 0.1),
+    ContractSpec("MGC", 10.0, 0.1),
+    ContractSpec("SI", 5000.0, 0.005),
+    ContractSpec("SIL", 1000.0, 0.005),
+    ContractSpec("HG", 25000.0, 0.0005),
+    # Rates
+    ContractSpec("ZB", 1000.0, 1 / 32),
+    ContractSpec("ZN", 1000.0, 1 / 64),
+    ContractSpec("ZF", 1000.0, 1 / 128),
+    ContractSpec("ZT", 2000.0, 1 / 256),
+    # FX
+    ContractSpec("6E", 125000.0, 0.00005),
+    ContractSpec("M6E", 12500.0, 0.0001),
+    ContractSpec("6B", 62500.0, 0.0001),
+    ContractSpec("6J", 12500000.0, 0.0000005),
+    # Grains
+    ContractSpec("ZC", 50.0, 0.25),
+    ContractSpec("ZS", 50.0, 0.25),
+    ContractSpec("ZW", 50.0, 0.25),
+    # Crypto
+    ContractSpec("BTC", 5.0, 5.0),
+    ContractSpec("MBT", 0.1, 5.0),
+    ContractSpec("ETH", 50.0, 0.5),
+    ContractSpec("MET", 0.1, 0.5),
+]
+
+# Root + CME month code + 1–2 digit year, e.g. MNQH4, ESZ24, M2KU5.
+_CONTRACT_RE = re.compile(r"^([A-Z0-9]+?)([FGHJKMNQUVXZ])(\d{1,2})$")
+
+
+def root_symbol(contract: str) -> str:
+    """Return the product root of a contract code (``MNQH4`` → ``MNQ``).
+
+    Codes that don't look like ``<root><month><year>`` are returned upper-cased
+    and stripped, so a bare root like ``ES`` maps to itself.
+    """
+    code = str(contract).strip().upper()
+    match = _CONTRACT_RE.match(code)
+    return match.group(1) if match else code
+
+
+@lru_cache(maxsize=None)
+def load_contract_specs(path: Optional[str] = None) -> Dict[str, ContractSpec]:
+    """Build the root → ContractSpec registry.
+
+    Entries from the JSON file at ``path`` (or ``$CONTRACT_SPECS_FILE``)
+    override or extend the built-ins. The file is a mapping of root to
+    ``{"point_value": float, "tick_size": float}``.
+    """
+    specs = {spec.root: spec for spec in _DEFAULT_SPECS}
+
+    path = path or os.environ.get("CONTRACT_SPECS_FILE")
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        for root, values in overrides.items():
+            root = root.strip().upper()
+            specs[root] = ContractSpec(
+                root,
+                float(values["point_value"]),
+                float(values.get("tick_size", 0.0)),
+            )
+
+    return specs
+
+
+def point_values_for(
+    symbols: Iterable[str],
+    specs: Optional[Dict[str, ContractSpec]] = None,
+) -> Dict[str, float]:
+    """Return a symbol → point value mapping for the given contract codes.
+
+    Only known roots are included; count_trades() treats anything missing as
+    a multiplier of 1.0 (i.e. PnL stays in points).
+    """
+    specs = specs if specs is not None else load_contract_specs()
+    values: Dict[str, float] = {}
+    for symbol in set(symbols):
+        spec = specs.get(root_symbol(symbol))
+        if spec is not None:
+            values[symbol] = spec.point_value
+    return values
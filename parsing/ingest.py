@@ -0,0 +1,366 @@
+"""
+Order-file ingest pipeline.
+
+Every broker export goes through the same stages:
+
+1. read      - CSV -> raw DataFrame
+2. detect    - pick a BrokerAdapter from the header (or use the one asked for)
+3. normalize - rename to the canonical columns, map broker vocabularies
+               (side / order type / status), parse timestamps in one vectorized
+               pass, type the columns (categorical side/symbol/Type/Status,
+               float64 prices, int32 quantities) and add the boolean order
+               flags (is_stop / is_filled / is_canceled)
+4. validate  - raise KeyError naming any required canonical column that is missing
+
+The read stage uses pandas' C parser by default. ``engine="pyarrow"`` reads
+with pyarrow.csv instead: multithreaded, with explicit types for the columns
+the adapters know about (dictionary-encoded side/symbol/Type/Status, float64
+prices, timestamps parsed natively in the adapters' formats). Its columns
+convert to pandas without a copy where the types allow (numbers without
+nulls, Arrow-backed strings, categoricals from the dictionaries). pyarrow is
+optional; without it the C parser is used.
+
+Canonical timestamps are exchange wall-clock times. By default they stay
+naive, which is what the detectors and Trade objects use; ``utc=True``
+localizes them from ``tz`` and converts them to UTC. Either way the frame
+records the source zone in ``df.attrs["tz"]``.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+import pandas as pd
+
+from parsing.utils import parse_timestamps, localize_to_utc, EXCHANGE_TZ, NINJATRADER_TIMESTAMP_FORMAT
+
+REQUIRED_COLUMNS = ("ts", "fill_ts", "qty", "Status", "side", "symbol", "price")
+
+# Canonical column order; anything else the export carries follows these.
+CANONICAL_COLUMNS = (
+    "order_id_original", "ts", "fill_ts", "side", "symbol", "qty", "price",
+    "Type", "Status", "Limit Price", "Stop Price",
+)
+
+CATEGORICAL_COLUMNS = ("side", "symbol", "Type", "Status")
+FLOAT_COLUMNS = ("price", "Limit Price", "Stop Price")
+
+CSV_ENGINES = ("c", "pyarrow")
+
+# Flag column -> (source column, predicate on the stripped, lower-cased value).
+ORDER_FLAGS = {
+    "is_stop": ("Type", lambda v: "stop" in v),
+    "is_filled": ("Status", lambda v: v == "filled"),
+    "is_canceled": ("Status", lambda v: v in ("canceled", "cancelled")),
+}
+
+
+@dataclass(frozen=True)
+class BrokerAdapter:
+    """How one broker's order export maps onto the canonical columns."""
+
+    name: str
+    # Header columns that identify this export.
+    signature: Tuple[str, ...]
+    # Export column -> canonical column.
+    columns: Dict[str, str]
+    timestamp_format: Optional[str] = None
+    # Canonical column -> {export value: canonical value}, applied after
+    # surrounding whitespace is stripped.
+    values: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+    def matches(self, header: Iterable[str]) -> bool:
+        return set(self.signature) <= set(header)
+
+
+NINJATRADER = BrokerAdapter(
+    name="ninjatrader",
+    signature=("B/S", "Contract", "filledQty", "Avg Fill Price"),
+    columns={
+        "Order ID": "order_id_original",
+        "Timestamp": "ts",
+        "Fill Time": "fill_ts",
+        "B/S": "side",
+        "Contract": "symbol",
+        "filledQty": "qty",
+        "Avg Fill Price": "price",
+    },
+    timestamp_format=NINJATRADER_TIMESTAMP_FORMAT,
+)
+
+# Tradovate's own Orders export: NinjaTrader's layout with the API field
+# names for price, and values padded with a leading space.
+TRADOVATE = BrokerAdapter(
+    name="tradovate",
+    signature=("B/S", "Contract", "filledQty", "avgPrice"),
+    columns={
+        "orderId": "order_id_original",
+        "Timestamp": "ts",
+        "Fill Time": "fill_ts",
+        "B/S": "side",
+        "Contract": "symbol",
+        "filledQty": "qty",
+        "avgPrice": "price",
+    },
+    timestamp_format=NINJATRADER_TIMESTAMP_FORMAT,
+)
+
+# R|Trader Pro order history.
+RITHMIC = BrokerAdapter(
+    name="rithmic",
+    signature=("Buy/Sell", "Symbol", "Qty Filled"),
+    columns={
+        "Order Number": "order_id_original",
+        "Create Time": "ts",
+        "Update Time": "fill_ts",
+        "Buy/Sell": "side",
+        "Symbol": "symbol",
+        "Qty Filled": "qty",
+        "Avg Fill Price": "price",
+    },
+    timestamp_format="%Y-%m-%d %H:%M:%S",
+    values={
+        "side": {"B": "Buy", "S": "Sell", "BUY": "Buy", "SELL": "Sell"},
+        "Status": {"complete": "Filled", "filled": "Filled", "cancelled": "Canceled", "canceled": "Canceled"},
+        "Type": {"Stop Market": "Stop", "Stop Limit": "Stop Limit"},
+    },
+)
+
+# Detection order: first match wins; NinjaTrader is also the fallback so an
+# unrecognised file fails validation with the NinjaTrader column names.
+ADAPTERS = {adapter.name: adapter for adapter in (NINJATRADER, TRADOVATE, RITHMIC)}
+
+
+def detect_format(header: Iterable[str]) -> BrokerAdapter:
+    """Return the first adapter whose signature columns are all in ``header``."""
+    header = list(header)
+    for adapter in ADAPTERS.values():
+        if adapter.matches(header):
+            return adapter
+    return NINJATRADER
+
+
+def _categorical(values: pd.Series, mapping: Optional[Dict[str, str]] = None) -> pd.Categorical:
+    """Strip (and optionally map) each distinct value once, not once per row."""
+    codes, uniques = pd.factorize(values)
+    cleaned = [str(u).strip() for u in uniques]
+    if mapping:
+        cleaned = [mapping.get(u, u) for u in cleaned]
+    remap, categories = pd.factorize(pd.Index(cleaned, dtype=object))
+    # Missing values keep code -1 (the appended entry).
+    return pd.Categorical.from_codes(np.append(remap, -1)[codes], categories=categories)
+
+
+def category_mask(values: pd.Series, predicate: Callable[[str], bool]) -> np.ndarray:
+    """
+    Boolean mask of ``predicate`` over ``values``, evaluated once per distinct value.
+
+    Each value is stripped and lower-cased before the predicate sees it;
+    missing values are False. Works on categorical and object columns alike.
+    """
+    codes, uniques = pd.factorize(values)
+    hits = [bool(predicate(str(u).strip().lower())) for u in uniques]
+    # Missing values keep code -1 (the appended entry).
+    return np.array(hits + [False], dtype=bool)[codes]
+
+
+def _quantities(values: pd.Series) -> pd.Series:
+    """Numeric quantities; int32 when every value is a whole number, float64 (with NaN) otherwise."""
+    qty = pd.to_numeric(values, errors="coerce")
+    if qty.notna().all() and (qty == qty.round()).all():
+        return qty.astype("int32")
+    return qty.astype("float64")
+
+
+def with_order_flags(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return ``df`` with categorical side/symbol/Type/Status and the ORDER_FLAGS columns.
+
+    Frames from ingest_orders() already have both and are returned as-is;
+    anything else (hand-built frames, older pickles) gets the missing pieces
+    computed once here instead of string-matching per trade in the detectors.
+    """
+    columns = {}
+    for name in CATEGORICAL_COLUMNS:
+        if name in df.columns and not isinstance(df[name].dtype, pd.CategoricalDtype):
+            columns[name] = pd.Series(_categorical(df[name]), index=df.index)
+    for flag, (source, predicate) in ORDER_FLAGS.items():
+        if flag not in df.columns and source in df.columns:
+            columns[flag] = category_mask(df[source], predicate)
+    return df.assign(**columns) if columns else df
+
+
+def normalize(
+    raw: pd.DataFrame,
+    adapter: BrokerAdapter,
+    tz: str = EXCHANGE_TZ,
+    utc: bool = False,
+) -> pd.DataFrame:
+    """
+    Map a raw export onto the canonical columns in one pass.
+
+    Canonical columns the export lacks are left out (validate() reports the
+    required ones); other export columns are kept, after the canonical ones
+    and before the order flags.
+
+    Args:
+        raw: DataFrame as read from the export (not modified)
+        adapter: BrokerAdapter describing the export
+        tz: Time zone the export's wall-clock timestamps are in
+        utc: Localize timestamps from ``tz`` and convert to UTC
+
+    Returns:
+        New DataFrame with canonical column names and dtypes
+    """
+    columns = {adapter.columns.get(col, col): raw[col] for col in raw.columns}
+
+    parsed = {
+        name: parse_timestamps(columns[name], adapter.timestamp_format)
+        for name in ("ts", "fill_ts") if name in columns
+    }
+    if utc:
+        parsed = dict(zip(parsed, localize_to_utc(list(parsed.values()), tz)))
+    columns.update(parsed)
+
+    for name in CATEGORICAL_COLUMNS:
+        if name in columns:
+            columns[name] = _categorical(columns[name], adapter.values.get(name))
+    for name in FLOAT_COLUMNS:
+        if name in columns:
+            columns[name] = pd.to_numeric(columns[name], errors="coerce").astype("float64")
+    if "qty" in columns:
+        columns["qty"] = _quantities(columns["qty"])
+    for flag, (source, predicate) in ORDER_FLAGS.items():
+        if source in columns:
+            columns[flag] = category_mask(columns[source], predicate)
+
+    order = [c for c in CANONICAL_COLUMNS if c in columns]
+    order += [c for c in columns if c not in CANONICAL_COLUMNS and c not in ORDER_FLAGS]
+    order += [c for c in ORDER_FLAGS if c in columns]
+    df = pd.DataFrame({c: columns[c] for c in order}, index=raw.index)
+    df.attrs["broker"] = adapter.name
+    df.attrs["tz"] = tz
+    return df
+
+
+def _pyarrow_csv():
+    """pyarrow.csv, or None when pyarrow isn't installed."""
+    try:
+        import pyarrow.csv
+    except ImportError:  # pragma: no cover - depends on environment
+        return None
+    return pyarrow.csv
+
+
+def _arrow_column_types(pa, timestamps: bool = True) -> Dict[str, object]:
+    """Arrow types for every export column an adapter maps onto a typed canonical column."""
+    canonical = {name: pa.dictionary(pa.int32(), pa.string()) for name in CATEGORICAL_COLUMNS}
+    canonical.update({name: pa.float64() for name in FLOAT_COLUMNS})
+    # timestamps=False reads them as text, for normalize() to parse.
+    time_type = pa.timestamp("us") if timestamps else pa.string()
+    canonical.update({name: time_type for name in ("ts", "fill_ts")})
+    types = dict(canonical)
+    for adapter in ADAPTERS.values():
+        for export_col, name in adapter.columns.items():
+            if name in canonical:
+                types[export_col] = canonical[name]
+    return types
+
+
+def _read_arrow(source, pa_csv) -> pd.DataFrame:
+    import pyarrow as pa
+
+    is_path = isinstance(source, (str, os.PathLike))
+    start = None if is_path else source.tell()
+    formats = list(dict.fromkeys(a.timestamp_format for a in ADAPTERS.values() if a.timestamp_format))
+
+    def read(timestamps: bool):
+        options = pa_csv.ConvertOptions(
+            column_types=_arrow_column_types(pa, timestamps),
+            timestamp_parsers=formats,
+            strings_can_be_null=True,  # empty fields are NaN, as with the C parser
+        )
+        return pa_csv.read_csv(source, read_options=pa_csv.ReadOptions(use_threads=True),
+                               convert_options=options)
+
+    try:
+        try:
+            table = read(timestamps=True)
+        except pa.ArrowInvalid:
+            # Timestamps outside the adapters' formats: read them as text and
+            # let normalize() parse them with per-row inference.
+            if not is_path:
+                source.seek(start)
+            table = read(timestamps=False)
+    except pa.ArrowInvalid as exc:
+        raise pd.errors.ParserError(str(exc)) from None
+
+    # All-empty columns come back untyped; make them float NaN like the C parser.
+    for i, col in enumerate(table.schema):
+        if pa.types.is_null(col.type):
+            table = table.set_column(i, col.name, table.column(i).cast(pa.float64()))
+    return table.to_pandas()
+
+
+def read_export(source, engine: str = "c") -> pd.DataFrame:
+    """
+    Read an export into a raw DataFrame with the given CSV engine.
+
+    ``"pyarrow"`` falls back to the C parser when pyarrow isn't installed.
+    Either way timestamp columns may come back parsed or as text, and
+    categorical columns as categories or text; normalize() handles both.
+    """
+    if engine == "pyarrow":
+        pa_csv = _pyarrow_csv()
+        if pa_csv is not None:
+            return _read_arrow(source, pa_csv)
+    # Map files from disk instead of reading them through a buffer.
+    return pd.read_csv(source, memory_map=isinstance(source, (str, os.PathLike)))
+
+
+def validate(df: pd.DataFrame) -> pd.DataFrame:
+    """Raise KeyError listing missing required columns; return ``df`` otherwise."""
+    missing = set(REQUIRED_COLUMNS) - set(df.columns)
+    if missing:
+        raise KeyError(", ".join(sorted(missing)))
+    return df
+
+
+def ingest_orders(
+    source,
+    broker: Optional[str] = None,
+    tz: str = EXCHANGE_TZ,
+    utc: bool = False,
+    engine: str = "c",
+) -> pd.DataFrame:
+    """
+    Read, detect, normalize and validate an order export.
+
+    Args:
+        source: Path or binary file object of the CSV export
+        broker: Adapter name (see ADAPTERS) to skip format detection
+        tz: Time zone the export's wall-clock timestamps are in
+        utc: Convert timestamps to UTC instead of keeping wall-clock times
+        engine: CSV reader, one of CSV_ENGINES (see read_export())
+
+    Returns:
+        Canonical order DataFrame
+
+    Raises:
+        ValueError: unknown ``broker``, ``tz`` or ``engine``
+        KeyError: required columns missing
+        pandas.errors.ParserError: the CSV can't be parsed
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Unknown CSV engine '{engine}'. Expected one of: {', '.join(CSV_ENGINES)}.")
+    if broker is not None and broker not in ADAPTERS:
+        raise ValueError(f"Unknown broker '{broker}'. Expected one of: {', '.join(ADAPTERS)}.")
+    try:
+        ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone '{tz}'") from None
+
+    raw = read_export(source, engine)
+    adapter = ADAPTERS[broker] if broker else detect_format(raw.columns)
+    return validate(normalize(raw, adapter, tz, utc))
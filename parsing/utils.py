@@ -1,71 +1,154 @@
+import numpy as np
 import pandas as pd
-from typing import List
+from typing import Dict, List, Optional
+
+# NinjaTrader exports wall-clock exchange time, e.g. "01/02/2024 7:11:00".
+NINJATRADER_TIMESTAMP_FORMAT = "%m/%d/%Y %H:%M:%S"
+EXCHANGE_TZ = "America/New_York"
+
+
+def parse_timestamps(values: pd.Series, fmt: Optional[str] = NINJATRADER_TIMESTAMP_FORMAT) -> pd.Series:
+    """
+    Parse a column of timestamps in one vectorized pass.
+
+    The explicit ``fmt`` is tried first; only the rows that don't match it are
+    re-parsed with per-row inference. A column that never matches ``fmt`` is
+    parsed with pandas' format inference as a whole (so ISO strings with
+    offsets stay timezone-aware). Unparseable entries become NaT.
+
+    Args:
+        values: Raw timestamp column (strings, numbers or datetimes)
+        fmt: strptime format expected for most rows, or None to infer
+
+    Returns:
+        datetime64 Series (naive unless the input carried offsets)
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if not pd.api.types.is_string_dtype(values):
+        values = values.astype(str)
+
+    if fmt:
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+        retry = parsed.isna() & values.notna()
+        if not retry.any():
+            return parsed
+        if not retry.all():
+            fallback = pd.to_datetime(values[retry], format="mixed", errors="coerce")
+            if pd.api.types.is_datetime64_dtype(fallback):  # naive only
+                parsed[retry] = fallback
+            return parsed
+
+    return pd.to_datetime(values, errors="coerce")
+
+
+def _utc_lookup(uniques: pd.DatetimeIndex, tz: str, ambiguous) -> pd.DatetimeIndex:
+    return uniques.tz_localize(tz, ambiguous=ambiguous, nonexistent='NaT').tz_convert('UTC')
+
+
+def _map_through(column: pd.Series, uniques: pd.DatetimeIndex, lookup: pd.DatetimeIndex) -> pd.Series:
+    positions = uniques.get_indexer(column)
+    return pd.Series(lookup.take(positions, allow_fill=True, fill_value=pd.NaT), index=column.index, name=column.name)
+
+
+def localize_to_utc(columns: List[pd.Series], tz: str = EXCHANGE_TZ) -> List[pd.Series]:
+    """
+    Convert parsed timestamp columns to UTC, treating naive ones as ``tz`` wall-clock time.
+
+    The DST lookup runs once over the sorted unique naive values of all the
+    columns together (order and fill times mostly repeat each other), and
+    each column is then mapped through that table. A wall time inside the
+    repeated hour when DST ends can't be resolved from uniques, so those
+    columns fall back to ``ambiguous='infer'`` in row order and, failing
+    that, take the first (daylight-time) occurrence. Nonexistent times
+    (the skipped hour when DST starts) become NaT.
+
+    Args:
+        columns: datetime64 Series from parse_timestamps()
+        tz: Time zone of naive wall-clock values
+
+    Returns:
+        List of UTC-aware Series, aligned with ``columns``
+    """
+    naive = [c for c in columns if c.dt.tz is None]
+    if naive:
+        uniques = pd.DatetimeIndex(pd.unique(np.concatenate([c.to_numpy() for c in naive]))).dropna().sort_values()
+        try:
+            lookup = _utc_lookup(uniques, tz, 'infer')
+        except ValueError:
+            lookup = None
+        first_occurrence = None
+
+    out = []
+    for c in columns:
+        if c.dt.tz is not None:
+            out.append(c.dt.tz_convert('UTC'))
+            continue
+        if lookup is not None:
+            out.append(_map_through(c, uniques, lookup))
+            continue
+        try:
+            out.append(c.dt.tz_localize(tz, ambiguous='infer', nonexistent='NaT').dt.tz_convert('UTC'))
+        except ValueError as e:
+            print(f"Warning: Ambiguous timestamps in '{c.name}' assuming '{tz}' ({e}); using daylight time.")
+            if first_occurrence is None:
+                first_occurrence = _utc_lookup(uniques, tz, np.ones(len(uniques), dtype=bool))
+            out.append(_map_through(c, uniques, first_occurrence))
+    return out
+
+
+def normalize_timestamp_columns(
+    df: pd.DataFrame,
+    columns: Dict[str, str],
+    tz: str = EXCHANGE_TZ,
+    fmt: Optional[str] = NINJATRADER_TIMESTAMP_FORMAT,
+) -> pd.DataFrame:
+    """
+    Parse several timestamp columns and add their UTC versions to ``df`` in place.
+
+    Args:
+        df: Input DataFrame (modified in place)
+        columns: Mapping of source column name -> target column name
+        tz: Time zone of naive wall-clock values
+        fmt: strptime format tried first (see parse_timestamps())
+
+    Returns:
+        ``df``, with every target column present (NaT when its source is
+        missing or unparseable)
+    """
+    parsed = {}
+    for source, target in columns.items():
+        if source not in df.columns:
+            print(f"Warning: Source timestamp column '{source}' not found in DataFrame.")
+            df[target] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+            continue
+        parsed[target] = parse_timestamps(df[source], fmt)
+        if parsed[target].isna().all() and not df[source].isna().all():
+            print(f"Warning: All timestamps in column '{source}' failed to parse. Resulting '{target}' will be NaT.")
+
+    for target, values in zip(parsed, localize_to_utc(list(parsed.values()), tz)):
+        df[target] = values
+    return df
+
 
 def normalize_timestamps_in_df(df: pd.DataFrame, source_column_name: str, target_column_name: str) -> pd.DataFrame:
     """
     Parses a specific timestamp column to datetime objects, normalizes them to UTC,
     and stores them in a new target column.
 
+    Prefer normalize_timestamp_columns(), which handles several columns at
+    once without copying the frame.
+
     Args:
         df: Input DataFrame.
         source_column_name: The name of the column containing timestamps to normalize.
         target_column_name: The name of the new column to store normalized timestamps.
 
     Returns:
-        DataFrame with an added column containing UTC normalized timestamps.
+        Copy of the DataFrame with an added column containing UTC normalized timestamps.
         If the source column is not found or parsing fails for all rows,
         the target column might contain NaT.
     """
     if df is None or df.empty:
         return df
-
-    if source_column_name not in df.columns:
-        print(f"Warning: Source timestamp column '{source_column_name}' not found in DataFrame.")
-        # Create an empty NaT column for the target if source is missing
-        df_copy = df.copy()
-        df_copy[target_column_name] = pd.NaT 
-        return df_copy
-
-    df_copy = df.copy()
-    
-    # Attempt to parse the timestamp column
-    # Ensure the source column is treated as string first if it's mixed type or numeric
-    if not pd.api.types.is_string_dtype(df_copy[source_column_name]) and not pd.api.types.is_datetime64_any_dtype(df_copy[source_column_name]):
-        # Attempt to convert to string if it's not already, to handle potential numeric representations of dates/times
-        # This can be risky if numbers are not actually date/time representations.
-        # Consider if specific handling for Excel numbers is needed.
-        # For now, a simple astype(str) if it's not obviously datetime already.
-        try:
-            df_copy[source_column_name] = df_copy[source_column_name].astype(str)
-        except Exception as e:
-            print(f"Warning: Could not convert source column '{source_column_name}' to string before datetime parsing. Error: {e}")
-            df_copy[target_column_name] = pd.NaT
-            return df_copy
-            
-    parsed_timestamps = pd.to_datetime(df_copy[source_column_name], errors='coerce')
-
-    # Check if timestamps are timezone-aware
-    if parsed_timestamps.dt.tz is None:
-        # Timestamps are naive, localize to 'America/New_York' then convert to UTC
-        try:
-            df_copy[target_column_name] = parsed_timestamps.dt.tz_localize('America/New_York', ambiguous='infer', nonexistent='NaT').dt.tz_convert('UTC')
-        except Exception as e:
-            print(f"Warning: Could not localize timestamps from '{source_column_name}' assuming 'America/New_York'. Error: {e}. Fallback to UTC or NaT.")
-            # Fallback: try to infer as UTC or leave as NaT
-            try:
-                df_copy[target_column_name] = parsed_timestamps.dt.tz_localize('UTC', ambiguous='infer', nonexistent='NaT')
-            except Exception as e_utc:
-                print(f"Warning: Direct UTC localization for '{source_column_name}' also failed. Error: {e_utc}")
-                df_copy[target_column_name] = pd.NaT # Default to NaT if all fails
-    else:
-        # Timestamps are already timezone-aware, just convert to UTC
-        df_copy[target_column_name] = parsed_timestamps.dt.tz_convert('UTC')
-            
-    if parsed_timestamps.isna().all() and not df_copy[source_column_name].isna().all(): # if source had data but all failed to parse
-        print(f"Warning: All timestamps in column '{source_column_name}' failed to parse. Resulting '{target_column_name}' will be NaT.")
-    
-    # Ensure the target column exists even if all parsing failed to NaT
-    if target_column_name not in df_copy.columns:
-         df_copy[target_column_name] = pd.NaT
-
-    return df_copy 
\ No newline at end of file
+    return normalize_timestamp_columns(df.copy(), {source_column_name: target_column_name})
@@ -0,0 +1,83 @@
+"""
+Benchmark the order ingest pipeline against the previous per-row loader.
+
+Usage:
+    python scripts/bench_ingest.py [--repeat 1 100 1000] [--csv data/314_synthetic_trades-FINAL.csv]
+                                   [--loaders legacy c pyarrow]
+
+Each size is the sample export repeated N times. Reports wall time (best of
+3) and the deep memory footprint of the resulting frame. "c" and "pyarrow"
+are ingest_orders() with that CSV engine.
+"""
+import argparse
+import functools
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parsing.ingest import ingest_orders  # noqa: E402
+
+
+def legacy_load_orders(source) -> pd.DataFrame:
+    """The loader as it was before parsing.ingest: per-row timestamp parsing, object columns."""
+    df = pd.read_csv(source)
+    df["Status"] = df["Status"].astype(str).str.strip()
+    df["B/S"] = df["B/S"].astype(str).str.strip()
+    df.rename(columns={
+        "B/S": "side", "Contract": "symbol", "filledQty": "qty", "Avg Fill Price": "price",
+        "Order ID": "order_id_original", "Timestamp": "ts", "Fill Time": "fill_ts",
+    }, inplace=True)
+
+    def parse_timestamp(ts):
+        if pd.isna(ts):
+            return pd.NaT
+        return pd.to_datetime(ts, format="%m/%d/%Y %H:%M:%S", errors="coerce")
+
+    df["ts"] = df["ts"].apply(parse_timestamp)
+    df["fill_ts"] = df["fill_ts"].apply(parse_timestamp)
+    return df
+
+
+def _best_of(fn, data: bytes, runs: int = 3):
+    best, result = float("inf"), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn(io.BytesIO(data))
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", default=os.path.join(ROOT, "data", "314_synthetic_trades-FINAL.csv"))
+    parser.add_argument("--repeat", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--loaders", nargs="+", default=["legacy", "c", "pyarrow"])
+    args = parser.parse_args()
+
+    loaders = {
+        "legacy": legacy_load_orders,
+        "c": functools.partial(ingest_orders, engine="c"),
+        "pyarrow": functools.partial(ingest_orders, engine="pyarrow"),
+    }
+
+    with open(args.csv, "rb") as fh:
+        header, _, body = fh.read().partition(b"\n")
+    body = body.rstrip(b"\r\n") + b"\n"
+
+    print(f"{'rows':>10} {'loader':>8} {'seconds':>9} {'MB':>8}")
+    for n in args.repeat:
+        data = header + b"\n" + body * n
+        for name in args.loaders:
+            seconds, df = _best_of(loaders[name], data, runs=1 if n >= 1000 else 3)
+            mb = df.memory_usage(deep=True).sum() / 1e6
+            print(f"{len(df):>10} {name:>8} {seconds:>9.3f} {mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark worker cold start: how long a fresh interpreter takes to import
+app.py and answer /api/health.
+
+Usage:
+    python scripts/bench_startup.py [--runs 5] [--top 10]
+
+Each run is a new process (nothing cached in sys.modules), timed from spawn
+to the health response and to the end of ``import app``. ``--top`` lists the
+slowest top-level imports from ``python -X importtime``.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+resp = app.app.test_client().get("/api/health")
+assert resp.status_code == 200
+print(json.dumps({"import": imported - start, "health": time.perf_counter() - start}))
+"""
+
+
+def _run_probe() -> dict:
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def _top_imports(n: int) -> list:
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Direct imports of app.py are indented by three spaces.
+        if name.startswith("   ") and not name.startswith("    "):
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    _run_probe()  # warm the OS page cache and __pycache__
+    runs = [_run_probe() for _ in range(args.runs)]
+    print(f"{'stage':>10} {'median s':>9} {'min s':>7}")
+    for stage in ("import", "health", "process"):
+        values = [r[stage] for r in runs]
+        print(f"{stage:>10} {statistics.median(values):>9.3f} {min(values):>7.3f}")
+
+    if args.top:
+        print("\nslowest imports of app.py (cumulative):")
+        for micros, name in _top_imports(args.top):
+            print(f"{micros / 1e6:>9.3f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
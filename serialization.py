@@ -0,0 +1,101 @@
+"""
+Alternative wire formats for the trade-list endpoints.
+
+/api/analyze and /api/trades return every trade; for large accounts the
+row-per-object JSON is dominated by repeated keys and ISO timestamps. Callers
+can opt into a leaner encoding with ``?format=``:
+
+- ``json`` (default)  list of trade objects, unchanged
+- ``columnar``        JSON with ``trades`` as one array per field, times as
+                      epoch milliseconds
+- ``msgpack``         the columnar payload as MessagePack (needs ``msgpack``)
+- ``arrow``           trades as an Arrow IPC stream; the non-trade keys of the
+                      payload travel as JSON in the schema metadata
+                      (needs ``pyarrow``)
+
+The binary encoders are optional dependencies; requesting one that isn't
+installed returns 406.
+"""
+import importlib.util
+import json
+from typing import Any, Dict, List
+
+from flask import Response, abort, jsonify, request
+
+from models.trade import Trade, trades_to_columns
+
+try:  # optional
+    import msgpack
+except ImportError:  # pragma: no cover - depends on environment
+    msgpack = None
+
+# Optional too, and slow to import (~0.1 s), so it is only imported by the
+# first ?format=arrow request.
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+FORMATS = ("json", "columnar", "msgpack", "arrow")
+
+MSGPACK_MIMETYPE = "application/msgpack"
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+
+def requested_format() -> str:
+    """Return the ``format`` query parameter, validated (400 if unknown)."""
+    fmt = request.args.get("format", "json").lower()
+    if fmt not in FORMATS:
+        abort(400, f"Unsupported format '{fmt}'. Use one of: {', '.join(FORMATS)}.")
+    if fmt == "msgpack" and msgpack is None:
+        abort(406, "MessagePack output is not available on this server.")
+    if fmt == "arrow" and not HAS_PYARROW:
+        abort(406, "Arrow output is not available on this server.")
+    return fmt
+
+
+def trades_response(trades: List[Trade], payload: Dict[str, Any], fmt: str) -> Response:
+    """Build the response for ``payload`` plus ``trades`` in format ``fmt``.
+
+    Args:
+        trades: Trades to encode under the ``trades`` key
+        payload: Remaining top-level keys (meta, date_range, ...)
+        fmt: One of FORMATS, normally from requested_format()
+
+    Returns:
+        Flask Response
+    """
+    if fmt == "json":
+        return jsonify({**payload, "trades": [t.to_dict() for t in trades]})
+
+    if fmt == "arrow":
+        return _arrow_response(trades, payload)
+
+    body = {**payload, "trades": trades_to_columns(trades)}
+    if fmt == "columnar":
+        return jsonify(body)
+    return Response(msgpack.packb(body, default=_msgpack_default), mimetype=MSGPACK_MIMETYPE)
+
+
+def _msgpack_default(obj):
+    # numpy scalars that slipped through from pandas
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+
+def _arrow_response(trades: List[Trade], payload: Dict[str, Any]) -> Response:
+    import pyarrow as pa
+
+    columns = trades_to_columns(trades)
+    time_type = pa.timestamp("ms", tz="UTC")
+    arrays = {
+        key: pa.array(values, type=time_type) if key in ("entryTime", "exitTime")
+        else pa.array(values, type=pa.list_(pa.string())) if key == "mistakes"
+        else pa.array(values)
+        for key, values in columns.items()
+    }
+    table = pa.table(arrays)
+    table = table.replace_schema_metadata({"payload": json.dumps(payload, default=str)})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue().to_pybytes(), mimetype=ARROW_MIMETYPE)
@@ -0,0 +1,275 @@
+"""
+Analyzed datasets shared between the worker processes of one server.
+
+Every gunicorn worker otherwise holds (and can only serve) the dataset it
+analyzed itself. With a SharedDatasetStore, the worker that analyzes an
+upload publishes the trades and the retained order frame as one
+memory-mapped file in /dev/shm. Each column is stored as a flat NumPy array,
+with categoricals and strings as integer codes (analytics.parallel's column
+encoding). A small pointer file names the current publication. Before
+handling a request, every other worker compares that pointer with what it
+holds, and attaches to anything newer read-only:
+- order columns are views straight onto the shared pages, so there is one
+  copy per host;
+- trades are not shared beyond the file: each worker rebuilds its own list
+  of Trade objects from the trade columns, because the endpoints, the
+  mentor tools and threshold re-tagging work on (and re-tag in place)
+  mutable Trade objects.
+
+Publication is atomic. The data file is written under a temporary name and
+renamed into place, then the pointer is replaced the same way. A worker that
+still has an older file mapped keeps reading it after it is unlinked.
+
+All workers must use the same ``prefix``. default_prefix() is the pid of the
+process that imports app.py, so workers forked from a preloading gunicorn
+master (gunicorn.conf.py) share one store. Its files live in a private
+directory named after the prefix (private_dir()), and each file's manifest is
+JSON, so nothing another user can write to /dev/shm is ever read.
+"""
+import fcntl
+import json
+import mmap
+import os
+import shutil
+import stat
+import struct
+import tempfile
+import time
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytics.parallel import encode_column, decode_column
+from models.trade import Trade
+
+_HEADER = struct.Struct("<QQ")  # manifest offset, manifest length
+_ALIGN = 64
+
+# Trade fields that are None when unset (NaN / NaT / missing in the columns).
+_OPTIONAL_FIELDS = {"entry_time", "exit_time", "exit_order_id", "pnl", "risk_points", "points_lost"}
+_TRADE_FIELDS = [f.name for f in fields(Trade) if f.init]
+_MISTAKE_SEP = "\n"
+
+
+def default_prefix() -> str:
+    return f"tradehabit-{os.getpid()}"
+
+
+def _shm_dir() -> str:
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def private_dir(path: str) -> str:
+    """
+    Create ``path`` as a directory only this user can use (mode 0700), or
+    check that an existing one is; returns ``path``.
+
+    Raises:
+        PermissionError: ``path`` isn't a directory, belongs to another user
+            or is open to other users (e.g. planted in a world-writable
+            /dev/shm before the server started)
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        raise PermissionError(f"{path} is not a private directory")
+    return path
+
+
+@dataclass
+class SharedDataset:
+    """A published dataset as attached by a worker."""
+
+    dataset_id: str
+    seq: int
+    trades: List[Trade]
+    orders: Optional[pd.DataFrame]
+    meta: Dict[str, Any]
+
+
+def _trade_columns(trades: List[Trade]) -> Dict[str, pd.Series]:
+    columns = {}
+    for name in _TRADE_FIELDS:
+        values = [getattr(t, name) for t in trades]
+        if name == "mistakes":
+            values = [_MISTAKE_SEP.join(v) for v in values]
+        if name in ("entry_time", "exit_time"):
+            columns[name] = pd.Series(pd.to_datetime(values))
+        elif name in ("id", "symbol", "side", "mistakes", "exit_order_id"):
+            columns[name] = pd.Series(values, dtype=object)
+        else:
+            columns[name] = pd.Series(values)
+    return columns
+
+
+def _decode_trade_column(name: str, array: np.ndarray, spec: Tuple[str, Any]) -> List[Any]:
+    kind, meta = spec
+    if kind == "category":
+        # Categories are Python scalars; code -1 is a missing value.
+        values = [meta[c] if c >= 0 else None for c in array.tolist()]
+    elif array.dtype.kind == "M" or kind == "datetime":
+        values = [None if pd.isna(v) else v for v in pd.DatetimeIndex(decode_column(array, spec))]
+    else:
+        values = array.tolist()
+        if name in _OPTIONAL_FIELDS:
+            values = [None if v != v else v for v in values]  # NaN -> None
+    if name == "mistakes":
+        values = [v.split(_MISTAKE_SEP) if v else [] for v in values]
+    return values
+
+
+class SharedDatasetStore:
+    """
+    Publishes and attaches datasets in memory-mapped files, in the private
+    directory ``prefix`` under ``directory`` (/dev/shm by default).
+
+    Raises:
+        PermissionError: that directory exists but isn't private to this user
+    """
+
+    def __init__(self, prefix: str, directory: Optional[str] = None):
+        self.prefix = prefix
+        self.directory = directory or _shm_dir()
+        self.path = private_dir(os.path.join(self.directory, prefix))
+        self._pointer = os.path.join(self.path, "current")
+        self._lock = os.path.join(self.path, "lock")
+
+    def _data_path(self, seq: int) -> str:
+        return os.path.join(self.path, f"{seq}.bin")
+
+    def current(self) -> Optional[Tuple[str, int]]:
+        """(dataset id, sequence number) of the latest publication, or None."""
+        try:
+            with open(self._pointer, "r", encoding="ascii") as fh:
+                dataset_id, seq = fh.read().split()
+        except (FileNotFoundError, ValueError):
+            return None
+        return dataset_id, int(seq)
+
+    def publish(
+        self,
+        dataset_id: str,
+        trades: List[Trade],
+        orders: Optional[pd.DataFrame],
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Make ``trades`` and ``orders`` the current shared dataset.
+
+        Args:
+            dataset_id: Content hash of the upload (cohort_store.dataset_id)
+            trades: Analyzed trades (read, not modified)
+            orders: Order frame the endpoints re-read, or None
+            meta: Small JSON-serializable extras (time zone, thresholds, ...)
+
+        Returns:
+            The publication's sequence number
+        """
+        arrays, manifest = [], {"dataset_id": dataset_id, "meta": meta or {}, "trades": {}, "orders": None}
+        for name, values in _trade_columns(trades).items():
+            array, spec = encode_column(values)
+            manifest["trades"][name] = (len(arrays), spec)
+            arrays.append(array)
+        if orders is not None:
+            columns = {}
+            for name in orders.columns:
+                array, spec = encode_column(orders[name])
+                columns[name] = (len(arrays), spec)
+                arrays.append(array)
+            index = None
+            if not orders.index.equals(pd.RangeIndex(len(orders))):
+                index = len(arrays)
+                arrays.append(orders.index.to_numpy())
+            manifest["orders"] = {"columns": columns, "index": index, "rows": len(orders),
+                                  "attrs": dict(orders.attrs)}
+
+        with open(self._lock, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            previous = self.current()
+            seq = max(time.time_ns(), previous[1] + 1 if previous else 0)
+            path = self._data_path(seq)
+            self._write(path, manifest, arrays)
+            self._replace(self._pointer, f"{dataset_id} {seq}".encode("ascii"))
+            if previous is not None:
+                try:
+                    os.unlink(self._data_path(previous[1]))
+                except FileNotFoundError:
+                    pass
+        return seq
+
+    def _write(self, path: str, manifest: Dict[str, Any], arrays: List[np.ndarray]) -> None:
+        # Layout: header (manifest offset and length), the arrays at aligned
+        # offsets, then the manifest, as JSON, with those offsets.
+        placed, offset = [], _ALIGN
+        for array in arrays:
+            placed.append((offset, array.dtype.str, array.shape[0]))
+            offset += -(-array.nbytes // _ALIGN) * _ALIGN
+        manifest["arrays"] = placed
+        body = json.dumps(manifest).encode("utf-8")
+
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(_HEADER.pack(offset, len(body)))
+            for (start, _, _), array in zip(placed, arrays):
+                fh.seek(start)
+                fh.write(np.ascontiguousarray(array).tobytes())
+            fh.seek(offset)
+            fh.write(body)
+        os.replace(tmp, path)
+
+    def _replace(self, path: str, content: bytes) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(content)
+        os.replace(tmp, path)
+
+    def attach(self) -> Optional[SharedDataset]:
+        """
+        Map the current publication read-only, or None if there is none (or
+        it was replaced while attaching; the next call sees the new one).
+        """
+        current = self.current()
+        if current is None:
+            return None
+        dataset_id, seq = current
+        try:
+            with open(self._data_path(seq), "rb") as fh:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+        start, length = _HEADER.unpack_from(mapped, 0)
+        manifest = json.loads(mapped[start:start + length])
+        # Views onto the mapping; they keep it alive after it is unlinked.
+        arrays = [
+            np.frombuffer(mapped, dtype=dtype, count=n, offset=start)
+            for start, dtype, n in manifest["arrays"]
+        ]
+
+        columns = {
+            name: _decode_trade_column(name, arrays[i], spec)
+            for name, (i, spec) in manifest["trades"].items()
+        }
+        count = len(next(iter(columns.values()), []))
+        trades = [Trade(**{name: columns[name][row] for name in columns}) for row in range(count)]
+
+        orders = None
+        if manifest["orders"] is not None:
+            layout = manifest["orders"]
+            index = pd.RangeIndex(layout["rows"]) if layout["index"] is None else pd.Index(arrays[layout["index"]])
+            orders = pd.DataFrame(
+                {name: decode_column(arrays[i], spec) for name, (i, spec) in layout["columns"].items()},
+                index=index,
+                copy=False,
+            )
+            orders.attrs = layout["attrs"]
+        return SharedDataset(dataset_id, seq, trades, orders, manifest["meta"])
+
+    def clear(self) -> None:
+        """Remove this store's directory and everything in it."""
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -41,6 +41,18 @@ def make_file_storage(name: str, data: bytes):
     return (io.BytesIO(data), name)
 
 
+@pytest.fixture
+def trade_fingerprint():
+    """Everything analysis produces for a trade except its id."""
+    def fingerprint(trades):
+        return [
+            (t.symbol, t.side, t.entry_time, t.exit_time, t.entry_qty, t.exit_qty,
+             t.exit_order_id, t.pnl, t.points_lost, t.risk_points, t.mistakes)
+            for t in trades
+        ]
+    return fingerprint
+
+
 # ============================================================================
 # Live Mode Fixtures (Phase 2)
 # ============================================================================
@@ -130,7 +142,7 @@ def sample_trade_objs():
     ]
     # Add points_lost and risk_points attributes
     for t in trades:
-        if not hasattr(t, 'points_lost'):
+        if t.points_lost is None:
             t.points_lost = abs(t.pnl) if t.pnl < 0 else 0
         if not hasattr(t, 'risk_points') and t.id not in ["trade-2"]:
             t.risk_points = 10.0 if t.id == "trade-1" else (50.0 if t.id == "trade-3" else (15.0 if t.id == "trade-4" else 12.0))
@@ -0,0 +1,59 @@
+"""
+Tests for analysis_cache.py.
+"""
+import pandas as pd
+
+from analysis_cache import AnalysisCache, CachedAnalysis
+from cohort_store import dataset_id
+from models.trade import Trade
+
+PARAMS = (None, "America/New_York", 1.0, 1.5, 1.0, "points")
+
+
+def _entry(data, params=PARAMS, trades=None):
+    return CachedAnalysis(dataset_id(data), len(data), params, pd.DataFrame(), trades or [])
+
+
+def test_hits_need_same_bytes_and_params_and_return_copies():
+    cache = AnalysisCache()
+    trade = Trade(symbol="MNQ", mistakes=["no stop-loss order"])
+    cache.put(_entry(b"a,b\n1,2\n", trades=[trade]))
+
+    hit = cache.get(dataset_id(b"a,b\n1,2\n"), PARAMS)
+    assert hit is not None and hit.trades[0].mistakes == ["no stop-loss order"]
+    hit.trades[0].mistakes.append("revenge trade")
+    assert cache.get(dataset_id(b"a,b\n1,2\n"), PARAMS).trades[0].mistakes == ["no stop-loss order"]
+    trade.mistakes.clear()
+    assert cache.get(dataset_id(b"a,b\n1,2\n"), PARAMS).trades[0].mistakes == ["no stop-loss order"]
+
+    assert cache.get(dataset_id(b"a,b\n1,2\n"), PARAMS[:2] + (2.0,) + PARAMS[3:]) is None
+
+
+def test_least_recently_used_entry_is_dropped():
+    cache = AnalysisCache(max_entries=2)
+    for data in (b"h\n1\n", b"h\n2\n"):
+        cache.put(_entry(data))
+    cache.get(dataset_id(b"h\n1\n"), PARAMS)
+    cache.put(_entry(b"h\n3\n"))
+
+    assert cache.get(dataset_id(b"h\n2\n"), PARAMS) is None
+    assert cache.get(dataset_id(b"h\n1\n"), PARAMS) is not None
+    assert len(cache) == 2
+
+
+def test_find_prefix_picks_longest_line_aligned_prefix():
+    cache = AnalysisCache()
+    for data in (b"h\n1\n", b"h\n1\n2\n", b"h\n1\n2"):
+        cache.put(_entry(data))
+
+    assert cache.find_prefix(b"h\n1\n2\n3\n", PARAMS).size == len(b"h\n1\n2\n")
+    # Same bytes is a hit, not a prefix; a different first row matches nothing.
+    assert cache.find_prefix(b"h\n1\n", PARAMS) is None
+    assert cache.find_prefix(b"h\n9\n2\n3\n", PARAMS) is None
+    assert cache.find_prefix(b"h\n1\n2\n3\n", PARAMS[:-1] + ("dollars",)) is None
+
+
+def test_size_zero_disables_cache():
+    cache = AnalysisCache(max_entries=0)
+    cache.put(_entry(b"h\n1\n"))
+    assert len(cache) == 0
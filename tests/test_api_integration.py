@@ -5,6 +5,7 @@ Tests API endpoints to ensure they work correctly with both old and new insights
 These tests establish baseline behavior before migrating to the new insights system.
 """
 import io
+import json
 import pytest
 
 
@@ -256,3 +257,506 @@ class TestAPIPerformance:
 
         assert response.status_code == 200
         assert elapsed < 1.0, f"Insights endpoint took {elapsed:.2f}s, should be < 1s"
+
+
+class TestAPIDashboard:
+    """Tests for the combined /api/dashboard endpoint."""
+
+    SECTIONS = [
+        'summary', 'losses', 'revenge', 'risk-sizing', 'excessive-risk',
+        'stop-loss', 'winrate-payoff', 'insights', 'goals'
+    ]
+
+    def _upload(self, client, csv_bytes):
+        data = {'file': (io.BytesIO(csv_bytes), 'orders.csv')}
+        r = client.post('/api/analyze', data=data, content_type='multipart/form-data')
+        assert r.status_code == 200
+
+    def test_dashboard_returns_all_sections(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+
+        response = client.get('/api/dashboard')
+        assert response.status_code == 200
+
+        dashboard = response.get_json()
+        for section in self.SECTIONS:
+            assert section in dashboard, f"Missing section: {section}"
+
+    def test_dashboard_sections_match_endpoints(self, client, tiny_valid_csv_bytes):
+        """Each section is identical to its standalone endpoint's body."""
+        self._upload(client, tiny_valid_csv_bytes)
+
+        dashboard = client.get('/api/dashboard').get_json()
+        for section in self.SECTIONS:
+            standalone = client.get(f'/api/{section}')
+            assert standalone.status_code == 200, section
+            assert dashboard[section] == standalone.get_json(), section
+
+    def test_dashboard_etag_not_modified(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+
+        first = client.get('/api/dashboard')
+        etag = first.headers.get('ETag')
+        assert etag
+
+        second = client.get('/api/dashboard', headers={'If-None-Match': etag})
+        assert second.status_code == 304
+        assert second.get_data() == b''
+
+    def test_dashboard_etag_changes_with_thresholds(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+
+        default = client.get('/api/dashboard')
+        tuned = client.get('/api/dashboard?sigma_loss=2.5',
+                           headers={'If-None-Match': default.headers['ETag']})
+        assert tuned.status_code == 200
+        assert tuned.headers['ETag'] != default.headers['ETag']
+
+
+class TestAPIRevenge:
+    """Tests for /api/revenge."""
+
+    def test_revenge_endpoint(self, client, tiny_valid_csv_bytes):
+        data = {'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')}
+        client.post('/api/analyze', data=data, content_type='multipart/form-data')
+
+        response = client.get('/api/revenge?k=1.0')
+        assert response.status_code == 200
+        result = response.get_json()
+        for key in ['revenge_multiplier', 'total_revenge_trades', 'revenge_win_rate',
+                    'overall_win_rate', 'overall_payoff_ratio', 'diagnostic']:
+            assert key in result
+
+    def test_smaller_k_reports_fewer_revenge_trades(self, client):
+        # A loss, then a re-entry 13 seconds later: revenge at the default k
+        content = (
+            "Order ID,Timestamp,Fill Time,B/S,Contract,filledQty,Avg Fill Price,Type,Limit Price,Stop Price,Status\n"
+            "1,01/02/2024 7:30:00,01/02/2024 7:30:00,Buy,MNQH4,1,21490.25,Market,21490.25,,Filled\n"
+            "2,01/02/2024 7:30:00,01/02/2024 7:36:47,Sell,MNQH4,1,21480.25,Stop,,21480.25,Filled\n"
+            "3,01/02/2024 7:37:00,01/02/2024 7:37:00,Buy,MNQH4,1,21481.25,Market,21481.25,,Filled\n"
+            "4,01/02/2024 7:37:00,01/02/2024 7:43:00,Sell,MNQH4,1,21495.25,Limit,21495.25,,Filled\n"
+        ).encode("utf-8")
+        data = {'file': (io.BytesIO(content), 'orders.csv')}
+        client.post('/api/analyze', data=data, content_type='multipart/form-data')
+
+        assert client.get('/api/revenge?k=1.0').get_json()['total_revenge_trades'] == 1
+        assert client.get('/api/revenge?k=0.0001').get_json()['total_revenge_trades'] == 0
+
+        def revenge_diagnostic(k):
+            insights = client.get(f'/api/insights?k={k}').get_json()
+            return next(i['diagnostic'] for i in insights if i['title'] == 'Revenge Trading')
+
+        assert revenge_diagnostic(1.0).startswith('1 of your 2 trades')
+        assert revenge_diagnostic(0.0001).startswith('None of your 2 trades')
+
+
+class TestAPIGoalsCalculate:
+    """Tests for /api/goals/calculate."""
+
+    def test_calculate_matches_goal_report(self, client, tiny_valid_csv_bytes):
+        data = {'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')}
+        client.post('/api/analyze', data=data, content_type='multipart/form-data')
+
+        report = client.get('/api/goals').get_json()
+        goals = [
+            {'id': str(i), 'title': g['title'], 'target': g['goal'], 'metric': g['metric'],
+             'mistake_types': mistake_types}
+            for i, (g, mistake_types) in enumerate(zip(report, [
+                [], ['no stop-loss order', 'excessive risk', 'outsized loss'], ['revenge trade'],
+            ]))
+        ]
+        response = client.post('/api/goals/calculate', json=goals)
+        assert response.status_code == 200
+
+        results = response.get_json()['goals']
+        for expected, got in zip(report, results):
+            assert got['current_streak'] == expected['current_streak']
+            assert got['best_streak'] == expected['best_streak']
+            assert got['progress'] == expected['progress']
+
+    def test_calculate_reports_bad_metric(self, client, tiny_valid_csv_bytes):
+        data = {'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')}
+        client.post('/api/analyze', data=data, content_type='multipart/form-data')
+
+        response = client.post('/api/goals/calculate',
+                               json=[{'id': 'x', 'title': 'Weekly', 'metric': 'weeks', 'target': 3}])
+        assert 'error' in response.get_json()['goals'][0]
+
+
+class TestAPIGoalsTimeline:
+    """Tests for /api/goals/timeline."""
+
+    def _upload(self, client, csv_bytes):
+        data = {'file': (io.BytesIO(csv_bytes), 'orders.csv')}
+        client.post('/api/analyze', data=data, content_type='multipart/form-data')
+
+    def test_timeline_predefined_goals(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+
+        report = client.get('/api/goals').get_json()
+        timeline = client.get('/api/goals/timeline?points=10').get_json()
+
+        assert timeline['metric'] == 'trades'
+        assert len(timeline['x']) == len(timeline['position'])
+        for goal, series in zip(report, timeline['goals']):
+            assert series['title'] == goal['title']
+            assert series['current'][-1] == goal['current_streak']
+            assert series['best'][-1] == goal['best_streak']
+
+    def test_timeline_custom_goals(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+
+        response = client.post('/api/goals/timeline?metric=days', json={'goals': [
+            {'id': 'g1', 'title': 'No revenge', 'target': 3, 'mistake_types': ['revenge trade']},
+        ]})
+        assert response.status_code == 200
+        series = response.get_json()['goals'][0]
+        assert series['id'] == 'g1'
+        assert len(series['current']) == len(response.get_json()['x'])
+
+    def test_timeline_rejects_bad_metric(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+        assert client.get('/api/goals/timeline?metric=weeks').status_code == 400
+
+
+class TestAPITimeseries:
+    """Tests for /api/timeseries."""
+
+    def _upload(self, client, csv_bytes):
+        data = {'file': (io.BytesIO(csv_bytes), 'orders.csv')}
+        client.post('/api/analyze', data=data, content_type='multipart/form-data')
+
+    def test_timeseries_by_period(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+
+        body = client.get('/api/timeseries?period=day').get_json()
+        assert body['period'] == 'day'
+        total = sum(w['total_trades'] for w in body['windows'])
+        assert total == len(client.get('/api/trades').get_json()['trades'])
+
+    def test_timeseries_rolling(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+
+        body = client.get('/api/timeseries?window=2').get_json()
+        assert body['window'] == 2
+        assert all(w['total_trades'] == 2 for w in body['windows'])
+
+    def test_timeseries_bad_params(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+        assert client.get('/api/timeseries?period=decade').status_code == 400
+        assert client.get('/api/timeseries?window=0').status_code == 400
+        assert client.get('/api/timeseries?window=1000000').status_code == 400
+
+
+class TestAPIBreakdown:
+    """Tests for /api/breakdown."""
+
+    def _upload(self, client, csv_bytes):
+        data = {'file': (io.BytesIO(csv_bytes), 'orders.csv')}
+        client.post('/api/analyze', data=data, content_type='multipart/form-data')
+
+    def test_breakdown_by_symbol_and_session(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+        n_trades = len(client.get('/api/trades').get_json()['trades'])
+
+        for by in ('symbol', 'side', 'session'):
+            body = client.get(f'/api/breakdown?by={by}').get_json()
+            assert body['by'] == by
+            assert sum(g['total_trades'] for g in body['groups']) == n_trades
+
+    def test_breakdown_hours_are_upload_wall_clock(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+
+        hours = [g['group'] for g in client.get('/api/breakdown?by=hour').get_json()['groups']]
+        assert hours == ['07:00', '08:00', '09:00']
+
+    def test_breakdown_bad_params(self, client, tiny_valid_csv_bytes):
+        self._upload(client, tiny_valid_csv_bytes)
+        assert client.get('/api/breakdown?by=moon').status_code == 400
+        assert client.get('/api/breakdown?by=hour&tz=Nowhere/Special').status_code == 400
+
+
+class TestAPIRobustStatsSketch:
+    """ROBUST_STATS=sketch must agree with exact stats on small datasets."""
+
+    def test_losses_and_excessive_risk_match_exact(self, client, tiny_valid_csv_bytes, monkeypatch):
+        data = {'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')}
+        client.post('/api/analyze', data=data, content_type='multipart/form-data')
+
+        exact = [client.get(url).get_json() for url in ('/api/losses', '/api/excessive-risk')]
+        import app as app_module
+        monkeypatch.setattr(app_module, 'ROBUST_STATS', 'sketch')
+        sketched = [client.get(url).get_json() for url in ('/api/losses', '/api/excessive-risk')]
+
+        assert sketched == exact
+
+
+class TestAPICohort:
+    """Tests for /api/cohort."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cohort(self, monkeypatch):
+        import app as app_module
+        from cohort_store import CohortStore
+        monkeypatch.setattr(app_module, 'COHORT', CohortStore())
+
+    def _upload(self, client, csv_bytes):
+        data = {'file': (io.BytesIO(csv_bytes), 'orders.csv')}
+        return client.post('/api/analyze', data=data, content_type='multipart/form-data').get_json()
+
+    def test_reupload_is_counted_once(self, client, tiny_valid_csv_bytes):
+        first = self._upload(client, tiny_valid_csv_bytes)['meta']['datasetId']
+        second = self._upload(client, tiny_valid_csv_bytes)['meta']['datasetId']
+        assert first == second
+
+        body = client.get('/api/cohort').get_json()
+        assert body['datasetId'] == first
+        assert body['cohortSize'] == 1
+        assert body['metrics']['revenge_rate']['percentile'] == 100
+
+    def test_lookup_by_dataset_id(self, client, tiny_valid_csv_bytes):
+        ds_id = self._upload(client, tiny_valid_csv_bytes)['meta']['datasetId']
+        assert client.get(f'/api/cohort?dataset={ds_id}').status_code == 200
+        assert client.get('/api/cohort?dataset=nope').status_code == 404
+
+
+class TestAPIAnalyzeIngestOptions:
+    """Tests for /api/analyze broker and tz options."""
+
+    def test_unknown_broker_or_tz_is_rejected(self, client, tiny_valid_csv_bytes):
+        for query in ('?broker=interactive', '?tz=Mars/Olympus'):
+            data = {'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')}
+            resp = client.post('/api/analyze' + query, data=data, content_type='multipart/form-data')
+            assert resp.status_code == 400
+
+
+class TestAPIAnalyzeAsync:
+    """Tests for /api/analyze?async=1 and the /api/jobs endpoints."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        import app as app_module
+        from analysis_cache import AnalysisCache
+        monkeypatch.setattr(app_module, 'ANALYSIS_CACHE', AnalysisCache())
+
+    def _submit(self, client, csv_bytes, query=''):
+        data = {'file': (io.BytesIO(csv_bytes), 'orders.csv')}
+        return client.post('/api/analyze?async=1' + query, data=data, content_type='multipart/form-data')
+
+    def test_settings_retag_waits_for_a_running_analysis(self, client, tiny_valid_csv_bytes, monkeypatch):
+        import threading
+        import app as app_module
+        self._submit(client, tiny_valid_csv_bytes)
+        app_module.JOBS._executor.submit(lambda: None).result()  # let the job finish
+        original_k = app_module.THRESHOLDS['k']
+        monkeypatch.setitem(app_module.THRESHOLDS, 'k', original_k)
+
+        # Stand in for an analysis holding the lock while it swaps the dataset.
+        with app_module._analysis_lock:
+            retag = threading.Thread(target=lambda: app_module.app.test_client().post('/api/settings', json={'k': 2.0}))
+            retag.start()
+            retag.join(0.3)
+            assert retag.is_alive()
+            assert app_module.THRESHOLDS['k'] == original_k
+        retag.join(5)
+        assert not retag.is_alive()
+        assert app_module.THRESHOLDS['k'] == 2.0
+
+    def test_job_result_matches_sync_response(self, client, tiny_valid_csv_bytes):
+        resp = self._submit(client, tiny_valid_csv_bytes)
+        assert resp.status_code == 202
+        job = resp.get_json()
+        assert resp.headers['Location'] == job['links']['self']
+
+        # The event stream ends once the job has finished.
+        events = client.get(job['links']['events']).get_data(as_text=True)
+        stages = [json.loads(line[len('data: '):])['stage'] for line in events.splitlines() if line.startswith('data: ')]
+        assert stages == ['queued', 'running', 'parsing', 'analyzing', 'summarizing', 'done']
+
+        status = client.get(job['links']['self']).get_json()
+        assert status['status'] == 'done'
+
+        result = client.get(job['links']['result'])
+        assert result.status_code == 200
+        sync = client.post('/api/analyze', data={'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')},
+                           content_type='multipart/form-data')
+        async_body, sync_body = result.get_json(), sync.get_json()
+        assert async_body['meta'] == sync_body['meta']
+        assert len(async_body['trades']) == len(sync_body['trades'])
+
+    def test_failed_job_reports_error(self, client, tiny_valid_csv_bytes):
+        job = self._submit(client, tiny_valid_csv_bytes, '&broker=interactive').get_json()
+        client.get(job['links']['events']).get_data()
+
+        assert client.get(job['links']['self']).get_json()['status'] == 'failed'
+        result = client.get(job['links']['result'])
+        assert result.status_code == 400
+        assert 'interactive' in result.get_json()['message']
+
+    def test_job_served_by_another_worker(self, client, tiny_valid_csv_bytes, tmp_path, monkeypatch):
+        import app as app_module
+        from jobs import JobQueue
+        monkeypatch.setattr(app_module, 'JOBS', JobQueue(directory=str(tmp_path)))
+        job = self._submit(client, tiny_valid_csv_bytes).get_json()
+        client.get(job['links']['events']).get_data()
+        local = client.get(job['links']['result']).get_json()
+
+        # A worker that didn't run the job only has its record to go on.
+        monkeypatch.setattr(app_module, 'JOBS', JobQueue(directory=str(tmp_path)))
+        assert client.get(job['links']['self']).get_json()['status'] == 'done'
+        events = client.get(job['links']['events']).get_data(as_text=True)
+        assert events.count('event: stage') == 6
+        remote = client.get(job['links']['result'])
+        assert remote.status_code == 200
+        assert remote.get_json() == local
+        assert client.get(job['links']['result'] + '?format=columnar').status_code == 200
+
+    def test_unknown_job(self, client):
+        assert client.get('/api/jobs/nope').status_code == 404
+        assert client.get('/api/jobs/nope/result').status_code == 404
+
+
+class TestAPIAnalysisCache:
+    """Tests for re-upload caching on /api/analyze."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        import app as app_module
+        from analysis_cache import AnalysisCache
+        monkeypatch.setattr(app_module, 'ANALYSIS_CACHE', AnalysisCache())
+
+    def _upload(self, client, csv_bytes, query=''):
+        data = {'file': (io.BytesIO(csv_bytes), 'orders.csv')}
+        return client.post('/api/analyze' + query, data=data, content_type='multipart/form-data')
+
+    def test_identical_reupload_is_a_hit(self, client, tiny_valid_csv_bytes):
+        first = self._upload(client, tiny_valid_csv_bytes)
+        again = self._upload(client, tiny_valid_csv_bytes)
+        other_sigma = self._upload(client, tiny_valid_csv_bytes, '?sigma=2.5')
+
+        assert first.headers['X-Analysis-Cache'] == 'miss'
+        assert again.headers['X-Analysis-Cache'] == 'hit'
+        assert other_sigma.headers['X-Analysis-Cache'] == 'miss'
+        assert again.get_json() == first.get_json()
+
+    def test_grown_file_only_analyzes_the_tail(self, client, tiny_valid_csv_bytes):
+        lines = tiny_valid_csv_bytes.splitlines(keepends=True)
+        head = b''.join(lines[:len(lines) // 2 + 1])
+
+        self._upload(client, head)
+        grown = self._upload(client, tiny_valid_csv_bytes)
+        assert grown.headers['X-Analysis-Cache'] == 'prefix'
+
+        import app as app_module
+        from analysis_cache import AnalysisCache
+        app_module.ANALYSIS_CACHE = AnalysisCache(max_entries=0)
+        fresh = self._upload(client, tiny_valid_csv_bytes)
+        assert fresh.headers['X-Analysis-Cache'] == 'miss'
+
+        strip_ids = lambda body: [{k: v for k, v in t.items() if k != 'id'} for t in body['trades']]
+        assert grown.get_json()['meta'] == fresh.get_json()['meta']
+        assert strip_ids(grown.get_json()) == strip_ids(fresh.get_json())
+
+    def test_prefix_hit_matches_cold_analysis_of_grown_file(self, client, tiny_valid_csv_bytes):
+        import app as app_module
+        from analysis_cache import AnalysisCache
+        from analytics.incremental import PREFIX_ORDER_COLUMNS
+        header, *rows = tiny_valid_csv_bytes.splitlines(keepends=True)
+        # A stop placed before the first entry and an exit ordered before it:
+        # the first trade is unprotected by the head alone, not the whole file.
+        head = header + b''.join(rows[:1]) + \
+            b"7301604732,01/02/2024 7:29:55,,Sell,MNQH4,0,,Stop,,21480,Working\n" + \
+            rows[1].replace(b"01/02/2024 7:30:00,01/02/2024 7:36:47", b"01/02/2024 7:29:00,01/02/2024 7:36:47")
+        head = head.replace(b"01/02/2024 7:30:00,01/02/2024 7:30:00", b"01/02/2024 7:29:50,01/02/2024 7:30:00")
+        grown_bytes = head + b''.join(rows[2:])
+
+        self._upload(client, head)
+        cached = next(iter(app_module.ANALYSIS_CACHE._entries.values()))
+        assert set(cached.orders.columns) <= set(PREFIX_ORDER_COLUMNS)
+        assert cached.rows == 3
+        grown = self._upload(client, grown_bytes)
+        assert grown.headers['X-Analysis-Cache'] == 'prefix'
+
+        app_module.ANALYSIS_CACHE = AnalysisCache(max_entries=0)
+        cold = self._upload(client, grown_bytes)
+        assert cold.headers['X-Analysis-Cache'] == 'miss'
+
+        strip_ids = lambda body: [{k: v for k, v in t.items() if k != 'id'} for t in body['trades']]
+        assert grown.get_json()['meta'] == cold.get_json()['meta']
+        assert strip_ids(grown.get_json()) == strip_ids(cold.get_json())
+        assert grown.get_json()['trades'][0]['mistakes'] == []
+
+
+class TestAPIUploadLimits:
+    """Tests for /api/analyze upload size checks."""
+
+    def test_oversized_file_is_rejected(self, client, tiny_valid_csv_bytes, monkeypatch):
+        import app as app_module
+        monkeypatch.setattr(app_module, 'MAX_MB', 0)
+        data = {'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')}
+        resp = client.post('/api/analyze', data=data, content_type='multipart/form-data')
+        assert resp.status_code == 413
+        assert resp.get_json()['message'] == 'This file exceeds the 0 MB size limit.'
+
+    def test_oversized_body_is_rejected_before_reading(self, client):
+        from uploads import body_limit
+        resp = client.post('/api/analyze', data=b'x', content_type='multipart/form-data; boundary=b',
+                           environ_overrides={'CONTENT_LENGTH': str(body_limit(2) + 1)})
+        assert resp.status_code == 413
+        assert '2 MB' in resp.get_json()['message']
+
+    def test_async_body_cap_only_applies_to_background_uploads(self, client):
+        from uploads import body_limit
+        oversized = {'CONTENT_LENGTH': str(body_limit(2) + 1)}
+        settings = client.post('/api/settings?async=0', data=b'{}', content_type='application/json',
+                               environ_overrides=oversized)
+        background = client.post('/api/analyze?async=1', data=b'x', content_type='multipart/form-data; boundary=b',
+                                 environ_overrides=oversized)
+        assert settings.status_code == 413
+        assert background.status_code != 413
+
+    def test_empty_file_is_rejected(self, client):
+        data = {'file': (io.BytesIO(b''), 'orders.csv')}
+        resp = client.post('/api/analyze', data=data, content_type='multipart/form-data')
+        assert resp.status_code == 400
+
+
+class TestAPISharedDatasets:
+    """Tests for sharing the analyzed dataset between workers (SHARED_DATASETS)."""
+
+    @pytest.fixture()
+    def store(self, monkeypatch, tmp_path):
+        import app as app_module
+        from analysis_cache import AnalysisCache
+        from shared_datasets import SharedDatasetStore
+        store = SharedDatasetStore('t', str(tmp_path))
+        monkeypatch.setattr(app_module, 'SHARED_DATASETS', store)
+        monkeypatch.setattr(app_module, 'ANALYSIS_CACHE', AnalysisCache())
+        return store
+
+    def test_analysis_is_published_and_other_workers_attach(self, client, tiny_valid_csv_bytes, store):
+        data = {'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')}
+        body = client.post('/api/analyze', data=data, content_type='multipart/form-data').get_json()
+        assert store.current()[0] == body['meta']['datasetId']
+
+        # Another worker publishes a different dataset; this one serves it next.
+        shared = store.attach()
+        store.publish('other', shared.trades[:1], shared.orders, {'tz': 'America/New_York', 'thresholds': {}})
+        trades = client.get('/api/trades').get_json()['trades']
+        assert [t['id'] for t in trades] == [body['trades'][0]['id']]
+
+
+class TestAPITradeIds:
+    """Trade ids are stable for an upload, whichever process analyzes it."""
+
+    def test_reanalysis_gives_the_same_ids(self, client, tiny_valid_csv_bytes, monkeypatch):
+        import app as app_module
+        from analysis_cache import AnalysisCache
+        ids = []
+        for _ in range(2):
+            monkeypatch.setattr(app_module, 'ANALYSIS_CACHE', AnalysisCache(max_entries=0))
+            data = {'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')}
+            body = client.post('/api/analyze', data=data, content_type='multipart/form-data').get_json()
+            ids.append([t['id'] for t in body['trades']])
+        assert ids[0] == ids[1]
+        assert ids[0][0] == body['meta']['datasetId'][:8] + '-1'
@@ -0,0 +1,108 @@
+"""
+Tests for analytics/breakdown_analyzer.py
+
+Per-group stats must agree with the single-list analyzers run on the
+trades of that group.
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from analytics.breakdown_analyzer import calculate_breakdown_stats, SESSIONS, WEEKDAYS
+from analytics.breakeven_analyzer import calculate_breakeven_stats
+from analytics.outsized_loss_analyzer import calculate_outsized_loss_stats
+from analytics.trade_frame import trades_to_frame
+from models.trade import Trade
+
+
+@pytest.fixture
+def trades():
+    rng = random.Random(38)
+    out = []
+    ts = datetime(2024, 3, 4, 0, 0)  # naive = UTC
+    for _ in range(300):
+        ts += timedelta(minutes=rng.choice([17, 45, 95, 240]))
+        pnl = round(rng.gauss(1, 12), 2)
+        out.append(Trade(
+            symbol=rng.choice(["MNQH4", "ESH4", "CLJ4"]),
+            side=rng.choice(["Buy", "Sell"]),
+            entry_time=ts,
+            exit_time=ts + timedelta(minutes=5),
+            pnl=pnl,
+            points_lost=abs(pnl) if pnl < 0 else 0.0,
+            risk_points=round(rng.uniform(5, 20), 2),
+            mistakes=["excessive risk"] if rng.random() < 0.15 else [],
+        ))
+    return out
+
+
+def test_symbol_groups_match_single_list_analyzers(trades):
+    groups = calculate_breakdown_stats(trades_to_frame(trades), "symbol", sigma_loss=1.2)
+
+    assert [g["group"] for g in groups] == sorted({t.symbol for t in trades})
+    for g in groups:
+        subset = [t for t in trades if t.symbol == g["group"]]
+        assert g["total_trades"] == len(subset)
+
+        be = calculate_breakeven_stats(subset)
+        assert g["breakeven"]["breakeven_win_rate"] == pytest.approx(be["breakeven_win_rate"], abs=0.01)
+
+        ol = calculate_outsized_loss_stats(subset, sigma_multiplier=1.2)
+        assert g["outsized_loss"]["outsized_loss_count"] == ol["outsized_loss_count"]
+        assert g["mistake_counts"].get("excessive risk", 0) == sum(
+            "excessive risk" in t.mistakes for t in subset
+        )
+
+
+def test_session_buckets_cover_every_timed_trade(trades):
+    groups = calculate_breakdown_stats(trades_to_frame(trades), "session")
+
+    assert sum(g["total_trades"] for g in groups) == len(trades)
+    assert {g["group"] for g in groups} <= {name for name, _, _ in SESSIONS}
+
+
+def test_session_boundaries_use_exchange_time():
+    def at(hour, minute):
+        # 2024-07-01 is EDT (UTC-4)
+        ts = datetime(2024, 7, 1, hour, minute) + timedelta(hours=4)
+        return Trade(symbol="ESU4", side="Buy", entry_time=ts, exit_time=ts, pnl=1.0)
+
+    trades = [at(2, 59), at(3, 0), at(9, 29), at(9, 30), at(15, 59), at(16, 0), at(18, 0), at(23, 0)]
+    groups = {g["group"]: g["total_trades"] for g in
+              calculate_breakdown_stats(trades_to_frame(trades), "session")}
+
+    assert groups == {"asia": 3, "london": 2, "new_york": 2, "after_hours": 1}
+
+    utc = {g["group"]: g["total_trades"] for g in
+           calculate_breakdown_stats(trades_to_frame(trades), "session", tz="UTC")}
+    assert utc != groups
+
+
+def test_hour_and_weekday_labels(trades):
+    frame = trades_to_frame(trades)
+
+    hours = calculate_breakdown_stats(frame, "hour")
+    assert all(g["group"].endswith(":00") for g in hours)
+    assert sum(g["total_trades"] for g in hours) == len(trades)
+
+    days = calculate_breakdown_stats(frame, "weekday")
+    labels = [g["group"] for g in days]
+    assert labels == sorted(labels, key=WEEKDAYS.index)
+    assert "Sunday" in labels  # first trade is Sunday evening in New York
+
+
+def test_untimed_trades_only_count_for_symbol():
+    trades = [Trade(symbol="ESH4", side="Buy", pnl=1.0), Trade(symbol="ESH4", side="Sell", pnl=-1.0, points_lost=1.0)]
+    frame = trades_to_frame(trades)
+
+    assert calculate_breakdown_stats(frame, "symbol")[0]["total_trades"] == 2
+    assert calculate_breakdown_stats(frame, "session") == []
+
+
+def test_invalid_arguments(trades):
+    frame = trades_to_frame(trades)
+    with pytest.raises(ValueError):
+        calculate_breakdown_stats(frame, "moon_phase")
+    with pytest.raises(ValueError):
+        calculate_breakdown_stats(frame, "hour", tz="Nowhere/Special")
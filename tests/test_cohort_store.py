@@ -0,0 +1,88 @@
+"""
+Tests for cohort_store.py and analytics/cohort_metrics.py
+"""
+import io
+
+import numpy as np
+import pytest
+
+from analytics.cohort_metrics import calculate_cohort_metrics, COHORT_METRICS
+from cohort_store import CohortStore, dataset_id
+from models.trade import Trade
+
+
+def test_dataset_id_is_content_hash():
+    data = b"Timestamp,B/S\n1,Buy\n"
+    assert dataset_id(data) == dataset_id(io.BytesIO(data))
+    assert dataset_id(data) != dataset_id(data + b"\n")
+    assert len(dataset_id(data)) == 32
+
+
+def test_percentiles_and_bands():
+    store = CohortStore()
+    for i in range(1000):
+        store.add(f"ds{i}", {"revenge_rate": float(i)})
+
+    assert store.percentile("revenge_rate", -1.0) == 0
+    assert store.percentile("revenge_rate", 500.0) == 50
+    assert store.percentile("revenge_rate", 5000.0) == 100
+    assert store.bands("revenge_rate")["p90"] == pytest.approx(np.percentile(range(1000), 90))
+    assert store.percentile("unknown", 1.0) is None
+
+
+def test_readding_a_dataset_replaces_it():
+    store = CohortStore()
+    store.add("a", {"revenge_rate": 1.0})
+    store.add("b", {"revenge_rate": 2.0})
+    assert store.percentile("revenge_rate", 1.5) == 50
+
+    store.add("a", {"revenge_rate": 3.0})
+    assert len(store) == 2
+    assert store.bands("revenge_rate")["p50"] == pytest.approx(2.5)
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / "cohort.json")
+    store = CohortStore(path)
+    store.add("a", {"revenge_rate": 4.0})
+
+    reloaded = CohortStore(path)
+    assert "a" in reloaded
+    assert reloaded.metrics("a") == {"revenge_rate": 4.0}
+
+
+def test_cohort_metrics_keys():
+    trades = [
+        Trade(symbol="ES", side="Buy", pnl=-5.0, points_lost=5.0, risk_points=4.0, mistakes=["revenge trade"]),
+        Trade(symbol="ES", side="Buy", pnl=3.0, risk_points=6.0),
+    ]
+    metrics = calculate_cohort_metrics(trades)
+    assert set(metrics) == set(COHORT_METRICS)
+    assert metrics["revenge_rate"] == 50.0
+    assert metrics["clean_trade_rate"] == 0.5
+
+
+def test_stores_sharing_a_file_merge_their_records(tmp_path):
+    path = str(tmp_path / "cohort.json")
+    first, second = CohortStore(path), CohortStore(path)
+    first.add("a", {"revenge_rate": 1.0})
+    second.add("b", {"revenge_rate": 2.0})
+    first.add("c", {"revenge_rate": 3.0})
+
+    assert {"a", "b", "c"} <= set(CohortStore(path)._datasets)
+    assert second.metrics("c") == {"revenge_rate": 3.0}
+    assert second.bands("revenge_rate")["p50"] == pytest.approx(2.0)
+
+
+def test_compare_orients_lower_is_better_metrics():
+    store = CohortStore()
+    for i in range(101):
+        store.add(f"ds{i}", {"revenge_rate": float(i), "clean_trade_rate": i / 100})
+
+    out = store.compare({"revenge_rate": 10.0, "clean_trade_rate": 0.9}, COHORT_METRICS)
+    assert out["revenge_rate"]["percentile"] == 10
+    assert out["revenge_rate"]["standing"] == 91
+    assert out["revenge_rate"]["bands"]["p90"] == pytest.approx(10.0)
+    assert out["clean_trade_rate"]["standing"] == 90
+    assert out["clean_trade_rate"]["bands"]["p90"] == pytest.approx(0.9)
+    assert "standing" not in store.compare({"revenge_rate": 10.0})["revenge_rate"]
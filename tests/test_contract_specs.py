@@ -0,0 +1,67 @@
+"""
+Tests for parsing/contract_specs.py
+"""
+import io
+import json
+
+import pytest
+
+from analytics.trade_counter import count_trades
+from parsing.contract_specs import load_contract_specs, point_values_for, root_symbol
+from parsing.order_loader import load_orders
+
+
+@pytest.mark.parametrize("contract, root", [
+    ("MNQH4", "MNQ"),
+    ("ESZ24", "ES"),
+    ("M2KU5", "M2K"),
+    ("6EH4", "6E"),
+    (" mesm4 ", "MES"),
+    ("ES", "ES"),
+])
+def test_root_symbol(contract, root):
+    assert root_symbol(contract) == root
+
+
+def test_builtin_specs():
+    specs = load_contract_specs()
+    assert specs["ES"].point_value == 50.0
+    assert specs["MES"].point_value == 5.0
+    assert specs["NQ"].point_value == 20.0
+    assert specs["MNQ"].point_value == 2.0
+    assert specs["MNQ"].tick_size == 0.25
+
+
+def test_point_values_for_skips_unknown_roots():
+    values = point_values_for(["MNQH4", "ESH4", "MNQH4", "FOOH4"])
+    assert values == {"MNQH4": 2.0, "ESH4": 50.0}
+
+
+def test_spec_file_overrides(tmp_path):
+    path = tmp_path / "specs.json"
+    path.write_text(json.dumps({"mnq": {"point_value": 3.0}, "XYZ": {"point_value": 7.5, "tick_size": 0.5}}))
+
+    specs = load_contract_specs(str(path))
+    assert specs["MNQ"].point_value == 3.0
+    assert specs["XYZ"].tick_size == 0.5
+    # built-ins still present
+    assert specs["ES"].point_value == 50.0
+
+
+def test_mixed_instruments_priced_in_dollars():
+    """Same point move on ES and MES yields a 10× dollar difference."""
+    content = (
+        "Order ID,Timestamp,Fill Time,B/S,Contract,filledQty,Avg Fill Price,Type,Limit Price,Stop Price,Status\n"
+        "1,01/02/2024 9:30:00,01/02/2024 9:30:00,Buy,ESH4,1,4800.00,Market,,,Filled\n"
+        "2,01/02/2024 9:31:00,01/02/2024 9:35:00,Sell,ESH4,1,4802.00,Limit,4802.00,,Filled\n"
+        "3,01/02/2024 9:40:00,01/02/2024 9:40:00,Buy,MESH4,1,4800.00,Market,,,Filled\n"
+        "4,01/02/2024 9:41:00,01/02/2024 9:45:00,Sell,MESH4,1,4802.00,Limit,4802.00,,Filled\n"
+    )
+    df = load_orders(io.BytesIO(content.encode("utf-8")))
+
+    trades, _ = count_trades(df, point_values_for(df["symbol"].unique()))
+
+    by_symbol = {t.symbol: t for t in trades}
+    assert by_symbol["ESH4"].pnl == 100.0
+    assert by_symbol["MESH4"].pnl == 10.0
+    assert by_symbol["ESH4"].points_lost == by_symbol["MESH4"].points_lost == 2.0
@@ -0,0 +1,216 @@
+"""
+Tests for analytics/goal_index.py and its use by analytics/goal_tracker.py
+"""
+import random
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from analytics.goal_index import GoalIndex, StreakIndex, run_lengths, sample_positions, streak_matrix
+from analytics.goal_tracker import (
+    GOAL_DEFINITIONS, evaluate_goal, generate_goal_report, generate_goal_timeline, get_clean_streak_stats,
+)
+from models.trade import Trade
+
+MISTAKES = ["no stop-loss order", "excessive risk", "outsized loss", "revenge trade", "risk sizing inconsistency"]
+
+
+def _reference(trades, mistake_types, metric, start_date=None):
+    """Straightforward per-trade loop the index must agree with."""
+    def clean(t):
+        if not mistake_types:
+            return not t.mistakes
+        return not any(m in t.mistakes for m in mistake_types)
+
+    if start_date:
+        trades = [t for t in trades if t.entry_time and t.entry_time.date() >= start_date]
+
+    if metric == "trades":
+        flags = [clean(t) for t in trades]
+    else:
+        by_day = {}
+        for t in trades:
+            day = t.entry_time.date()
+            by_day[day] = by_day.get(day, True) and clean(t)
+        flags = [ok for _, ok in sorted(by_day.items())]
+
+    current = best = 0
+    for ok in flags:
+        current = current + 1 if ok else 0
+        best = max(best, current)
+    return current, best
+
+
+@pytest.fixture
+def random_trades():
+    rng = random.Random(7)
+    trades = []
+    ts = datetime(2024, 3, 1, 9, 30)
+    for _ in range(400):
+        ts += timedelta(hours=rng.choice([1, 2, 5, 20]))
+        mistakes = [m for m in MISTAKES if rng.random() < 0.08]
+        trades.append(Trade(symbol="MNQH4", entry_time=ts, exit_time=ts + timedelta(minutes=5), mistakes=mistakes))
+    return trades
+
+
+def test_run_lengths():
+    assert run_lengths(np.array([], dtype=bool)) == (0, 0)
+    assert run_lengths(np.array([True, True, False, True, True, True, False])) == (0, 3)
+    assert run_lengths(np.array([False, True, True])) == (2, 2)
+    assert run_lengths(np.array([True] * 4)) == (4, 4)
+
+
+@pytest.mark.parametrize("mistake_types", [[], ["revenge trade"], ["no stop-loss order", "excessive risk"], ["never seen"]])
+@pytest.mark.parametrize("metric", ["trades", "days"])
+@pytest.mark.parametrize("start_date", [None, date(2024, 4, 15)])
+def test_index_matches_reference(random_trades, mistake_types, metric, start_date):
+    index = GoalIndex(random_trades)
+    current, best, _ = index.evaluate(mistake_types, 10, metric, start_date)
+    assert (current, best) == _reference(random_trades, mistake_types, metric, start_date)
+
+
+def test_day_masks_are_or_reduced(sample_trade_objs):
+    index = GoalIndex(sample_trade_objs)
+    # All five sample trades fall on 2024-01-02
+    assert index.days.tolist() == [date(2024, 1, 2).toordinal()]
+    assert int(index.day_masks[0]) == int(np.bitwise_or.reduce(index.masks))
+
+
+def test_untimed_trades_skipped_for_days():
+    trades = [Trade(mistakes=[]), Trade(entry_time=datetime(2024, 1, 2, 10), mistakes=[])]
+    index = GoalIndex(trades)
+    assert index.evaluate([], 1, "days")[:2] == (1, 1)
+    assert index.evaluate([], 1, "trades")[:2] == (2, 2)
+
+
+def test_unsupported_metric(sample_trade_objs):
+    with pytest.raises(ValueError):
+        evaluate_goal(sample_trade_objs, [], 10, metric="weeks")
+
+
+def test_goal_tracker_uses_shared_index(sample_trade_objs):
+    index = GoalIndex(sample_trade_objs)
+    assert generate_goal_report(sample_trade_objs, index) == generate_goal_report(sample_trade_objs)
+    assert get_clean_streak_stats(sample_trade_objs, index) == (1, 1)
+    assert evaluate_goal(sample_trade_objs, ["revenge trade"], 10, index=index) == (5, 5, 0.5)
+
+
+def test_streak_index_matches_run_lengths():
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        clean = rng.random(rng.integers(0, 60)) < 0.7
+        streaks = StreakIndex(clean)
+        assert (streaks.current, streaks.best) == run_lengths(clean)
+
+
+def test_streak_index_runs():
+    streaks = StreakIndex(np.array([True, True, False, True, False, False, True, True, True]))
+    assert streaks.starts.tolist() == [0, 3, 6]
+    assert streaks.ends.tolist() == [2, 4, 9]
+    assert (streaks.current, streaks.best) == (3, 3)
+
+
+def test_streak_index_append_joins_runs():
+    rng = np.random.default_rng(11)
+    clean = rng.random(300) < 0.8
+    streaks = StreakIndex(clean[:0])
+    for lo, hi in [(0, 7), (7, 8), (8, 120), (120, 121), (121, 300)]:
+        streaks.append(clean[lo:hi])
+        assert (streaks.current, streaks.best) == run_lengths(clean[:hi])
+
+    fresh = StreakIndex(clean)
+    assert streaks.starts.tolist() == fresh.starts.tolist()
+    assert streaks.ends.tolist() == fresh.ends.tolist()
+
+
+def test_streak_index_range_queries():
+    rng = np.random.default_rng(5)
+    clean = rng.random(500) < 0.85
+    streaks = StreakIndex(clean)
+    for _ in range(300):
+        lo, hi = sorted(rng.integers(0, 501, size=2))
+        assert streaks.stats_between(lo, hi) == run_lengths(clean[lo:hi])
+
+
+def test_streak_index_prefix_stats():
+    rng = np.random.default_rng(6)
+    clean = rng.random(200) < 0.8
+    streaks = StreakIndex(clean)
+    for lo in (0, 1, 37, 199, 200):
+        stops = np.arange(lo, 201)
+        current, best = streaks.prefix_stats(stops, lo)
+        assert list(zip(current.tolist(), best.tolist())) == [run_lengths(clean[lo:stop]) for stop in stops]
+
+
+def test_best_in_range_by_date():
+    clean = np.array([True, True, False, True, True, True, False, True])
+    days = np.array([1, 1, 2, 3, 3, 4, 5, 6]) + date(2024, 1, 1).toordinal()
+    streaks = StreakIndex(clean, days)
+
+    assert streaks.best_in_range() == 3
+    assert streaks.best_in_range(date(2024, 1, 4), date(2024, 1, 4)) == 2
+    assert streaks.best_in_range(date(2024, 1, 2), date(2024, 1, 3)) == 2
+    assert streaks.best_in_range(date(2024, 1, 6)) == 1
+    assert streaks.stats_in_range(date(2024, 1, 7)) == (1, 1)
+
+
+@pytest.mark.parametrize("start_date", [date(2024, 3, 20), date(2024, 4, 15)])
+def test_start_date_without_date_order_is_scanned(random_trades, start_date):
+    trades = random_trades[:]
+    trades[10], trades[300] = trades[300], trades[10]
+    trades[50] = Trade(symbol="MNQH4", mistakes=[])
+    index = GoalIndex(trades)
+    assert not index.chronological and GoalIndex(random_trades).chronological
+    for mistake_types in ([], ["revenge trade"]):
+        current, best, _ = index.evaluate(mistake_types, 10, "trades", start_date)
+        assert (current, best) == _reference(trades, mistake_types, "trades", start_date)
+
+
+def test_streak_matrix_rows_match_prefix_scans():
+    rng = np.random.default_rng(9)
+    clean = rng.random((4, 80)) < 0.75
+    current = streak_matrix(clean)
+    for g in range(4):
+        for i in range(80):
+            assert current[g, i] == run_lengths(clean[g, :i + 1])[0]
+
+
+def test_sample_positions():
+    assert sample_positions(5, 200).tolist() == [0, 1, 2, 3, 4]
+    sampled = sample_positions(10_000, 200)
+    assert len(sampled) == 200
+    assert sampled[0] == 0 and sampled[-1] == 9_999
+
+
+@pytest.mark.parametrize("metric", ["trades", "days"])
+def test_timeline_ends_at_goal_report(random_trades, metric):
+    goals = [dict(g, metric=metric) for g in GOAL_DEFINITIONS] + [
+        {"title": "Late start", "goal": 5, "mistake_types": ["revenge trade"], "start_date": date(2024, 4, 15)},
+    ]
+    index = GoalIndex(random_trades)
+    timeline = generate_goal_timeline(random_trades, goals, metric, points=50, index=index)
+
+    assert timeline["metric"] == metric
+    assert len(timeline["x"]) == len(timeline["position"]) <= 50
+    for goal, series in zip(goals, timeline["goals"]):
+        current, best, progress = index.evaluate(goal["mistake_types"], goal["goal"], metric, goal.get("start_date"))
+        assert series["current"][-1] == current
+        assert series["best"][-1] == best
+        assert series["progress"][-1] == progress
+        assert series["best"] == sorted(series["best"])
+
+        # Every sample, not just the last, matches the dense streak matrix.
+        dense = streak_matrix(index.clean_matrix([(goal["mistake_types"], goal.get("start_date"))], metric))[0]
+        positions = timeline["position"]
+        assert series["current"] == dense[positions].tolist()
+        assert series["best"] == np.maximum.accumulate(dense)[positions].tolist()
+
+
+def test_aggregates_streaks_come_from_index(random_trades):
+    from analytics.aggregates import calculate_trade_aggregates
+    index = GoalIndex(random_trades)
+    aggs = calculate_trade_aggregates(random_trades, index)
+    assert (aggs["streak_current"], aggs["streak_record"]) == _reference(random_trades, [], "trades")
+    assert index.streaks([]) is index.streaks([])
+    assert calculate_trade_aggregates(random_trades) == aggs
@@ -0,0 +1,95 @@
+"""
+Tests for conditional-GET handling (http_cache.py)
+"""
+import io
+import os
+
+import pytest
+
+
+@pytest.fixture
+def analyzed(client, tiny_valid_csv_bytes):
+    data = {'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')}
+    r = client.post('/api/analyze', data=data, content_type='multipart/form-data')
+    assert r.status_code == 200
+    return client
+
+
+@pytest.mark.parametrize('path', [
+    '/api/summary', '/api/trades', '/api/losses', '/api/revenge',
+    '/api/risk-sizing', '/api/excessive-risk', '/api/stop-loss',
+    '/api/winrate-payoff', '/api/insights', '/api/goals', '/api/dashboard',
+])
+def test_endpoint_revalidates_with_304(analyzed, path):
+    first = analyzed.get(path)
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'no-cache'
+    etag = first.headers['ETag']
+
+    second = analyzed.get(path, headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.headers['ETag'] == etag
+
+
+def test_304_skips_computation(analyzed, monkeypatch):
+    import app as app_module
+
+    etag = analyzed.get('/api/summary').headers['ETag']
+
+    def boom(*args, **kwargs):
+        raise AssertionError("summary was recomputed")
+
+    monkeypatch.setattr(app_module, '_build_summary', boom)
+    assert analyzed.get('/api/summary', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_etag_depends_on_query(analyzed):
+    a = analyzed.get('/api/losses?sigma=1.0').headers['ETag']
+    b = analyzed.get('/api/losses?sigma=2.0').headers['ETag']
+    assert a != b
+
+
+def test_query_order_does_not_matter(analyzed):
+    a = analyzed.get('/api/dashboard?k=1&vr=2').headers['ETag']
+    b = analyzed.get('/api/dashboard?vr=2&k=1').headers['ETag']
+    assert a == b
+
+
+def test_settings_update_invalidates(analyzed):
+    original_k = analyzed.get('/api/settings').get_json()['k']
+    etag = analyzed.get('/api/summary').headers['ETag']
+
+    r = analyzed.post('/api/settings', json={'k': original_k})
+    assert r.status_code == 200
+
+    after = analyzed.get('/api/summary', headers={'If-None-Match': etag})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != etag
+
+
+def test_reanalyze_invalidates(analyzed, tiny_valid_csv_bytes):
+    etag = analyzed.get('/api/trades').headers['ETag']
+
+    data = {'file': (io.BytesIO(tiny_valid_csv_bytes), 'orders.csv')}
+    analyzed.post('/api/analyze', data=data, content_type='multipart/form-data')
+
+    assert analyzed.get('/api/trades', headers={'If-None-Match': etag}).status_code == 200
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_workers_issue_distinct_etags():
+    import http_cache
+    from werkzeug.datastructures import MultiDict
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, http_cache.make_etag('/api/summary', MultiDict()).encode())
+        os._exit(0)
+    os.close(write_fd)
+    child_etag = os.read(read_fd, 64).decode()
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    assert child_etag != http_cache.make_etag('/api/summary', MultiDict())
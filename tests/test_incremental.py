@@ -0,0 +1,88 @@
+"""
+Tests for analytics/incremental.py: extending an analysis with new rows must
+give exactly what a fresh analysis of the whole file gives.
+"""
+import io
+import os
+
+import pytest
+
+from parsing.order_loader import load_orders
+from analytics.parallel import analyze_orders
+from analytics.incremental import PREFIX_ORDER_COLUMNS, extend_analysis, project_orders_for_prefix
+from analytics.trade_sketches import TradeSketches
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def _split(name, fraction):
+    with open(os.path.join(DATA_DIR, name), "rb") as fh:
+        lines = (fh.read().rstrip(b"\r\n") + b"\n").splitlines(keepends=True)
+    cut = int(len(lines) * fraction)
+    return lines[0], b"".join(lines[1:cut]), b"".join(lines[cut:])
+
+
+@pytest.mark.parametrize("name, fraction", [
+    ("314_synthetic_trades-FINAL.csv", 0.5),
+    ("test_data.csv", 0.3),
+    ("test_data.csv", 0.9),
+])
+@pytest.mark.parametrize("projected", [False, True])
+def test_extension_matches_full_analysis(name, fraction, projected, trade_fingerprint):
+    header, head, tail = _split(name, fraction)
+    base_orders = load_orders(io.BytesIO(header + head))
+    base_trades = analyze_orders(base_orders)
+    if projected:
+        base_orders = project_orders_for_prefix(base_orders)
+        assert set(base_orders.columns) <= set(PREFIX_ORDER_COLUMNS)
+
+    orders, trades, reused, sketches = extend_analysis(base_orders, base_trades, load_orders(io.BytesIO(header + tail)))
+    full = analyze_orders(load_orders(io.BytesIO(header + head + tail)))
+
+    assert len(orders) == len(base_orders) + len(tail.splitlines())
+    assert trade_fingerprint(trades) == trade_fingerprint(full)
+    assert 0 < reused <= len(base_trades)
+
+    rebuilt = TradeSketches.build(full)
+    for appended, fresh in ((sketches.losses, rebuilt.losses), (sketches.risk, rebuilt.risk)):
+        assert appended.total.count == fresh.total.count
+        assert appended.total.mean == pytest.approx(fresh.total.mean)
+        assert appended.total.pstdev == pytest.approx(fresh.total.pstdev)
+
+
+def test_tail_filling_before_base_end_reuses_nothing(trade_fingerprint):
+    header, head, tail = _split("test_data.csv", 0.5)
+    # Appending the first half again puts its fills before the base's last one.
+    base_orders = load_orders(io.BytesIO(header + head + tail))
+    base_trades = analyze_orders(base_orders)
+
+    orders, trades, reused, _ = extend_analysis(base_orders, base_trades, load_orders(io.BytesIO(header + head)))
+
+    assert reused == 0
+    assert trade_fingerprint(trades) == trade_fingerprint(analyze_orders(load_orders(io.BytesIO(header + head + tail + head))))
+
+
+def test_trade_flagged_for_lack_of_later_orders_is_matched_again(trade_fingerprint):
+    header = b"Order ID,Timestamp,Fill Time,B/S,Contract,filledQty,Avg Fill Price,Type,Limit Price,Stop Price,Status\n"
+    # Stop placed just before the entry; the file ends with the trade's exit,
+    # so no MNQH4 order follows the entry until the tail adds one.
+    head = (
+        b"1,01/02/2024 7:29:50,01/02/2024 7:30:00,Buy,MNQH4,1,21490.25,Market,,,Filled\n"
+        b"2,01/02/2024 7:29:55,,Sell,MNQH4,0,,Stop,,21480,Working\n"
+        b"3,01/02/2024 7:29:50,01/02/2024 7:36:47,Sell,MNQH4,1,21505.25,Limit,21505.25,,Filled\n"
+    )
+    tail = (
+        b"4,01/02/2024 9:12:12,01/02/2024 9:12:12,Sell,MNQH4,1,21523,Market,,,Filled\n"
+        b"5,01/02/2024 9:12:12,01/02/2024 9:18:18,Buy,MNQH4,1,21507.25,Limit,21507.25,,Filled\n"
+    )
+    base_orders = load_orders(io.BytesIO(header + head))
+    base_trades = analyze_orders(base_orders)
+    full = analyze_orders(load_orders(io.BytesIO(header + head + tail)))
+    assert base_trades[0].mistakes != full[0].mistakes
+
+    _, trades, reused, _ = extend_analysis(
+        project_orders_for_prefix(base_orders), base_trades, load_orders(io.BytesIO(header + tail)),
+    )
+
+    assert reused == 0
+    assert trade_fingerprint(trades) == trade_fingerprint(full)
@@ -0,0 +1,142 @@
+"""
+Tests for parsing/ingest.py broker detection and normalization.
+"""
+import io
+
+import pandas as pd
+import pytest
+
+from parsing.ingest import ingest_orders, detect_format, with_order_flags, ORDER_FLAGS, REQUIRED_COLUMNS
+
+
+NINJATRADER_CSV = (
+    "Order ID,Timestamp,Fill Time,B/S,Contract,filledQty,Avg Fill Price,Type,Limit Price,Stop Price,Status\n"
+    "1,01/02/2024 7:30:00,01/02/2024 7:30:00,Buy,MNQH4,1,21490.25,Market,,,Filled\n"
+    "2,01/02/2024 7:30:00,,Sell ,MNQH4,1,,Stop,,21480,Cancelled\n"
+)
+
+TRADOVATE_CSV = (
+    "orderId,Timestamp,Fill Time,B/S,Contract,filledQty,avgPrice,Type,Limit Price,Stop Price,Status\n"
+    "1,01/02/2024 7:30:00,01/02/2024 7:30:00, Buy,MNQH4,1,21490.25, Market,,, Filled\n"
+    "2,01/02/2024 7:30:00,, Sell,MNQH4,0,, Stop,,21480, Canceled\n"
+)
+
+RITHMIC_CSV = (
+    "Order Number,Create Time,Update Time,Buy/Sell,Symbol,Qty Filled,Avg Fill Price,Type,Limit Price,Stop Price,Status\n"
+    "A1,2024-01-02 07:30:00,2024-01-02 07:30:00,B,MNQH4,1,21490.25,Market,,,complete\n"
+    "A2,2024-01-02 07:30:00,2024-01-02 07:41:00,S,MNQH4,1,21480,Stop Market,,21480,complete\n"
+)
+
+
+def _ingest(text, **kwargs):
+    return ingest_orders(io.BytesIO(text.encode("utf-8")), **kwargs)
+
+
+@pytest.mark.parametrize("text, broker", [
+    (NINJATRADER_CSV, "ninjatrader"),
+    (TRADOVATE_CSV, "tradovate"),
+    (RITHMIC_CSV, "rithmic"),
+])
+def test_every_broker_maps_to_the_canonical_frame(text, broker):
+    df = _ingest(text)
+
+    assert df.attrs["broker"] == broker
+    assert set(REQUIRED_COLUMNS) <= set(df.columns)
+    assert df["side"].tolist() == ["Buy", "Sell"]
+    assert df["ts"][0] == pd.Timestamp("2024-01-02 07:30:00")
+    assert df["price"][0] == 21490.25
+    for col in ("side", "symbol", "Type", "Status"):
+        assert isinstance(df[col].dtype, pd.CategoricalDtype)
+
+
+def test_rithmic_vocabulary_is_mapped():
+    df = _ingest(RITHMIC_CSV)
+    assert df["Status"].tolist() == ["Filled", "Filled"]
+    assert df["Type"].tolist() == ["Market", "Stop"]
+    assert df["order_id_original"].tolist() == ["A1", "A2"]
+
+
+def test_tradovate_padding_is_stripped():
+    df = _ingest(TRADOVATE_CSV)
+    assert list(df["Status"].cat.categories) == ["Filled", "Canceled"]
+    assert df["Type"].tolist() == ["Market", "Stop"]
+
+
+def test_utc_option_localizes_from_tz():
+    df = _ingest(NINJATRADER_CSV, utc=True, tz="America/Chicago")
+    assert df["ts"][0] == pd.Timestamp("2024-01-02 13:30:00", tz="UTC")
+    assert pd.isna(df["fill_ts"][1])
+
+
+def test_detection_falls_back_to_ninjatrader_and_validates():
+    assert detect_format(["foo", "bar"]).name == "ninjatrader"
+    with pytest.raises(KeyError) as exc:
+        _ingest("Timestamp,B/S\n01/02/2024 7:30:00,Buy\n")
+    assert "fill_ts" in exc.value.args[0]
+
+
+def test_bad_options():
+    with pytest.raises(ValueError):
+        _ingest(NINJATRADER_CSV, broker="interactive")
+    with pytest.raises(ValueError):
+        _ingest(NINJATRADER_CSV, tz="Mars/Olympus")
+    with pytest.raises(ValueError):
+        _ingest(NINJATRADER_CSV, engine="python")
+
+
+def test_input_with_extra_columns_keeps_them_after_canonical_ones():
+    text = NINJATRADER_CSV.replace("Status\n", "Status,Note\n").replace("Filled\n", "Filled,x\n").replace("Cancelled\n", "Cancelled,y\n")
+    df = _ingest(text)
+    assert list(df.columns[-4:]) == ["Note", *ORDER_FLAGS]
+
+
+@pytest.mark.parametrize("text, second_filled", [
+    (NINJATRADER_CSV, False),
+    (TRADOVATE_CSV, False),
+    (RITHMIC_CSV, True),
+])
+def test_order_flags_and_compact_dtypes(text, second_filled):
+    df = _ingest(text)
+
+    assert df["is_filled"].tolist() == [True, second_filled]
+    assert df["is_canceled"].tolist() == [False, not second_filled]
+    assert df["is_stop"].tolist() == [False, True]
+    assert df["qty"].dtype == "int32"
+    assert df["price"].dtype == "float64"
+
+
+def test_fractional_quantities_stay_float():
+    df = _ingest(NINJATRADER_CSV.replace(",1,21490.25,", ",0.5,21490.25,"))
+    assert df["qty"].dtype == "float64"
+    assert df["qty"][0] == 0.5
+
+
+def test_with_order_flags_fills_in_hand_built_frames():
+    raw = pd.DataFrame({
+        "Type": [" Stop Market", "limit", None],
+        "Status": ["Filled", " cancelled", "Working"],
+        "side": ["Buy ", "Sell", "Buy"],
+    })
+    df = with_order_flags(raw)
+
+    assert df["is_stop"].tolist() == [True, False, False]
+    assert df["is_filled"].tolist() == [True, False, False]
+    assert df["is_canceled"].tolist() == [False, True, False]
+    assert df["side"].tolist() == ["Buy", "Sell", "Buy"]
+    assert "is_stop" not in raw.columns
+    assert with_order_flags(df) is df
+
+
+MIXED_TIMESTAMPS_CSV = NINJATRADER_CSV.replace("01/02/2024 7:30:00,,", "2024-01-02T07:30:00,,")
+
+
+@pytest.mark.parametrize("text", [NINJATRADER_CSV, TRADOVATE_CSV, RITHMIC_CSV, MIXED_TIMESTAMPS_CSV])
+def test_pyarrow_engine_matches_c_engine(text):
+    pytest.importorskip("pyarrow")
+    pd.testing.assert_frame_equal(_ingest(text, engine="pyarrow"), _ingest(text))
+
+
+def test_pyarrow_engine_reports_parse_errors():
+    pytest.importorskip("pyarrow")
+    with pytest.raises(pd.errors.ParserError):
+        _ingest(NINJATRADER_CSV + "3,4\n", engine="pyarrow")
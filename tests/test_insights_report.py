@@ -205,3 +205,45 @@ def test_generate_insights_report_performance(trades_with_multiple_mistake_types
     # Should generate insights (number depends on mistake counts)
     assert len(result) > 0
     assert result[0]["title"] == "Trading Summary"
+
+
+# =============================================================================
+# Memoized pipeline (InsightCache + precomputed aggregates)
+# =============================================================================
+
+def test_insights_report_with_aggregates_matches(sample_trade_objs, sample_order_df):
+    from analytics.aggregates import calculate_trade_aggregates
+
+    plain = generate_insights_report(sample_trade_objs, sample_order_df)
+    shared = generate_insights_report(
+        sample_trade_objs, sample_order_df, aggregates=calculate_trade_aggregates(sample_trade_objs)
+    )
+    assert shared == plain
+
+
+def test_insight_cache_regenerates_only_dependent_section(sample_trade_objs, sample_order_df):
+    from insights.insights_report import InsightCache, SECTION_THRESHOLDS
+
+    cache = InsightCache()
+    first = generate_insights_report(sample_trade_objs, sample_order_df, cache=cache)
+    assert len(cache) == len(SECTION_THRESHOLDS)
+
+    again = generate_insights_report(sample_trade_objs, sample_order_df, cache=cache)
+    assert again == first
+    assert len(cache) == len(SECTION_THRESHOLDS)
+
+    generate_insights_report(sample_trade_objs, sample_order_df, k=3.0, cache=cache)
+    assert len(cache) == len(SECTION_THRESHOLDS) + 1
+    assert ("revenge trade", (3.0,)) in cache._entries
+
+    generate_insights_report(sample_trade_objs, sample_order_df, sigma_loss=2.0, vr=0.5, cache=cache)
+    assert len(cache) == len(SECTION_THRESHOLDS) + 3
+
+
+def test_insight_cache_matches_uncached_for_new_thresholds(sample_trade_objs, sample_order_df):
+    from insights.insights_report import InsightCache
+
+    cache = InsightCache()
+    generate_insights_report(sample_trade_objs, sample_order_df, cache=cache)
+    cached = generate_insights_report(sample_trade_objs, sample_order_df, sigma_risk=0.5, k=0.2, cache=cache)
+    assert cached == generate_insights_report(sample_trade_objs, sample_order_df, sigma_risk=0.5, k=0.2)
@@ -0,0 +1,122 @@
+"""
+Tests for jobs.py: the in-process background job queue.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from jobs import JobQueue, DONE, FAILED
+
+
+class BadInput(Exception):
+    status_code = 422
+
+
+def _wait(job):
+    return [event for event in job.follow(timeout=0.01) if event is not None]
+
+
+def test_job_runs_and_records_stages():
+    queue = JobQueue()
+
+    def work(job, x):
+        job.stage("doubling")
+        return x * 2
+
+    job = queue.submit(work, 21)
+    events = _wait(job)
+
+    assert [e["stage"] for e in events] == ["queued", "running", "doubling", "done"]
+    assert job.status == DONE and job.result == 42
+    assert queue.get(job.id) is job
+
+
+def test_failure_keeps_status_code_and_message():
+    queue = JobQueue()
+
+    def work(job):
+        raise BadInput("bad column")
+
+    job = queue.submit(work)
+    _wait(job)
+
+    assert job.status == FAILED
+    assert job.error == {"status": 422, "message": "bad column"}
+
+
+def test_follow_yields_keepalives_while_waiting():
+    queue = JobQueue()
+    release = threading.Event()
+    job = queue.submit(lambda job: release.wait(5))
+
+    stream = job.follow(timeout=0.01)
+    seen = []
+    for event in stream:
+        seen.append(event)
+        if None in seen:
+            release.set()
+    assert None in seen
+    assert seen[-1]["stage"] == "done"
+
+
+def test_only_recent_finished_jobs_are_kept():
+    queue = JobQueue(history=2)
+    jobs = [queue.submit(lambda job: None) for _ in range(3)]
+    for job in jobs:
+        _wait(job)
+    queue.submit(lambda job: None)
+
+    assert queue.get(jobs[0].id) is None
+    assert queue.get(jobs[2].id) is jobs[2]
+
+
+def test_job_is_visible_from_another_process(tmp_path):
+    queue = JobQueue(directory=str(tmp_path))
+
+    def work(job, x):
+        job.stage("doubling")
+        return {"value": x * 2}
+
+    job = queue.submit(work, 21)
+    _wait(job)
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    probe = (
+        "import json, sys\n"
+        "from jobs import JobQueue\n"
+        "job = JobQueue(directory=sys.argv[1]).get(sys.argv[2])\n"
+        "print(json.dumps({**job.to_dict(), 'result': job.result}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", probe, str(tmp_path), job.id],
+                         cwd=root, capture_output=True, text=True, check=True)
+    seen = json.loads(out.stdout)
+
+    assert seen["status"] == DONE
+    assert [e["stage"] for e in seen["events"]] == ["queued", "running", "doubling", "done"]
+    assert seen["result"] == {"value": 42}
+
+
+def test_following_a_job_run_elsewhere(tmp_path):
+    runner, reader = JobQueue(directory=str(tmp_path)), JobQueue(directory=str(tmp_path))
+    release = threading.Event()
+
+    def work(job):
+        job.stage("waiting")
+        release.wait(5)
+        return None
+
+    job = runner.submit(work)
+    remote = reader.get(job.id)
+    assert remote is not job
+
+    stages = []
+    for event in remote.follow(timeout=0.05):
+        if event is None:
+            release.set()
+        else:
+            stages.append(event["stage"])
+    assert stages == ["queued", "running", "waiting", "done"]
+    assert reader.get("../" + job.id) is None
+    assert reader.get("0" * 32) is None
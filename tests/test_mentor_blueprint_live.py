@@ -261,3 +261,23 @@ def test_blueprint_live_error_when_no_data(client, monkeypatch):
         app.trade_objs.clear()
         app.trade_objs.extend(original_trade_objs)
 
+
+
+def test_blueprint_live_get_breakdown(client, populate_global_state, monkeypatch):
+    """Test per-symbol and per-session breakdowns through blueprint."""
+    monkeypatch.setenv("MENTOR_DATA_SOURCE", "api")
+
+    from mentor import mentor_blueprint
+    mentor_blueprint.data_service = create_live_service()
+
+    resp = client.post('/api/mentor/get_breakdown', json={"by": "symbol"})
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["by"] == "symbol"
+    assert sum(g["total_trades"] for g in data["groups"]) == 5
+
+    resp = client.post('/api/mentor/get_breakdown', json={"by": "session"})
+    assert resp.status_code == 200
+
+    resp = client.post('/api/mentor/get_breakdown', json={"by": "planet"})
+    assert resp.status_code == 400
@@ -64,6 +64,38 @@ def test_load_endpoint_not_found(data_service):
     assert data["status"] == "ERROR"
 
 
+@pytest.mark.parametrize("by", ["symbol", "side", "hour", "weekday", "session"])
+def test_load_breakdown(data_service, by):
+    """Test every breakdown dimension has a fixture covering all trades."""
+    data, code = data_service.get_breakdown(by)
+    assert code == 200
+    assert data["by"] == by
+    trades, _ = data_service.get_trades()
+    assert sum(g["total_trades"] for g in data["groups"]) == len(trades["trades"])
+
+
+@pytest.mark.parametrize("by", ["moon", "../summary", "symbol/../trades"])
+def test_breakdown_rejects_unknown_dimension(data_service, by):
+    """Test ``by`` never reaches the fixture path unless it is a known dimension."""
+    data, code = data_service.get_breakdown(by)
+    assert code == 400
+    assert data["status"] == "ERROR"
+
+
+def test_routed_tools_have_schemas():
+    """Test every tool the routing table selects has a function schema."""
+    import json
+    import os
+    prompts = os.path.join(os.path.dirname(__file__), "..", "mentor", "prompts")
+    with open(os.path.join(prompts, "templates", "routing_table.json"), encoding="utf-8") as fh:
+        routing = json.load(fh)
+    tools = {rule["tool"] for rule in routing["deterministic_tool_selection"]} - {"none"}
+    assert "get_breakdown" in tools
+    for tool in tools:
+        with open(os.path.join(prompts, "assistant", "functions", f"{tool}.json"), encoding="utf-8") as fh:
+            assert json.load(fh)["name"] == tool
+
+
 def test_list_available_endpoints(data_service):
     """Test listing available fixture endpoints."""
     endpoints = data_service.list_available_endpoints()
@@ -169,3 +169,64 @@ def test_calculate_summary_stats_field_names(trades_with_multiple_mistake_types,
     # Verify mistake type keys use spaces (not snake_case)
     assert "no stop-loss order" in stats["mistake_counts"]
     assert "no_stop_loss_order" not in stats["mistake_counts"]
+
+
+# =============================================================================
+# TESTS FOR project_orders_for_detectors()
+# =============================================================================
+
+def _analyze_csv(path, orders_transform=None):
+    """Load + reconstruct + tag a CSV; optionally re-run detectors on a transformed frame."""
+    from analytics.trade_counter import count_trades
+    from parsing.order_loader import load_orders
+
+    orders = load_orders(path)
+    trades, _ = count_trades(orders)
+    analyze_all_mistakes(trades, orders)
+    if orders_transform is not None:
+        for t in trades:
+            t.mistakes.clear()
+        analyze_all_mistakes(trades, orders_transform(orders))
+    return trades, orders
+
+
+@pytest.mark.parametrize("csv_name", [
+    "synthetic_orders_sigma12_14-FINAL - 8 Trades - 1 No Stop.csv",
+    "314_synthetic_trades-FINAL.csv",
+])
+def test_projected_orders_reproduce_detector_results(csv_name):
+    """Re-running detectors on the projection matches a run on the full frame."""
+    import os
+    from analytics.mistake_analyzer import project_orders_for_detectors
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = os.path.join(base_dir, "data", csv_name)
+
+    full_trades, _ = _analyze_csv(path)
+    projected_trades, _ = _analyze_csv(path, project_orders_for_detectors)
+
+    assert [t.mistakes for t in projected_trades] == [t.mistakes for t in full_trades]
+    assert [t.risk_points for t in projected_trades] == [t.risk_points for t in full_trades]
+
+
+def test_project_orders_drops_unused_rows_and_columns():
+    import os
+    from analytics.mistake_analyzer import project_orders_for_detectors, DETECTOR_ORDER_COLUMNS
+    from parsing.order_loader import load_orders
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    orders = load_orders(os.path.join(base_dir, "data", "synthetic_orders_sigma12_14-FINAL - 8 Trades - 1 No Stop.csv"))
+
+    projected = project_orders_for_detectors(orders)
+
+    assert list(projected.columns) == DETECTOR_ORDER_COLUMNS
+    # Cancelled limit orders are never read by the detectors
+    assert len(projected) < len(orders)
+    assert not ((projected["Type"] == "Limit") & (projected["Status"] == "Cancelled")).any()
+    assert str(projected["symbol"].dtype) == "category"
+
+
+def test_project_orders_handles_none():
+    from analytics.mistake_analyzer import project_orders_for_detectors
+
+    assert project_orders_for_detectors(None) is None
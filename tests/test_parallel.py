@@ -0,0 +1,77 @@
+"""
+Tests for analytics/parallel.py: the per-symbol process pool must reproduce
+the in-process analysis exactly.
+"""
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from parsing.order_loader import load_orders
+from analytics.trade_counter import normalize_and_prepare_orders_df
+from analytics.parallel import analyze_orders
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def _multi_symbol_sample(copies):
+    """The 314-trade sample repeated under a different symbol per copy."""
+    with open(os.path.join(DATA_DIR, "314_synthetic_trades-FINAL.csv"), "rb") as fh:
+        header, _, body = fh.read().partition(b"\n")
+    body = body.rstrip(b"\r\n") + b"\n"
+    return header + b"\n" + b"".join(body.replace(b"MNQH4", f"MNQ{i}".encode()) for i in range(copies))
+
+
+@pytest.mark.parametrize("source", [
+    os.path.join(DATA_DIR, "test_data.csv"),
+    io.BytesIO(_multi_symbol_sample(3)),
+])
+def test_parallel_matches_in_process(source, trade_fingerprint):
+    orders = load_orders(source)
+
+    serial = analyze_orders(orders.copy(), workers=1)
+    parallel = analyze_orders(orders.copy(), workers=2)
+
+    assert len(parallel) == len(serial) > 0
+    assert trade_fingerprint(parallel) == trade_fingerprint(serial)
+    # Ids are reassigned in the parent, so they stay unique across workers.
+    assert len({t.id for t in parallel}) == len(parallel)
+    assert [(t.to_dict()["id"], t.to_dict()["exitOrderId"]) for t in parallel] == \
+        [(t.id, t.exit_order_id) for t in parallel]
+
+
+def test_parallel_handles_utc_frames_and_point_values(trade_fingerprint):
+    orders = normalize_and_prepare_orders_df(pd.read_csv(os.path.join(DATA_DIR, "test_data.csv")))
+    point_values = {"NQH5": 20.0, "NQZ4": 20.0, "MNQH5": 2.0, "MNQZ4": 2.0}
+
+    serial = analyze_orders(orders.copy(), point_values, workers=1)
+    parallel = analyze_orders(orders.copy(), point_values, workers=2)
+
+    assert trade_fingerprint(parallel) == trade_fingerprint(serial)
+
+
+def test_single_symbol_runs_in_process(monkeypatch):
+    import analytics.parallel as parallel
+
+    def fail(*args, **kwargs):
+        raise AssertionError("pool should not start for one symbol")
+
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", fail)
+    trades = parallel.analyze_orders(load_orders(os.path.join(DATA_DIR, "314_synthetic_trades-FINAL.csv")), workers=4)
+    assert len(trades) == 314
+
+
+def test_pool_is_reused_and_not_forked():
+    import analytics.parallel as parallel
+
+    orders = load_orders(io.BytesIO(_multi_symbol_sample(2)))
+    analyze_orders(orders.copy(), workers=2)
+    pool = parallel.get_pool(2)
+    analyze_orders(orders.copy(), workers=2)
+
+    assert parallel.get_pool(2) is pool
+    assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    parallel.shutdown_pool()
+    assert parallel.get_pool(2) is not pool
+    parallel.shutdown_pool()
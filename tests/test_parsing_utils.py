@@ -0,0 +1,70 @@
+"""
+Tests for parsing/utils.py timestamp normalization and
+analytics.trade_counter.normalize_and_prepare_orders_df.
+"""
+import pandas as pd
+
+from analytics.trade_counter import normalize_and_prepare_orders_df
+from parsing.utils import parse_timestamps, localize_to_utc, normalize_timestamps_in_df
+
+
+def test_parse_timestamps_explicit_format_with_fallback_rows():
+    raw = pd.Series(["01/02/2024 7:11:00", "2024-01-03 08:00:00", None, "junk"])
+    parsed = parse_timestamps(raw)
+
+    assert parsed[0] == pd.Timestamp("2024-01-02 07:11:00")
+    assert parsed[1] == pd.Timestamp("2024-01-03 08:00:00")
+    assert parsed[2:].isna().all()
+
+
+def test_parse_timestamps_keeps_offsets_when_format_never_matches():
+    parsed = parse_timestamps(pd.Series(["2024-01-02T07:11:00-05:00", "2024-01-02T08:00:00-05:00"]))
+    assert str(parsed.dt.tz) == "UTC-05:00"
+
+
+def test_shared_lookup_matches_per_column_localization():
+    ts = pd.Series(pd.date_range("2024-03-09 12:00", "2024-03-11 12:00", freq="7min"))
+    fill = ts + pd.Timedelta(seconds=30)
+
+    for col, out in zip((ts, fill), localize_to_utc([ts, fill])):
+        expected = col.dt.tz_localize("America/New_York", ambiguous="infer", nonexistent="NaT").dt.tz_convert("UTC")
+        pd.testing.assert_series_equal(out, expected, check_names=False)
+
+
+def test_ambiguous_times_fall_back_to_row_order_then_daylight_time():
+    # Both passes through 01:10 are present: row-order inference resolves them.
+    repeated = parse_timestamps(pd.Series(["11/03/2024 1:10:00", "11/03/2024 1:50:00",
+                                           "11/03/2024 1:10:00", "11/03/2024 1:50:00"]))
+    hours = localize_to_utc([repeated])[0].dt.hour.tolist()
+    assert hours == [5, 5, 6, 6]
+
+    # A single pass can't be inferred: assume the first (EDT) occurrence.
+    single = parse_timestamps(pd.Series(["11/03/2024 1:30:00"]))
+    assert localize_to_utc([single])[0][0] == pd.Timestamp("2024-11-03 05:30", tz="UTC")
+
+
+def test_normalize_timestamps_in_df_returns_copy():
+    df = pd.DataFrame({"Timestamp": ["01/02/2024 7:11:00"]})
+    out = normalize_timestamps_in_df(df, "Timestamp", "ts")
+
+    assert "ts" not in df.columns
+    assert out["ts"][0] == pd.Timestamp("2024-01-02 12:11:00", tz="UTC")
+
+
+def test_normalize_and_prepare_orders_df_leaves_input_untouched():
+    df = pd.DataFrame({
+        "Timestamp": ["01/02/2024 7:11:00", "07/02/2024 7:11:00"],
+        "B/S": [" Buy", "Sell "],
+        "Contract": ["MNQH4", "MNQH4"],
+        "filledQty": ["1", "2"],
+        "Status": ["Filled", " Canceled"],
+    })
+    before = df.copy()
+    out = normalize_and_prepare_orders_df(df)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert out["ts"].dt.hour.tolist() == [12, 11]  # EST, then EDT
+    assert out["fill_ts"].isna().all()
+    assert str(out["fill_ts"].dt.tz) == "UTC"
+    assert out["side"].tolist() == ["Buy", "Sell"]
+    assert out["qty"].tolist() == [1, 2]
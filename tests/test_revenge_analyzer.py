@@ -7,7 +7,8 @@ from datetime import datetime, timedelta
 from models.trade import Trade
 from analytics.revenge_analyzer import (
     analyze_trades_for_revenge,
-    calculate_revenge_stats
+    calculate_revenge_stats,
+    retag_revenge_copies
 )
 
 
@@ -141,3 +142,15 @@ def test_analyze_trades_for_revenge_uses_multiplier(trades_with_revenge):
     assert isinstance(revenge_trades, list)
 
 
+def test_retag_revenge_copies_lower_multiplier_drops_existing_tags(trades_with_revenge):
+    """A smaller multiplier lowers the count even on already-tagged trades."""
+    analyze_trades_for_revenge(trades_with_revenge, 1.0)
+    assert calculate_revenge_stats(trades_with_revenge)["revenge_count"] == 1
+
+    retagged = retag_revenge_copies(trades_with_revenge, 0.0001)
+    assert calculate_revenge_stats(retagged)["revenge_count"] == 0
+    assert calculate_revenge_stats(retag_revenge_copies(trades_with_revenge, 1.0))["revenge_count"] == 1
+    # The originals keep the tags from the upload's own multiplier
+    assert "revenge trade" in trades_with_revenge[2].mistakes
+
+
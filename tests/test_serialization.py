@@ -0,0 +1,117 @@
+"""
+Tests for response formats (serialization.py) and compression (compression.py)
+"""
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from models.trade import trades_to_columns
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+@pytest.fixture
+def sample_csv_bytes():
+    with open(os.path.join(DATA_DIR, '314_synthetic_trades-FINAL.csv'), 'rb') as f:
+        return f.read()
+
+
+def _upload(client, csv_bytes, query=''):
+    data = {'file': (io.BytesIO(csv_bytes), 'orders.csv')}
+    return client.post(f'/api/analyze{query}', data=data, content_type='multipart/form-data')
+
+
+def test_trades_to_columns(sample_trade_objs):
+    columns = trades_to_columns(sample_trade_objs)
+    rows = [t.to_dict() for t in sample_trade_objs]
+
+    assert set(columns) == set(rows[0])
+    for key in ('id', 'symbol', 'pnl', 'mistakes'):
+        assert columns[key] == [r[key] for r in rows]
+    assert all(isinstance(ms, int) for ms in columns['entryTime'])
+
+
+def test_columnar_matches_rows(client, tiny_valid_csv_bytes):
+    rows = _upload(client, tiny_valid_csv_bytes).get_json()
+    columnar = _upload(client, tiny_valid_csv_bytes, '?format=columnar').get_json()
+
+    assert columnar['meta'] == rows['meta']
+    trades = columnar['trades']
+    assert len(trades['id']) == len(rows['trades'])
+    assert trades['pnl'] == [t['pnl'] for t in rows['trades']]
+
+
+def test_trades_endpoint_columnar(client, tiny_valid_csv_bytes):
+    _upload(client, tiny_valid_csv_bytes)
+    rows = client.get('/api/trades').get_json()
+    columnar = client.get('/api/trades?format=columnar').get_json()
+
+    assert columnar['date_range'] == rows['date_range']
+    assert columnar['trades']['symbol'] == [t['symbol'] for t in rows['trades']]
+
+
+def test_unknown_format_rejected(client):
+    assert client.post('/api/analyze?format=xml').status_code == 400
+
+
+def test_msgpack_format(client, tiny_valid_csv_bytes):
+    msgpack = pytest.importorskip('msgpack')
+    _upload(client, tiny_valid_csv_bytes)
+
+    resp = client.get('/api/trades?format=msgpack')
+    assert resp.mimetype == 'application/msgpack'
+    body = msgpack.unpackb(resp.get_data())
+    assert body == client.get('/api/trades?format=columnar').get_json()
+
+
+def test_arrow_format(client, tiny_valid_csv_bytes):
+    pa = pytest.importorskip('pyarrow')
+    _upload(client, tiny_valid_csv_bytes)
+
+    resp = client.get('/api/trades?format=arrow')
+    table = pa.ipc.open_stream(resp.get_data()).read_all()
+    rows = client.get('/api/trades').get_json()
+
+    assert table.num_rows == len(rows['trades'])
+    assert table.column('pnl').to_pylist() == [t['pnl'] for t in rows['trades']]
+    assert json.loads(table.schema.metadata[b'payload'])['date_range'] == rows['date_range']
+
+
+def test_gzip_above_threshold(client, sample_csv_bytes):
+    _upload(client, sample_csv_bytes)
+    plain = client.get('/api/trades')
+    zipped = client.get('/api/trades', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Accept-Encoding' in zipped.headers['Vary']
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(zipped.get_data()) == plain.get_data()
+    assert len(zipped.get_data()) < len(plain.get_data())
+    assert zipped.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+
+
+def test_small_responses_not_compressed(client):
+    resp = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in resp.headers
+
+
+def test_compressed_etag_revalidates(client, sample_csv_bytes):
+    _upload(client, sample_csv_bytes)
+    headers = {'Accept-Encoding': 'gzip'}
+    etag = client.get('/api/trades', headers=headers).headers['ETag']
+
+    again = client.get('/api/trades', headers={**headers, 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+
+
+def test_brotli_preferred_when_available(client, sample_csv_bytes):
+    brotli = pytest.importorskip('brotli')
+    _upload(client, sample_csv_bytes)
+    plain = client.get('/api/trades')
+
+    resp = client.get('/api/trades', headers={'Accept-Encoding': 'gzip, deflate, br'})
+    assert resp.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(resp.get_data()) == plain.get_data()
@@ -0,0 +1,77 @@
+"""
+Tests for shared_datasets.py (datasets shared between worker processes).
+"""
+import io
+import json
+import os
+import stat
+
+import pandas as pd
+import pytest
+
+from analytics.mistake_analyzer import project_orders_for_detectors
+from analytics.parallel import analyze_orders
+from parsing.order_loader import load_orders
+from shared_datasets import SharedDatasetStore
+
+
+@pytest.fixture()
+def analyzed(tiny_valid_csv_bytes):
+    orders = load_orders(io.BytesIO(tiny_valid_csv_bytes))
+    return analyze_orders(orders), orders
+
+
+@pytest.mark.parametrize("project", [True, False])
+def test_attach_rebuilds_the_published_dataset(tmp_path, analyzed, project):
+    trades, orders = analyzed
+    if project:
+        orders = project_orders_for_detectors(orders)
+    store = SharedDatasetStore("t", str(tmp_path))
+    seq = store.publish("abc", trades, orders, {"tz": "America/New_York"})
+
+    # A second store with the same prefix stands in for another worker.
+    shared = SharedDatasetStore("t", str(tmp_path)).attach()
+    assert (shared.dataset_id, shared.seq, shared.meta) == ("abc", seq, {"tz": "America/New_York"})
+    assert [t.to_dict() for t in shared.trades] == [t.to_dict() for t in trades]
+    pd.testing.assert_frame_equal(shared.orders, orders, check_dtype=False, check_categorical=False)
+    assert shared.orders.attrs == orders.attrs
+    # Order columns are read-only views of the mapping.
+    assert not shared.orders["Stop Price"].to_numpy().flags.writeable
+
+
+def test_publish_replaces_the_previous_dataset(tmp_path, analyzed):
+    trades, orders = analyzed
+    store = SharedDatasetStore("t", str(tmp_path))
+    assert store.current() is None and store.attach() is None
+
+    first = store.publish("one", trades, orders)
+    held = store.attach()
+    second = store.publish("two", trades[:1], None)
+
+    assert store.current() == ("two", second) and second > first
+    assert len(store.attach().trades) == 1 and store.attach().orders is None
+    # The first file is gone, but a worker that mapped it can still read it.
+    assert len([p for p in os.listdir(store.path) if p.endswith(".bin")]) == 1
+    assert held.orders["price"].sum() == orders["price"].sum()
+
+    store.clear()
+    assert os.listdir(tmp_path) == []
+
+
+def test_store_is_private_and_its_manifest_is_json(tmp_path, analyzed):
+    trades, orders = analyzed
+    store = SharedDatasetStore("t", str(tmp_path))
+    seq = store.publish("abc", trades, orders)
+
+    assert stat.S_IMODE(os.stat(store.path).st_mode) == 0o700
+    with open(os.path.join(store.path, f"{seq}.bin"), "rb") as fh:
+        data = fh.read()
+    start, length = int.from_bytes(data[:8], "little"), int.from_bytes(data[8:16], "little")
+    assert json.loads(data[start:start + length])["dataset_id"] == "abc"
+
+
+def test_store_refuses_a_directory_open_to_others(tmp_path):
+    os.mkdir(tmp_path / "t")
+    os.chmod(tmp_path / "t", 0o777)
+    with pytest.raises(PermissionError):
+        SharedDatasetStore("t", str(tmp_path))
@@ -0,0 +1,138 @@
+"""
+Tests for analytics/sketches.py and the sketch-backed outsized-loss and
+excessive-risk statistics.
+"""
+import random
+import statistics
+
+import numpy as np
+import pytest
+
+from analytics.sketches import RunningStats, QuantileSketch, DistributionSketch
+from analytics.outsized_loss_analyzer import calculate_outsized_loss_stats, build_loss_sketches
+from analytics.excessive_risk_analyzer import calculate_excessive_risk_stats, build_risk_sketches
+from models.trade import Trade
+
+
+def _values(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.lognormvariate(2, 0.8) for _ in range(n)]
+
+
+def test_running_stats_match_statistics_and_merge():
+    values = _values(1000)
+    left, right = RunningStats(), RunningStats()
+    for x in values[:300]:
+        left.add(x)
+    for x in values[300:]:
+        right.add(x)
+
+    merged = left.merge(right)
+    assert merged.count == 1000
+    assert merged.mean == pytest.approx(statistics.mean(values))
+    assert merged.pstdev == pytest.approx(statistics.pstdev(values))
+
+
+def test_small_sketch_is_exact():
+    values = _values(101)
+    sketch = DistributionSketch().extend(values)
+
+    assert sketch.quantiles.exact
+    median = statistics.median(values)
+    assert sketch.median() == pytest.approx(median)
+    assert sketch.mad() == pytest.approx(statistics.median([abs(x - median) for x in values]))
+
+
+@pytest.mark.parametrize("q", [0.1, 0.5, 0.9])
+def test_large_sketch_rank_error_is_bounded(q):
+    values = _values(50_000, seed=1)
+    sketch = QuantileSketch()
+    for x in values:
+        sketch.add(x)
+
+    assert not sketch.exact
+    assert sum(len(level) for level in sketch.levels) < 1000
+
+    rank = np.searchsorted(np.sort(values), sketch.quantile(q)) / len(values)
+    assert abs(rank - q) < 0.02
+
+
+def test_merged_sketches_track_the_combined_stream():
+    values = _values(40_000, seed=2)
+    parts = [DistributionSketch().extend(values[i::4]) for i in range(4)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+
+    assert merged.count == merged.quantiles.n == len(values)
+    rank = np.searchsorted(np.sort(values), merged.median()) / len(values)
+    assert abs(rank - 0.5) < 0.02
+
+    median = statistics.median(values)
+    true_mad = statistics.median([abs(x - median) for x in values])
+    assert merged.mad() == pytest.approx(true_mad, rel=0.05)
+
+
+@pytest.fixture
+def trades():
+    rng = random.Random(39)
+    out = []
+    for _ in range(400):
+        pnl = round(rng.gauss(0, 10), 2)
+        out.append(Trade(
+            symbol=rng.choice(["ESH4", "NQH4"]),
+            side="Buy",
+            pnl=pnl,
+            points_lost=abs(pnl) if pnl < 0 else 0.0,
+            risk_points=None if rng.random() < 0.2 else round(rng.uniform(4, 16), 2),
+        ))
+    return out
+
+
+def test_sketched_outsized_loss_stats_match_exact(trades):
+    sketches = build_loss_sketches(trades)
+    for symbol in (None, "ESH4"):
+        losing = [t for t in trades if t.pnl < 0 and (symbol is None or t.symbol == symbol)]
+        exact = calculate_outsized_loss_stats(losing, 1.0)
+        sketched = calculate_outsized_loss_stats(losing, 1.0, sketch=sketches.get(symbol))
+        for key in ("mean_loss", "median_loss", "std_loss", "mad", "threshold", "outsized_loss_count"):
+            assert sketched[key] == pytest.approx(exact[key], abs=0.01)
+
+
+def test_sketched_excessive_risk_stats_match_exact(trades):
+    exact = calculate_excessive_risk_stats(trades, 1.5)
+    sketched = calculate_excessive_risk_stats(trades, 1.5, sketch=build_risk_sketches(trades).get())
+    for key in ("mean_risk", "median_risk", "std_dev_risk", "mad", "threshold", "excessive_risk_count"):
+        assert sketched[key] == pytest.approx(exact[key], abs=0.01)
+
+
+def test_bulk_extend_matches_streaming():
+    values = _values(50_000, seed=3)
+    streamed = DistributionSketch()
+    for x in values:
+        streamed.add(x)
+    bulk = DistributionSketch().extend(np.asarray(values))
+
+    assert bulk.count == bulk.quantiles.n == len(values)
+    assert bulk.mean == pytest.approx(streamed.mean)
+    assert bulk.pstdev == pytest.approx(streamed.pstdev)
+    assert sum(len(level) for level in bulk.quantiles.levels) < 1000
+    rank = np.searchsorted(np.sort(values), bulk.median()) / len(values)
+    assert abs(rank - 0.5) < 0.02
+
+
+def test_tagging_thresholds_come_from_the_sketch(trades):
+    from analytics.outsized_loss_analyzer import analyze_trades_for_outsized_loss
+    from analytics.excessive_risk_analyzer import analyze_trades_for_excessive_risk
+
+    exact = [t for t in analyze_trades_for_outsized_loss(trades, 1.0) if "outsized loss" in t.mistakes]
+    for t in trades:
+        t.mistakes.clear()
+    sketched = analyze_trades_for_outsized_loss(trades, 1.0, build_loss_sketches(trades).get())
+    assert [t for t in sketched if "outsized loss" in t.mistakes] == exact
+
+    # A sketch whose values sit far below every risk makes every trade excessive.
+    low = DistributionSketch().extend([0.0, 0.1])
+    analyze_trades_for_excessive_risk(trades, 1.5, low)
+    sized = [t for t in trades if t.risk_points is not None]
+    assert all("excessive risk" in t.mistakes for t in sized)
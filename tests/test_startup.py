@@ -0,0 +1,25 @@
+"""
+Tests for app.py's import-time footprint (see gunicorn.conf.py).
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import sys
+import app
+from mentor.mentor_blueprint import warm_orchestrator
+lazy = [m for m in ("mentor.openai_orchestrator", "openai", "dotenv") if m in sys.modules]
+print(lazy, app.app.test_client().get("/api/health").status_code, warm_orchestrator())
+"""
+
+
+def test_app_imports_without_the_mentor_orchestrator():
+    env = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "ASSISTANT_ID")}
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    # The orchestrator and its dependencies stay unloaded, the app serves without OpenAI
+    # credentials, and warming up reports that the orchestrator can't load.
+    assert out.stdout.split() == ["[]", "200", "False"]
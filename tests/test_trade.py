@@ -0,0 +1,96 @@
+"""
+Tests for the Trade model: slots layout, sequential ids and to_dict caching.
+"""
+from datetime import datetime
+
+import pytest
+
+from models.trade import Trade, assign_trade_ids
+
+
+def _make_trade(**overrides):
+    fields = dict(
+        symbol="MNQH4",
+        side="Buy",
+        entry_time=datetime(2024, 1, 2, 9, 30, 0),
+        entry_price=21500.0,
+        entry_qty=1,
+        exit_time=datetime(2024, 1, 2, 9, 35, 0),
+        exit_price=21480.0,
+        exit_qty=1,
+        pnl=-20.0,
+        points_lost=20.0,
+    )
+    fields.update(overrides)
+    return Trade(**fields)
+
+
+def test_trade_uses_slots():
+    """Trades carry no per-instance __dict__ and reject unknown attributes."""
+    trade = _make_trade()
+    assert not hasattr(trade, "__dict__")
+    with pytest.raises(AttributeError):
+        trade.not_a_field = 1
+
+
+def test_trade_ids_are_sequential_and_unique():
+    first = _make_trade()
+    second = _make_trade()
+    assert first.id != second.id
+    assert int(second.id) == int(first.id) + 1
+
+
+def test_assigned_ids_depend_only_on_dataset_and_position():
+    trades = [_make_trade(), _make_trade()]
+    trades[0].to_dict()
+    assign_trade_ids(trades, "3f2a9c01deadbeef")
+    assert [t.id for t in trades] == ["3f2a9c01-1", "3f2a9c01-2"]
+    assert trades[0].to_dict()["id"] == "3f2a9c01-1"
+
+
+def test_points_lost_is_a_declared_field():
+    trade = _make_trade()
+    assert trade.points_lost == 20.0
+    assert trade.to_dict()["pointsLost"] == 20.0
+    assert Trade().points_lost is None
+
+
+def test_to_dict_is_cached_until_fields_change():
+    trade = _make_trade()
+    first = trade.to_dict()
+    assert trade.to_dict() is first
+
+    trade.mistakes.append("outsized loss")
+    second = trade.to_dict()
+    assert second is not first
+    assert second["mistakes"] == ["outsized loss"]
+
+    trade.pnl = -25.0
+    third = trade.to_dict()
+    assert third is not second
+    assert third["pnl"] == -25.0
+
+    trade.risk_points = 12.5
+    assert trade.to_dict()["riskPoints"] == 12.5
+
+
+def test_to_dict_snapshots_mistakes():
+    """The cached dict must not alias the live mistakes list."""
+    trade = _make_trade()
+    data = trade.to_dict()
+    trade.mistakes.append("revenge trade")
+    assert data["mistakes"] == []
+    assert trade.to_dict()["mistakes"] == ["revenge trade"]
+
+
+def test_to_dict_camel_case_shape():
+    trade = _make_trade(exit_order_id=42)
+    data = trade.to_dict()
+    assert data["entryTime"] == "2024-01-02T09:30:00"
+    assert data["exitTime"] == "2024-01-02T09:35:00"
+    assert data["exitOrderId"] == 42
+    assert set(data) == {
+        "id", "symbol", "side", "entryTime", "entryPrice", "entryQty",
+        "exitTime", "exitPrice", "exitQty", "exitOrderId", "pnl",
+        "pointsLost", "riskPoints", "mistakes",
+    }
@@ -0,0 +1,57 @@
+"""
+Tests for trade reconstruction in analytics.trade_counter.
+"""
+import io
+
+import pytest
+
+from analytics.trade_counter import count_trades
+from parsing.order_loader import load_orders
+
+
+@pytest.fixture
+def order_df(tiny_valid_csv_bytes):
+    return load_orders(io.BytesIO(tiny_valid_csv_bytes))
+
+
+def test_count_trades_sets_pnl_and_points_lost(order_df):
+    """PnL and points_lost are populated during reconstruction."""
+    trades, _ = count_trades(order_df)
+
+    assert len(trades) == 3
+    # Long 21490.25 → 21505.25, short 21523 → 21507.25 etc.
+    assert [t.pnl for t in trades] == [15.0, 20.25, 15.75]
+    assert [t.points_lost for t in trades] == [15.0, 20.25, 15.75]
+
+
+def test_count_trades_losses(order_df):
+    """Losing trades get negative pnl and positive points_lost."""
+    order_df.loc[1, "price"] = 21480.25  # first long now exits 10 points lower
+    trades, _ = count_trades(order_df)
+
+    assert trades[0].pnl == -10.0
+    assert trades[0].points_lost == 10.0
+
+
+def test_count_trades_scales_pnl_by_quantity(order_df):
+    order_df["qty"] = 2
+    trades, _ = count_trades(order_df)
+
+    assert trades[0].pnl == 30.0
+    # points_lost stays per-contract
+    assert trades[0].points_lost == 15.0
+
+
+def test_count_trades_point_value_multiplier(order_df):
+    """Per-symbol point values turn point PnL into dollars."""
+    trades, _ = count_trades(order_df, point_values={"MNQH4": 2.0})
+
+    assert [t.pnl for t in trades] == [30.0, 40.5, 31.5]
+    # points are unaffected by the dollar multiplier
+    assert [t.points_lost for t in trades] == [15.0, 20.25, 15.75]
+
+
+def test_count_trades_unknown_symbol_defaults_to_one(order_df):
+    trades, _ = count_trades(order_df, point_values={"ESH4": 50.0})
+
+    assert [t.pnl for t in trades] == [15.0, 20.25, 15.75]
@@ -0,0 +1,40 @@
+import io
+import mmap
+import tempfile
+
+from uploads import MB, body_limit, map_upload, open_upload, release_upload
+
+
+def test_map_upload_maps_spooled_file():
+    with tempfile.SpooledTemporaryFile(max_size=4) as spool:
+        spool.write(b'a,b\n1,2\n')
+        data = map_upload(spool)
+    assert isinstance(data, mmap.mmap)
+    assert data[:] == b'a,b\n1,2\n'
+    assert data.find(b'\n') == 3
+
+    data.read()
+    assert open_upload(data).read() == b'a,b\n1,2\n'
+    release_upload(data)
+    assert data.closed
+
+
+def test_map_upload_keeps_in_memory_spool_in_memory():
+    with tempfile.SpooledTemporaryFile(max_size=MB) as spool:
+        spool.write(b'a,b\n1,2\n')
+        data = map_upload(spool)
+        assert not spool._rolled
+    assert data == b'a,b\n1,2\n'
+    assert open_upload(data).read() == b'a,b\n1,2\n'
+
+
+def test_map_upload_empty_file():
+    with tempfile.TemporaryFile() as f:
+        data = map_upload(f)
+    assert data == b''
+    assert isinstance(open_upload(data), io.BytesIO)
+    release_upload(data)
+
+
+def test_body_limit_allows_multipart_envelope():
+    assert body_limit(2) > 2 * MB
@@ -0,0 +1,69 @@
+"""
+Zero-copy access to uploaded files.
+
+Werkzeug streams a multipart upload into a spooled temporary file while it
+parses the request body. The app caps each request's body at what that
+request may upload (request.max_content_length, body_limit()) and checks the
+declared Content-Length first. So an oversized upload is rejected with a 413
+before it is read, or as soon as a streamed body runs past the cap, never
+after it has been buffered.
+
+map_upload() then memory-maps a spool that went to disk. Hashing, cache
+prefix matching and the CSV parser all read those pages directly, instead of
+through a bytes copy of the upload. A mapping stays valid after werkzeug
+closes the file at the end of the request, which is how background jobs
+keep their input. A small upload that werkzeug kept in memory is taken as
+bytes instead of being written out just to be mapped.
+"""
+import io
+import mmap
+import os
+import tempfile
+from typing import Union
+
+MB = 1024 * 1024
+
+# Allowance for the multipart envelope (boundaries, part headers, other
+# form fields) around the file itself.
+MULTIPART_OVERHEAD = 64 * 1024
+
+Upload = Union[mmap.mmap, bytes]
+
+
+def body_limit(limit_mb: int) -> int:
+    """Largest request body that can carry a ``limit_mb`` MB file."""
+    return limit_mb * MB + MULTIPART_OVERHEAD
+
+
+def map_upload(stream) -> Upload:
+    """
+    Read-only memory map of an uploaded file's stream.
+
+    Works with werkzeug's SpooledTemporaryFile or any real file. A spool
+    still held in memory (or a BytesIO) comes back as bytes, since asking for
+    its fileno would roll it over to disk. An empty upload can't be mapped
+    and comes back as b"".
+    """
+    if isinstance(stream, tempfile.SpooledTemporaryFile) and not stream._rolled:
+        stream = stream._file
+    if isinstance(stream, io.BytesIO):
+        return stream.getvalue()
+    stream.flush()
+    fd = stream.fileno()
+    if os.fstat(fd).st_size == 0:
+        return b""
+    return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+
+
+def open_upload(data: Upload):
+    """Binary file object over an upload, positioned at the start, without copying it."""
+    if isinstance(data, mmap.mmap):
+        data.seek(0)
+        return data
+    return io.BytesIO(data)
+
+
+def release_upload(data: Upload) -> None:
+    """Unmap an upload once nothing reads it any more."""
+    if isinstance(data, mmap.mmap):
+        data.close()